@@ -0,0 +1,89 @@
+"""
+Event-driven backtester throughput (bar-events per second, one core).
+
+Runs `run_backtest` with stops, a rebalance band and costs on a synthetic
+OHLC panel, without numba and, when it is installed, with the JIT bar
+loop. Use --min-rate to fail (exit 1) below a number of million events/s.
+
+    python benchmarks/bench_backtest.py --days 5000 --assets 500 --min-rate 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from trading_lab.backtest.engine import run_backtest, signal_weights
+
+
+def make_panel(days: int, assets: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2000-01-03", periods=days)
+    close = 100.0 * np.exp(np.cumsum(0.01 * rng.standard_normal((days, assets)), 0))
+    open_ = close * np.exp(0.003 * rng.standard_normal((days, assets)))
+    spread = np.abs(0.01 * rng.standard_normal((days, assets)))
+    fields = {
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + spread),
+        "Low": np.minimum(open_, close) * (1 - spread),
+        "Close": close,
+    }
+    tickers = [f"T{i:04d}" for i in range(assets)]
+    return pd.concat(
+        {k: pd.DataFrame(v, index=idx, columns=tickers) for k, v in fields.items()},
+        axis=1,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=5000)
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-rate", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    panel = make_panel(args.days, args.assets)
+    close = panel["Close"]
+    signal = np.sign(close.rolling(20).mean() - close.rolling(100).mean())
+    vol = close.pct_change().rolling(20).std()
+    weights = signal_weights(signal, vol, 0.01, max_weight=0.1, max_gross=1.0)
+
+    modes = [False]
+    if importlib.util.find_spec("numba") is not None:
+        run_backtest(panel.iloc[:10], weights.iloc[:10], jit=True)  # compile
+        modes.append(True)
+
+    print(f"panel: {args.days} days x {args.assets} assets")
+    failed = False
+    for jit in modes:
+        best = 0.0
+        for _ in range(args.repeat):
+            res = run_backtest(
+                panel,
+                weights,
+                stop_loss=0.1,
+                trailing_stop=0.15,
+                rebalance_band=0.01,
+                cost_bps=5.0,
+                jit=jit,
+            )
+            best = max(best, res.events_per_second)
+        flag = ""
+        if args.min_rate is not None and best / 1e6 < args.min_rate:
+            flag = "  <-- below target"
+            failed = True
+        label = "numba" if jit else "no jit"
+        print(f"{label:<10} {best / 1e6:8.2f} M bar-events/s{flag}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Import-time benchmark for trading_lab entry points.
+
+Each statement runs in a fresh interpreter; the best of N wall-clock runs is
+reported next to a bare `import pandas` baseline. Use --max-overhead to fail
+(exit 1) when a statement costs more than that many seconds over the baseline.
+
+    python benchmarks/bench_import.py --repeat 5 --max-overhead 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+BASELINE = "import pandas"
+
+STATEMENTS = (
+    "import trading_lab",
+    "from trading_lab.data import DataStack",
+    (
+        "from trading_lab.data import DataStackBuilder; "
+        "DataStackBuilder().with_parquet_cache('/tmp/trading_lab_bench').build()"
+    ),
+    "import trading_lab.features.returns",
+    "import trading_lab.models.garch",
+    "import trading_lab.utils.plotting",
+)
+
+
+def time_statement(code: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-overhead", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    base = time_statement(BASELINE, args.repeat)
+    print(f"{'baseline: ' + BASELINE:<70} {base:7.3f}s")
+
+    failed = False
+    for code in STATEMENTS:
+        t = time_statement(code, args.repeat)
+        over = t - base
+        flag = ""
+        if args.max_overhead is not None and over > args.max_overhead:
+            flag = "  <-- over budget"
+            failed = True
+        print(f"{code[:70]:<70} {t:7.3f}s  ({over:+.3f}s){flag}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
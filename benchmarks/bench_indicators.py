@@ -0,0 +1,94 @@
+"""
+Indicator throughput on a synthetic multi-asset OHLCV panel.
+
+Every indicator runs once on a (days x assets) panel; ATR is also timed as a
+per-ticker pandas loop (the pre-panel way) for reference. The best of N runs
+is reported.
+
+    python benchmarks/bench_indicators.py --days 5000 --assets 500 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from trading_lab.features import indicators as ind
+
+
+def make_panel(days: int, assets: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2000-01-03", periods=days)
+    close = 100.0 * np.exp(np.cumsum(0.01 * rng.standard_normal((days, assets)), 0))
+    open_ = close * np.exp(0.003 * rng.standard_normal((days, assets)))
+    spread = np.abs(0.01 * rng.standard_normal((days, assets)))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.integers(1_000, 1_000_000, (days, assets)).astype(float)
+    tickers = [f"T{i:04d}" for i in range(assets)]
+    fields = {"Open": open_, "High": high, "Low": low, "Close": close}
+    fields["Volume"] = volume
+    return pd.concat(
+        {k: pd.DataFrame(v, index=idx, columns=tickers) for k, v in fields.items()},
+        axis=1,
+    )
+
+
+def _atr_per_ticker(panel: pd.DataFrame, window: int = 14) -> dict:
+    out = {}
+    for t in panel["Close"].columns:
+        h, l, c = panel["High"][t], panel["Low"][t], panel["Close"][t]
+        prev = c.shift(1)
+        tr = pd.concat([h - l, (h - prev).abs(), (l - prev).abs()], axis=1).max(axis=1)
+        out[t] = tr.ewm(alpha=1 / window, adjust=False).mean()
+    return out
+
+
+CASES = (
+    ("atr (panel)", lambda p: ind.atr(p)),
+    ("atr (per-ticker pandas loop)", _atr_per_ticker),
+    ("bollinger_bands", lambda p: ind.bollinger_bands(p)),
+    ("macd", lambda p: ind.macd(p)),
+    ("stochastic", lambda p: ind.stochastic(p)),
+    ("obv", lambda p: ind.obv(p)),
+    ("vwap", lambda p: ind.vwap(p)),
+    ("parkinson_volatility", lambda p: ind.parkinson_volatility(p)),
+    ("garman_klass_volatility", lambda p: ind.garman_klass_volatility(p)),
+    ("yang_zhang_volatility", lambda p: ind.yang_zhang_volatility(p)),
+)
+
+
+def time_case(fn, panel: pd.DataFrame, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(panel)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=5000)
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    panel = make_panel(args.days, args.assets)
+    cells = args.days * args.assets
+    print(f"panel: {args.days} days x {args.assets} assets")
+    for name, fn in CASES:
+        t = time_case(fn, panel, args.repeat)
+        print(f"{name:<40} {t:7.3f}s  ({cells / t / 1e6:7.1f} M cells/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Rolling mean/std of `rolling_moments` against pandas on (days x assets) panels.
+
+For each shape, `rolling_moments` (engine "auto") is timed against
+`DataFrame.rolling(window).mean()` + `.std()` on the same data, and the
+max error of both against an exact two-pass std is reported. With
+`--min-speedup` the script fails if the NumPy kernel is not that much
+faster than pandas on every shape "auto" sends to it.
+
+    python benchmarks/bench_rolling.py --repeat 5 --min-speedup 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from trading_lab.features.rolling import KERNEL_MAX_ROWS, rolling_moments
+
+# (days, assets, window): short histories go to the NumPy kernel, long
+# ones to pandas
+SHAPES = (
+    (60, 2000, 20),
+    (252, 500, 20),
+    (252, 2000, 60),
+    (1000, 100, 20),
+    (1024, 1, 20),
+    (1024, 1000, 252),
+    (2520, 500, 20),
+    (65_536, 1, 20),
+)
+
+
+def make_prices(days: int, assets: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    steps = 0.0005 + 0.02 * rng.standard_normal((days, assets))
+    return 100.0 * np.exp(np.cumsum(steps, axis=0))
+
+
+def exact_std(x: np.ndarray, window: int) -> np.ndarray:
+    w = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+    dev = w - w.mean(axis=-1, keepdims=True)
+    return np.sqrt((dev**2).sum(axis=-1) / (window - 1))
+
+
+def kernel_std(x: np.ndarray, window: int) -> np.ndarray:
+    return rolling_moments(x, window)[window]["std"]
+
+
+def pandas_std(x: np.ndarray, window: int) -> np.ndarray:
+    roll = pd.DataFrame(x).rolling(window)
+    roll.mean()
+    return roll.std().to_numpy()
+
+
+def best_of(fn, repeat: int, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-speedup",
+        type=float,
+        default=None,
+        help="fail unless the kernel is at least this many times faster",
+    )
+    args = parser.parse_args(argv)
+
+    slow = []
+    for days, assets, window in SHAPES:
+        x = make_prices(days, assets)
+        t_k = best_of(kernel_std, args.repeat, x, window)
+        t_p = best_of(pandas_std, args.repeat, x, window)
+
+        ref = exact_std(x, window)
+        err_k = np.abs(kernel_std(x, window)[window - 1 :] / ref - 1).max()
+        err_p = np.abs(pandas_std(x, window)[window - 1 :] / ref - 1).max()
+
+        speedup = t_p / t_k
+        engine = "numpy" if days <= KERNEL_MAX_ROWS else "pandas"
+        print(
+            f"{days:>6} x {assets:<5} w={window:<4} {engine:<6} "
+            f"{t_k * 1e3:8.2f} ms  pandas {t_p * 1e3:8.2f} ms  "
+            f"x{speedup:5.2f}  rel.err {err_k:.1e} vs {err_p:.1e}"
+        )
+        if engine == "numpy" and speedup < (args.min_speedup or 0.0):
+            slow.append((days, assets, window))
+
+    if slow:
+        print(f"kernel slower than x{args.min_speedup} on {slow}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
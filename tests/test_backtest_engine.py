@@ -0,0 +1,228 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.backtest import engine
+from trading_lab.backtest.engine import (
+    STOP_LOSS,
+    TRAILING_STOP,
+    panel_from_cache,
+    run_backtest,
+    signal_weights,
+)
+from trading_lab.data.cache.parquet import ParquetCacheProvider
+
+
+def _prices(n=300, k=3, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2020-01-01", periods=n)
+    steps = 0.01 * rng.standard_normal((n, k))
+    return pd.DataFrame(
+        100.0 * np.exp(np.cumsum(steps, axis=0)),
+        index=idx,
+        columns=[f"A{i}" for i in range(k)],
+    )
+
+
+def _ohlc(close, seed=1):
+    rng = np.random.default_rng(seed)
+    open_ = close.shift(1).bfill() * np.exp(0.002 * rng.standard_normal(close.shape))
+    spread = np.abs(0.005 * rng.standard_normal(close.shape))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    fields = {"Open": open_, "High": high, "Low": low, "Close": close}
+    return pd.concat(fields, axis=1)
+
+
+def test_close_only_matches_vectorized_returns():
+    close = _prices()
+    rng = np.random.default_rng(2)
+    w = pd.DataFrame(
+        rng.uniform(-0.5, 0.5, close.shape), index=close.index, columns=close.columns
+    )
+    res = run_backtest(close, w)
+
+    expected = (w.shift(1) * close.pct_change()).sum(axis=1)
+    np.testing.assert_allclose(res.returns.iloc[1:], expected.iloc[1:], atol=1e-12)
+    assert res.returns.iloc[0] == 0.0
+    assert res.n_events == close.size
+
+
+def test_book_is_consistent_with_costs():
+    panel = _ohlc(_prices())
+    sig = np.sign(panel["Close"].diff(5)).fillna(0.0)
+    res = run_backtest(panel, sig / 3, cost_bps=10.0)
+
+    close = panel["Close"]
+    np.testing.assert_allclose(
+        res.equity, res.cash + (res.positions * close).sum(axis=1), rtol=1e-12
+    )
+    np.testing.assert_allclose(res.positions, res.fills.cumsum(), atol=1e-9)
+    assert res.costs.sum() > 0
+
+    free = run_backtest(panel, sig / 3)
+    assert res.equity.iloc[-1] < free.equity.iloc[-1]
+
+
+def test_stop_loss_exits_and_locks_out_until_target_changes():
+    idx = pd.bdate_range("2021-01-01", periods=9)
+    close = pd.DataFrame({"X": [100, 100, 95, 85, 80, 90, 100, 100, 100.0]}, idx)
+    w = pd.DataFrame({"X": [1, 1, 1, 1, 1, 1, 0, 1, 1.0]}, idx)
+    res = run_backtest(close, w, stop_loss=0.1)
+
+    # Bought at the first close, stopped at the 85 close
+    assert res.stops["X"].tolist() == [0, 0, 0, STOP_LOSS, 0, 0, 0, 0, 0]
+    assert res.positions["X"].iloc[3:7].eq(0).all()
+    assert res.equity.iloc[3] == pytest.approx(0.85)
+    # The target went to 0 and back: re-entered at the close of bar 7
+    assert res.positions["X"].iloc[8] > 0
+
+
+def test_intrabar_stops_fill_at_level_or_gap_open():
+    idx = pd.bdate_range("2021-01-01", periods=4)
+
+    def panel(o, h, lo, c):
+        return pd.concat(
+            {
+                "Open": pd.DataFrame({"X": o}, idx),
+                "High": pd.DataFrame({"X": h}, idx),
+                "Low": pd.DataFrame({"X": lo}, idx),
+                "Close": pd.DataFrame({"X": c}, idx),
+            },
+            axis=1,
+        )
+
+    w = pd.DataFrame({"X": [1.0, 1.0, 1.0, 1.0]}, idx)
+
+    # Entry at the open of bar 1 (100), low touches 94 on bar 2: exit at 95
+    res = run_backtest(
+        panel(
+            [100, 100, 99, 97],
+            [101, 101, 100, 98],
+            [99, 99, 94, 96],
+            [100, 100, 97, 97],
+        ),
+        w,
+        stop_loss=0.05,
+    )
+    assert res.stops["X"].iloc[2] == STOP_LOSS
+    assert res.equity.iloc[2] == pytest.approx(0.95)
+
+    # Gap down through the level: exit at the open (90)
+    res = run_backtest(
+        panel(
+            [100, 100, 90, 97], [101, 101, 92, 98], [99, 99, 89, 96], [100, 100, 91, 97]
+        ),
+        w,
+        stop_loss=0.05,
+    )
+    assert res.equity.iloc[2] == pytest.approx(0.90)
+
+
+def test_trailing_stop_and_short_side():
+    idx = pd.bdate_range("2021-01-01", periods=7)
+    up = pd.DataFrame({"X": [100, 100, 110, 120, 115, 107, 100.0]}, idx)
+    res = run_backtest(up, pd.DataFrame({"X": 1.0}, idx), trailing_stop=0.1)
+    assert res.stops["X"].tolist() == [0, 0, 0, 0, 0, TRAILING_STOP, 0]
+
+    down = pd.DataFrame({"X": [100, 100, 95, 104, 111, 90, 80.0]}, idx)
+    # A wide band: no rebalancing after the entry
+    short = pd.DataFrame({"X": -1.0}, idx)
+    res = run_backtest(down, short, stop_loss=0.1, rebalance_band=10.0)
+    assert res.stops["X"].tolist() == [0, 0, 0, 0, STOP_LOSS, 0, 0]
+    assert res.equity.iloc[4] == pytest.approx(0.89)
+
+
+def test_rebalance_band_cuts_trading():
+    close = _prices(k=5)
+    vol = close.pct_change().rolling(20).std()
+    w = signal_weights(pd.DataFrame(1.0, close.index, close.columns), vol, 0.002)
+    tight = run_backtest(close, w)
+    banded = run_backtest(close, w, rebalance_band=0.05)
+    assert (banded.fills != 0).sum().sum() < (tight.fills != 0).sum().sum() / 3
+
+
+def test_signal_weights_targets_vol_and_caps_gross():
+    idx = pd.bdate_range("2021-01-01", periods=3)
+    sig = pd.DataFrame({"A": [1.0, 1.0, -1.0], "B": [1.0, 0.0, 1.0]}, idx)
+    vol = pd.DataFrame({"A": [0.01, 0.02, np.nan], "B": [0.005, 0.01, 0.04]}, idx)
+
+    w = signal_weights(sig, vol, target_vol=0.01, max_weight=1.5, max_gross=2.0)
+    np.testing.assert_allclose(w["A"], [2.0 / 2.5, 0.5, 0.0])
+    np.testing.assert_allclose(w["B"], [1.5 / 1.25, 0.0, 0.25])
+
+    with pytest.raises(ValueError):
+        signal_weights(sig, target_vol=0.01)
+
+
+def test_missing_prices_are_untradable():
+    close = _prices(n=50, k=2)
+    close.iloc[:10, 1] = np.nan
+    res = run_backtest(close, pd.DataFrame(0.5, close.index, close.columns))
+    assert res.positions.iloc[:11, 1].eq(0).all()
+    assert res.positions.iloc[11:, 1].gt(0).all()
+    assert np.isfinite(res.equity).all()
+
+
+def test_replay_from_parquet_cache(tmp_path):
+    cache = ParquetCacheProvider(tmp_path)
+    panel = _ohlc(_prices(k=2))
+    for t in panel["Close"].columns:
+        df = panel.xs(t, axis=1, level=1).assign(Volume=1e6)
+        cache.write(t, "1d", df)
+
+    replay = panel_from_cache(cache, ["A0", "A1"], start="2020-03-02")
+    assert list(replay.columns.get_level_values(0).unique()) == [
+        "Open",
+        "High",
+        "Low",
+        "Close",
+    ]
+    assert replay.index[0] == pd.Timestamp("2020-03-02")
+    pd.testing.assert_frame_equal(
+        replay["Close"], panel["Close"].loc["2020-03-02":], check_freq=False
+    )
+
+    w = pd.DataFrame(0.5, replay.index, ["A0", "A1"])
+    res = run_backtest(replay, w, trailing_stop=0.05)
+    assert len(res.equity) == len(replay)
+
+    with pytest.raises(KeyError):
+        panel_from_cache(cache, ["A0", "MISSING"])
+
+
+def test_scalar_loop_matches_vectorized_bars(monkeypatch):
+    panel = _ohlc(_prices())
+    sig = np.sign(panel["Close"].diff(10)).fillna(0.0) / 3
+    kw = {"stop_loss": 0.03, "trailing_stop": 0.05, "rebalance_band": 0.02}
+    a = run_backtest(panel, sig, jit=False, cost_bps=5, **kw)
+    monkeypatch.setattr(engine, "SCALAR_MAX_ASSETS", 0)
+    b = run_backtest(panel, sig, jit=False, cost_bps=5, **kw)
+    assert a.stops.to_numpy().any()
+    pd.testing.assert_series_equal(a.equity, b.equity, rtol=1e-12)
+    pd.testing.assert_frame_equal(a.fills, b.fills, rtol=1e-12)
+    pd.testing.assert_frame_equal(a.stops, b.stops)
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("numba") is None, reason="numba not installed"
+)
+def test_jit_matches_numpy(monkeypatch):
+    panel = _ohlc(_prices())
+    sig = np.sign(panel["Close"].diff(10)).fillna(0.0) / 3
+    kw = {"stop_loss": 0.03, "trailing_stop": 0.05, "rebalance_band": 0.02}
+    b = run_backtest(panel, sig, jit=True, cost_bps=5, **kw)
+    monkeypatch.setattr(engine, "SCALAR_MAX_ASSETS", 0)
+    a = run_backtest(panel, sig, jit=False, cost_bps=5, **kw)
+    pd.testing.assert_series_equal(a.equity, b.equity, rtol=1e-12)
+    pd.testing.assert_frame_equal(a.stops, b.stops)
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("numba") is not None, reason="numba installed"
+)
+def test_jit_requires_numba():
+    with pytest.raises(ImportError):
+        run_backtest(_prices(n=5), pd.DataFrame(), jit=True)
@@ -0,0 +1,224 @@
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from trading_lab.data.cache import parquet
+from trading_lab.data.cache.parquet import ParquetCacheProvider
+from trading_lab.data.cache.policy import CachePolicy
+from trading_lab.data.datastack import DataStackBuilder
+from trading_lab.data.providers.base import DataProvider
+
+
+def _mk_ohlcv(start: str, end: str, level: float = 0.0) -> pd.DataFrame:
+    idx = pd.date_range(start=start, end=end, freq="D")
+    values = [level + i for i in range(len(idx))]
+    return pd.DataFrame(
+        {
+            "Open": values,
+            "High": values,
+            "Low": values,
+            "Close": values,
+            "Adj Close": values,
+            "Volume": [100] * len(idx),
+        },
+        index=idx,
+    )
+
+
+class RecordingProvider(DataProvider):
+    def __init__(self, data_by_ticker: dict[str, pd.DataFrame]):
+        self.data_by_ticker = data_by_ticker
+        self.calls: list[tuple[str, str]] = []
+
+    def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+        self.calls.append((start, end))
+        df = self.data_by_ticker.get(tickers)
+        return {} if df is None else {tickers: df.loc[start:end].copy()}
+
+
+class Clock:
+    def __init__(self, now: str):
+        self.now = pd.Timestamp(now)
+
+    def __call__(self) -> pd.Timestamp:
+        return self.now
+
+
+def test_volatile_tail_is_refetched_after_ttl(tmp_path):
+    clock = Clock("2000-01-10 12:00")
+    policy = CachePolicy(clock=clock)
+    provider = RecordingProvider({"X": _mk_ohlcv("2000-01-01", "2000-01-10")})
+    ds = (
+        DataStackBuilder()
+        .with_provider(provider)
+        .with_parquet_cache(tmp_path, policy=policy)
+        .build()
+    )
+    ds.get_ohlcv("X", start="2000-01-01", end="2000-01-10", verbose=False)
+
+    # Within the TTL: the partial tail is trusted
+    clock.now += pd.Timedelta(minutes=10)
+    ds.get_ohlcv("X", start="2000-01-01", end="2000-01-10", verbose=False)
+    assert len(provider.calls) == 1
+
+    # Provider revises the last bars; after the TTL only the tail is refetched
+    provider.data_by_ticker["X"] = _mk_ohlcv("2000-01-01", "2000-01-10", level=1000)
+    clock.now += pd.Timedelta(hours=2)
+    (df,) = ds.get_ohlcv("X", start="2000-01-01", end="2000-01-10", verbose=False)
+
+    assert provider.calls[-1] == ("2000-01-08", "2000-01-10")
+    assert df.loc["2000-01-09", "Close"] == 1008
+    assert df.loc["2000-01-02", "Close"] == 1
+
+
+def test_old_history_is_final(tmp_path):
+    policy = CachePolicy(clock=Clock("2000-03-01"))
+    provider = RecordingProvider({"X": _mk_ohlcv("2000-01-01", "2000-01-10")})
+    ds = (
+        DataStackBuilder()
+        .with_provider(provider)
+        .with_parquet_cache(tmp_path, policy=policy)
+        .build()
+    )
+    ds.get_ohlcv("X", start="2000-01-01", end="2000-01-10", verbose=False)
+    ds.get_ohlcv("X", start="2000-01-01", end="2000-01-10", verbose=False)
+
+    assert len(provider.calls) == 1
+
+
+def _fill(cache: ParquetCacheProvider, clock: Clock, tickers):
+    for t in tickers:
+        clock.now += pd.Timedelta(seconds=1)
+        cache.write(t, "1d", _mk_ohlcv("2000-01-01", "2000-12-31"))
+
+
+def test_lru_eviction_keeps_budget(tmp_path):
+    clock = Clock("2020-01-01")
+    probe = ParquetCacheProvider(tmp_path / "probe")
+    probe.write("P", "1d", _mk_ohlcv("2000-01-01", "2000-12-31"))
+    size = probe.path_for("P", "1d").stat().st_size
+
+    cache = ParquetCacheProvider(
+        tmp_path / "c", policy=CachePolicy(max_bytes=3 * size, clock=clock)
+    )
+    _fill(cache, clock, ["A", "B", "C"])
+
+    clock.now += pd.Timedelta(seconds=1)
+    cache.read("A", "1d")
+    _fill(cache, clock, ["D"])
+
+    stats = cache.stats()
+    assert stats.total_bytes <= 3 * size
+    assert stats.evictions == 1
+    assert cache.read("B", "1d") is None
+    assert cache.read("A", "1d") is not None
+
+
+def test_lfu_eviction_prefers_rarely_read(tmp_path):
+    clock = Clock("2020-01-01")
+    probe = ParquetCacheProvider(tmp_path / "probe")
+    probe.write("P", "1d", _mk_ohlcv("2000-01-01", "2000-12-31"))
+    size = probe.path_for("P", "1d").stat().st_size
+
+    cache = ParquetCacheProvider(
+        tmp_path / "c",
+        policy=CachePolicy(max_bytes=2 * size, eviction="lfu", clock=clock),
+    )
+    _fill(cache, clock, ["A", "B"])
+    for _ in range(3):
+        cache.read("A", "1d")
+    cache.read("B", "1d")
+
+    _fill(cache, clock, ["C"])
+
+    assert cache.read("B", "1d") is None
+    assert cache.read("A", "1d") is not None
+
+
+def test_stats_count_hits_and_misses(tmp_path):
+    cache = ParquetCacheProvider(tmp_path)
+    cache.read("X", "1d")
+    cache.write("X", "1d", _mk_ohlcv("2000-01-01", "2000-01-05"))
+    cache.read("X", "1d")
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.writes, stats.files) == (1, 1, 1, 1)
+    assert "fetched_at" in cache.read_meta("X", "1d")
+
+
+def test_policy_rejects_unknown_eviction():
+    with pytest.raises(ValueError):
+        CachePolicy(eviction="fifo")
+
+
+def test_budget_bookkeeping_is_incremental(tmp_path, monkeypatch):
+    clock = Clock("2020-01-01")
+    cache = ParquetCacheProvider(
+        tmp_path, policy=CachePolicy(max_bytes=10**9, clock=clock)
+    )
+    loads = []
+    real = parquet._load_meta
+    monkeypatch.setattr(parquet, "_load_meta", lambda p: loads.append(p) or real(p))
+
+    _fill(cache, clock, [f"T{i}" for i in range(40)])
+    # One sidecar merge per write plus the initial scan, instead of
+    # re-reading every sidecar on every write
+    assert len(loads) <= 41
+
+    loads.clear()
+    for _ in range(5):
+        cache.read("T0", "1d")
+    assert loads == []
+    assert "access_count" not in real(cache.path_for("T0", "1d"))
+
+    cache.flush()
+    meta = real(cache.path_for("T0", "1d"))
+    assert meta["access_count"] == 5
+    assert meta["last_access"] == clock.now.timestamp()
+
+    # A fresh instance rebuilds the table from the sidecars: T0 is the most
+    # recently used, T1 the least
+    clock.now += pd.Timedelta(seconds=1)
+    size = cache.path_for("T0", "1d").stat().st_size
+    small = ParquetCacheProvider(
+        tmp_path, policy=CachePolicy(max_bytes=40 * size, clock=clock)
+    )
+    small.write("T40", "1d", _mk_ohlcv("2000-01-01", "2000-12-31"))
+    assert small.read("T1", "1d") is None
+    assert small.read("T0", "1d") is not None
+    assert small.stats().total_bytes <= 40 * size
+
+
+def test_access_records_are_thread_safe_and_flushed_at_exit(tmp_path):
+    clock = Clock("2020-01-01")
+    cache = ParquetCacheProvider(
+        tmp_path, policy=CachePolicy(max_bytes=10**9, clock=clock)
+    )
+    _fill(cache, clock, ["A", "B"])
+
+    def reads(t):
+        for _ in range(50):
+            cache.read(t, "1d")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(reads, ["A", "B"] * 4))
+    cache.flush()
+    assert cache.read_meta("A", "1d")["access_count"] == 200
+    assert cache.read_meta("B", "1d")["access_count"] == 200
+
+    # Fewer reads than a flush batch, and no flush(): written at exit
+    script = (
+        "from pathlib import Path\n"
+        "from trading_lab.data.cache.parquet import ParquetCacheProvider\n"
+        "from trading_lab.data.cache.policy import CachePolicy\n"
+        f"cache = ParquetCacheProvider(Path({str(tmp_path)!r}), "
+        "policy=CachePolicy(max_bytes=10**9))\n"
+        "cache.read('A', '1d')\n"
+    )
+    root = Path(__file__).resolve().parents[1]
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=root)
+    assert cache.read_meta("A", "1d")["access_count"] == 201
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.data.cache.snapshot import SNAPSHOT_DIR, SnapshotStore, chunk_hash
+from trading_lab.data.datastack import DataStackBuilder
+from trading_lab.data.providers.base import DataProvider
+
+
+def _bars(start, end, freq="D", scale=1.0):
+    idx = pd.date_range(start, end, freq=freq)
+    close = scale * (100.0 + np.arange(len(idx)))
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close + 1,
+            "Low": close - 1,
+            "Close": close,
+            "Volume": 1000.0,
+        },
+        index=idx,
+    )
+
+
+class HistoryProvider(DataProvider):
+    """
+    Serves slices of fixed histories and counts fetches.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+        self.calls += 1
+        df = self.data.get(tickers)
+        return {} if df is None else {tickers: df.loc[start:end]}
+
+
+def _stack(tmp_path, provider):
+    return (
+        DataStackBuilder()
+        .with_provider(provider)
+        .with_parquet_cache(tmp_path / "cache")
+        .build()
+    )
+
+
+def _objects(tmp_path):
+    return sorted((tmp_path / "cache" / SNAPSHOT_DIR).glob("objects/*/*.parquet"))
+
+
+def test_pinned_stack_reads_the_frozen_data(tmp_path):
+    history = {
+        "^FCHI": _bars("2018-01-01", "2021-06-30"),
+        "SPY": _bars("2019-01-01", "2021-06-30"),
+    }
+    provider = HistoryProvider(history)
+    stack = _stack(tmp_path, provider)
+    stack.get_ohlcv(["^FCHI", "SPY"], "2018-01-01", "2020-12-31", verbose=False)
+
+    snap = stack.snapshot(label="before")
+    # 3 yearly chunks for ^FCHI, 2 for SPY
+    assert len(_objects(tmp_path)) == 5
+    frozen = stack.cache.read("^FCHI", "1d")
+
+    stack.get_ohlcv(["^FCHI", "SPY"], "2018-01-01", "2021-06-30", verbose=False)
+    later = stack.snapshot(label="after")
+    assert later != snap
+    # Only the new 2021 chunks were added
+    assert len(_objects(tmp_path)) == 7
+
+    calls = provider.calls
+    pinned = stack.pin(snap)
+    (df,) = pinned.get_ohlcv("^FCHI", "2018-01-01", "2021-06-30", verbose=False)
+    assert provider.calls == calls
+    pd.testing.assert_frame_equal(df, frozen, check_freq=False)
+    assert pinned.cache.bounds("SPY", "1d")[1] == pd.Timestamp("2020-12-31")
+
+    part = pinned.cache.read_range("^FCHI", "1d", "2019-03-01", "2019-03-31", ["Close"])
+    pd.testing.assert_frame_equal(
+        part, frozen.loc["2019-03-01":"2019-03-31", ["Close"]], check_freq=False
+    )
+
+    with pytest.raises(RuntimeError):
+        pinned.get_ohlcv("AAPL", "2020-01-01", "2020-12-31", verbose=False)
+    with pytest.raises(PermissionError):
+        pinned.cache.write("^FCHI", "1d", frozen)
+
+    (now,) = stack.pin(later).get_ohlcv(
+        "^FCHI", "2021-06-01", "2021-06-30", verbose=False
+    )
+    assert now.index[-1] == pd.Timestamp("2021-06-30")
+
+
+def test_unchanged_cache_gives_same_id_without_rereading(tmp_path, monkeypatch):
+    stack = _stack(tmp_path, HistoryProvider({"X": _bars("2020-01-01", "2020-12-31")}))
+    stack.get_ohlcv("X", "2020-01-01", "2020-12-31", verbose=False)
+    first = stack.snapshot()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged file was re-read")
+
+    monkeypatch.setattr(SnapshotStore, "_chunks_of", fail)
+    assert stack.snapshot() == first
+    assert list(SnapshotStore.for_cache(stack.cache).list()["id"]) == [first]
+
+
+def test_rewritten_history_gets_new_chunks_and_gc(tmp_path):
+    stack = _stack(tmp_path, HistoryProvider({}))
+    stack.cache.write("X", "1d", _bars("2019-01-01", "2020-12-31"))
+    old = stack.snapshot()
+    # A split adjustment rescales all history: every chunk changes
+    stack.cache.write("X", "1d", _bars("2019-01-01", "2020-12-31", scale=0.5))
+    new = stack.snapshot()
+    assert len(_objects(tmp_path)) == 4
+
+    store = SnapshotStore.for_cache(stack.cache)
+    assert store.gc() == 0
+    store.delete(old)
+    assert store.gc() > 0
+    assert len(_objects(tmp_path)) == 2
+
+    (df,) = stack.pin(new).get_ohlcv("X", "2019-01-01", "2020-12-31", verbose=False)
+    assert df["Close"].iloc[0] == 50.0
+    with pytest.raises(KeyError):
+        stack.pin(old)
+
+
+def test_intraday_chunks_are_monthly_and_content_addressed(tmp_path):
+    stack = _stack(tmp_path, HistoryProvider({}))
+    bars = _bars("2024-01-30", "2024-03-02", freq="h")
+    stack.cache.write("X", "1h", bars)
+    snap = stack.snapshot()
+
+    manifest = SnapshotStore.for_cache(stack.cache).manifest(snap)
+    chunks = manifest["entries"]["X_1h"]["chunks"]
+    assert [c["start"][:7] for c in chunks] == ["2024-01", "2024-02", "2024-03"]
+    assert sum(c["rows"] for c in chunks) == len(bars)
+    assert chunk_hash(bars.iloc[:10]) == chunk_hash(bars.iloc[:10].copy())
+    assert chunk_hash(bars.iloc[:10]) != chunk_hash(bars.iloc[1:11])
+
+    pinned = stack.pin(snap)
+    pd.testing.assert_frame_equal(pinned.cache.read("X", "1h"), bars, check_freq=False)
+
+
+def test_empty_frames_and_partial_date_bounds(tmp_path):
+    stack = _stack(tmp_path, HistoryProvider({}))
+    bars = _bars("2024-01-30", "2024-03-02", freq="h")
+    stack.cache.write("X", "1h", bars)
+    stack.cache.write("EMPTY", "1d", bars.iloc[:0])
+    pinned = stack.pin(stack.snapshot())
+
+    assert pinned.cache.bounds("EMPTY", "1d") is None
+    empty = pinned.cache.read("EMPTY", "1d")
+    assert empty.empty and list(empty.columns) == list(bars.columns)
+    assert pinned.cache.read_range("EMPTY", "1d", "2024-01-01", "2024-12-31").empty
+
+    # A year end bound reaches past the first monthly chunk
+    for start, end in [("2024-01-31", "2024"), ("2024-01", "2024-02")]:
+        pd.testing.assert_frame_equal(
+            pinned.cache.read_range("X", "1h", start, end),
+            bars.loc[start:end],
+            check_freq=False,
+        )
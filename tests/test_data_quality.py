@@ -0,0 +1,223 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.data.datastack import DataStackBuilder
+from trading_lab.data.providers.base import DataProvider
+from trading_lab.data.quality import (
+    BAD_RANGE,
+    NONPOSITIVE,
+    SPIKE,
+    STALE,
+    QualityRules,
+    quality_flags,
+    screen_ohlcv,
+)
+
+
+def _bars(n=300, seed=0, start="2020-01-01"):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=n, freq="D")
+    close = 100.0 * np.exp(np.cumsum(0.01 * rng.standard_normal(n)))
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": 1000.0,
+        },
+        index=idx,
+    )
+
+
+def _dirty(df):
+    df = df.copy()
+    high = df.columns.get_loc("High")
+    low = df.columns.get_loc("Low")
+    df.iloc[10, [high, low]] = df.iloc[10, [low, high]].to_numpy()
+    df.iloc[20, df.columns.get_loc("Close")] = 0.0
+    df.iloc[30, df.columns.get_loc("Close")] *= 1.5
+    df.iloc[40:46, df.columns.get_loc("Close")] = df["Close"].iloc[40]
+    # A genuine gap that does not revert
+    df.iloc[60:, :5] *= 0.7
+    return df
+
+
+def test_flags_each_kind_of_bad_bar():
+    flags = quality_flags(_dirty(_bars()))
+    assert flags.dtype == np.uint8
+
+    bad = flags[flags != 0]
+    assert bad.iloc[0] == BAD_RANGE and bad.index[0] == flags.index[10]
+    assert flags.iloc[20] == NONPOSITIVE
+    assert flags.iloc[30] == SPIKE
+    assert (flags.iloc[41:46] == STALE).all() and flags.iloc[40] == 0
+    assert list(np.flatnonzero(flags)) == [10, 20, 30, 41, 42, 43, 44, 45]
+
+    assert (quality_flags(_bars()) == 0).all()
+    loose = quality_flags(_dirty(_bars()), QualityRules(stale_bars=7, spike_mads=0))
+    assert (loose & (STALE | SPIKE)).sum() == 0
+
+
+def test_panel_flags_match_single_frames():
+    frames = {"A": _dirty(_bars(seed=1)), "B": _bars(seed=2), "C": _dirty(_bars())}
+    frames["B"].iloc[-3:, :5] = np.nan
+    panel = pd.concat(frames, axis=1).swaplevel(axis=1)
+
+    flags = quality_flags(panel)
+    assert list(flags.columns) == ["A", "B", "C"]
+    for t, df in frames.items():
+        np.testing.assert_array_equal(flags[t], quality_flags(df))
+
+
+def test_quarantine_and_repair():
+    dirty = _dirty(_bars())
+
+    kept, report = screen_ohlcv(dirty, QualityRules(action="quarantine"))
+    assert len(kept) == len(dirty) - 8
+    assert report.counts == {"bad_range": 1, "nonpositive": 1, "stale": 5, "spike": 1}
+
+    fixed, report = screen_ohlcv(dirty, QualityRules(action="repair"))
+    assert report.n_flagged == 8
+    # Stale bars are only flagged; the others are fixed in place
+    assert len(fixed) == len(dirty)
+    assert (fixed["High"] >= fixed["Low"]).all()
+    for i in (20, 30):
+        row = fixed.iloc[i]
+        assert (
+            row[["Open", "High", "Low", "Close"]] == dirty["Close"].iloc[i - 1]
+        ).all()
+        assert row["Adj Close"] == dirty["Adj Close"].iloc[i - 1]
+    assert np.isfinite(np.log(fixed["Close"]).diff().iloc[1:]).all()
+    assert (quality_flags(fixed) == STALE).sum() == 5
+
+    # No earlier close to carry forward: the bar is dropped
+    head = dirty.copy()
+    head.iloc[0, head.columns.get_loc("Close")] = -1.0
+    assert screen_ohlcv(head, QualityRules(action="repair"))[0].index[0] == (
+        head.index[1]
+    )
+
+    with pytest.raises(ValueError):
+        QualityRules(action="drop")
+
+
+class HistoryProvider(DataProvider):
+    def __init__(self, df):
+        self.df = df
+
+    def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+        return {tickers: self.df.loc[start:end].copy()}
+
+
+def test_stack_screens_before_caching(tmp_path):
+    dirty = _dirty(_bars())
+    # A bad tick on the last bar of the first fetch
+    dirty.iloc[99, dirty.columns.get_loc("Close")] *= 0.5
+    stack = (
+        DataStackBuilder()
+        .with_provider(HistoryProvider(dirty))
+        .with_parquet_cache(tmp_path)
+        .with_quality_checks(action="repair", stale_bars=0)
+        .build()
+    )
+
+    (df,) = stack.get_ohlcv("X", "2020-01-01", "2020-04-09", verbose=False)
+    assert len(df) == 100
+    pd.testing.assert_frame_equal(stack.cache.read("X", "1d"), df, check_freq=False)
+    quality = stack.cache.read_meta("X", "1d")["quality"]
+    assert quality["action"] == "repair"
+    assert quality["counts"]["spike"] == 1
+    assert [b["flags"] for b in quality["bars"]] == [
+        ["bad_range"],
+        ["nonpositive"],
+        ["spike"],
+    ]
+    assert df["Close"].iloc[-1] == dirty["Close"].iloc[99]
+
+    # The next bar confirms the last one as a spike
+    stack.get_ohlcv("X", "2020-01-01", "2020-04-30", verbose=False)
+    cached = stack.cache.read("X", "1d")
+    assert cached["Close"].iloc[99] == dirty["Close"].iloc[98]
+    assert stack.cache.read_meta("X", "1d")["quality"]["counts"]["spike"] == 1
+
+    plain = DataStackBuilder().with_parquet_cache(tmp_path / "plain")
+    stack = plain.with_provider(HistoryProvider(dirty)).build()
+    (raw,) = stack.get_ohlcv("X", "2020-01-01", "2020-04-09", verbose=False)
+    assert "quality" not in stack.cache.read_meta("X", "1d")
+    assert raw["Close"].iloc[20] == 0.0
+
+
+class LoggingProvider(HistoryProvider):
+    def __init__(self, df):
+        super().__init__(df)
+        self.calls = []
+
+    def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+        self.calls.append((start, end))
+        return super().fetch_ohlcv(tickers, start, end, timeframe, **kwargs)
+
+
+@pytest.mark.parametrize("action", ["repair", "quarantine"])
+def test_revision_probe_ignores_screened_bars(tmp_path, action):
+    raw = _bars()
+    raw.iloc[95, raw.columns.get_loc("Close")] *= 3.0
+    provider = LoggingProvider(raw)
+    stack = (
+        DataStackBuilder()
+        .with_provider(provider)
+        .with_parquet_cache(tmp_path)
+        .with_revision_probe(5)
+        .with_quality_checks(action=action)
+        .build()
+    )
+    stack.get_ohlcv("X", "2020-01-01", "2020-04-05", verbose=False)
+    first = stack.cache.read("X", "1d")
+
+    # The provider keeps serving the raw tick while it sits in the probe window
+    for end in pd.date_range("2020-04-06", periods=6, freq="D"):
+        stack.get_ohlcv("X", "2020-01-01", str(end.date()), verbose=False)
+
+    assert all(start != "2020-01-01" for start, _ in provider.calls[1:])
+    assert "adjustment_events" not in stack.cache.read_meta("X", "1d")
+    cached = stack.cache.read("X", "1d")
+    pd.testing.assert_frame_equal(
+        cached.loc[: first.index[-2]], first.iloc[:-1], check_freq=False
+    )
+    if action == "repair":
+        assert cached["Close"].iloc[95] == raw["Close"].iloc[94]
+    else:
+        assert raw.index[95] not in cached.index
+
+
+def test_quarantined_last_bar_is_not_refetched(tmp_path):
+    raw = _bars()
+    bad = raw.copy()
+    bad.iloc[99, bad.columns.get_loc("Close")] = 0.0
+    provider = LoggingProvider(bad)
+    stack = (
+        DataStackBuilder()
+        .with_provider(provider)
+        .with_parquet_cache(tmp_path)
+        .with_quality_checks(action="quarantine")
+        .build()
+    )
+
+    (df,) = stack.get_ohlcv("X", "2020-01-01", "2020-04-09", verbose=False)
+    assert df.index[-1] == raw.index[98]
+    assert stack.cache.read_meta("X", "1d")["quarantined"] == [
+        raw.index[99].isoformat()
+    ]
+
+    for _ in range(3):
+        stack.get_ohlcv("X", "2020-01-01", "2020-04-09", verbose=False)
+    assert len(provider.calls) == 1
+
+    # Extending the range fetches the bar again; once fixed it is cached
+    provider.df = raw
+    (df,) = stack.get_ohlcv("X", "2020-01-01", "2020-04-10", verbose=False)
+    assert provider.calls[-1] == ("2020-04-09", "2020-04-10")
+    assert df.index[-2] == raw.index[99]
+    assert stack.cache.read_meta("X", "1d")["quarantined"] == []
@@ -0,0 +1,206 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from trading_lab.data.__main__ import _parse_args
+from trading_lab.data.cache.policy import CachePolicy
+from trading_lab.data.datastack import DataStackBuilder
+from trading_lab.data.providers.base import DataProvider
+from trading_lab.data.refresh import plan_refresh, read_universe, refresh_universe
+
+
+def _mk_ohlcv(start: str, end: str) -> pd.DataFrame:
+    idx = pd.date_range(start=start, end=end, freq="D")
+    return pd.DataFrame(
+        {c: range(len(idx)) for c in ("Open", "High", "Low", "Close")}
+        | {"Volume": [100] * len(idx)},
+        index=idx,
+    )
+
+
+class DummyProvider(DataProvider):
+    """
+    Deterministic provider; tickers in `broken` raise on fetch.
+    """
+
+    def __init__(self, data_by_ticker, broken=()):
+        self.data_by_ticker = data_by_ticker
+        self.broken = set(broken)
+        self.calls: list[tuple[str, str]] = []
+
+    def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+        self.calls.append((tickers, timeframe))
+        if tickers in self.broken:
+            raise ConnectionError("provider down")
+        df = self.data_by_ticker.get(tickers)
+        return {} if df is None else {tickers: df.loc[start:end].copy()}
+
+
+@pytest.fixture
+def universe(tmp_path):
+    path = tmp_path / "universe.txt"
+    path.write_text("# core\nAAA\nBBB, CCC\n\nAAA  # dup\n")
+    return path
+
+
+def _stack(tmp_path, provider):
+    return (
+        DataStackBuilder()
+        .with_provider(provider)
+        .with_parquet_cache(tmp_path / "cache")
+        .build()
+    )
+
+
+def test_read_universe(universe):
+    assert read_universe(universe) == ["AAA", "BBB", "CCC"]
+
+
+def test_plan_skips_up_to_date(tmp_path):
+    data = {t: _mk_ohlcv("2000-01-01", "2000-01-31") for t in ("AAA", "BBB")}
+    stack = _stack(tmp_path, DummyProvider(data))
+    stack.get_ohlcv("AAA", "2000-01-01", "2000-01-31", verbose=False)
+
+    tasks, up_to_date = plan_refresh(
+        stack, ["AAA", "BBB"], ["1d"], "2000-01-01", "2000-01-31"
+    )
+
+    assert up_to_date == 1
+    assert [(t.ticker, t.segments) for t in tasks] == [
+        ("BBB", [("2000-01-01", "2000-01-31")])
+    ]
+
+
+def test_programming_errors_are_not_recorded_as_failures(tmp_path):
+    class BuggyProvider(DummyProvider):
+        def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+            raise TypeError("bad call")
+
+    stack = _stack(tmp_path, BuggyProvider({}))
+    assert stack.plan("AAA", "1d", "2000-01-01", "2000-01-31") == [
+        ("2000-01-01", "2000-01-31")
+    ]
+    with pytest.raises(TypeError):
+        refresh_universe(
+            stack, ["AAA"], ["1d"], "2000-01-01", "2000-01-31", verbose=False
+        )
+
+
+def test_refresh_reports_failures_and_resumes(tmp_path, universe):
+    data = {t: _mk_ohlcv("2000-01-01", "2000-01-31") for t in ("AAA", "BBB", "CCC")}
+    provider = DummyProvider(data, broken={"BBB"})
+    stack = _stack(tmp_path, provider)
+    out = io.StringIO()
+
+    summary = refresh_universe(
+        stack,
+        read_universe(universe),
+        ["1d"],
+        "2000-01-01",
+        "2000-01-31",
+        workers=3,
+        out=out,
+    )
+
+    assert summary.planned == 3
+    assert [(f.ticker, f.error) for f in summary.failures] == [
+        ("BBB", "ConnectionError: provider down")
+    ]
+    assert summary.rows == 62
+    assert "[REFRESH] 3/3" in out.getvalue()
+    assert "FAIL  BBB 1d" in summary.format()
+
+    journal = tmp_path / "cache" / "refresh_journal.jsonl"
+    records = [json.loads(x) for x in journal.read_text().splitlines()]
+    assert sorted(r["ticker"] for r in records) == ["AAA", "BBB", "CCC"]
+
+    # Second run: only the failed ticker is retried
+    provider.broken.clear()
+    provider.calls.clear()
+    summary = refresh_universe(
+        stack,
+        ["AAA", "BBB", "CCC"],
+        ["1d"],
+        "2000-01-01",
+        "2000-01-31",
+        verbose=False,
+    )
+    assert provider.calls == [("BBB", "1d")]
+    assert summary.planned == 1 and not summary.failures
+
+
+def test_resume_skips_journaled_tasks(tmp_path):
+    data = {"AAA": _mk_ohlcv("2000-01-01", "2000-01-31")}
+    provider = DummyProvider(data)
+    stack = _stack(tmp_path, provider)
+    journal = tmp_path / "journal.jsonl"
+    journal.write_text(
+        json.dumps(
+            {
+                "ticker": "AAA",
+                "timeframe": "1d",
+                "status": "ok",
+                "start": "2000-01-01",
+                "end": "2000-01-31",
+            }
+        )
+        + "\n{torn"
+    )
+
+    summary = refresh_universe(
+        stack,
+        ["AAA"],
+        ["1d"],
+        "2000-01-01",
+        "2000-01-31",
+        journal=journal,
+        verbose=False,
+    )
+    assert summary.resumed == 1 and summary.planned == 0
+    assert provider.calls == []
+
+
+def test_cli_args():
+    args = _parse_args(
+        [
+            "refresh",
+            "--universe",
+            "u.txt",
+            "--start",
+            "2000-01-01",
+            "--timeframes",
+            "1d,1h",
+        ]
+    )
+    assert args.command == "refresh"
+    assert args.workers == 4 and not args.no_resume
+
+    sharded = _parse_args(
+        ["refresh", "--universe", "u.txt", "--start", "2000-01-01", "--shard", "0/2"]
+    )
+    assert sharded.shard == "0/2"
+    with pytest.raises(SystemExit):
+        _parse_args(
+            ["refresh", "--universe", "u.txt", "--start", "2000-01-01"]
+            + ["--shard", "0/2", "--workers", "8"]
+        )
+
+
+def test_refresh_flushes_the_cache(tmp_path, monkeypatch):
+    data = {t: _mk_ohlcv("2000-01-01", "2000-01-31") for t in ("AAA", "BBB")}
+    stack = (
+        DataStackBuilder()
+        .with_provider(DummyProvider(data))
+        .with_parquet_cache(tmp_path / "cache", policy=CachePolicy(max_bytes=10**9))
+        .build()
+    )
+    flushes = []
+    monkeypatch.setattr(stack.cache, "flush", lambda: flushes.append(1))
+
+    refresh_universe(
+        stack, ["AAA", "BBB"], ["1d"], "2000-01-01", "2000-01-31", verbose=False
+    )
+
+    assert flushes == [1]
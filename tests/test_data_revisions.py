@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+from trading_lab.data.datastack import DataStackBuilder
+from trading_lab.data.providers.base import DataProvider
+from trading_lab.data.revisions import (
+    REFETCH,
+    RESCALE,
+    UNCHANGED,
+    apply_rescale,
+    detect_revision,
+)
+
+
+def _mk_ohlcv(start: str, end: str) -> pd.DataFrame:
+    idx = pd.date_range(start=start, end=end, freq="D")
+    px = 100.0 + np.arange(len(idx))
+    return pd.DataFrame(
+        {
+            "Open": px,
+            "High": px + 1,
+            "Low": px - 1,
+            "Close": px,
+            "Adj Close": px,
+            "Volume": [1000.0] * len(idx),
+        },
+        index=idx,
+    )
+
+
+class MutableProvider(DataProvider):
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.calls: list[tuple[str, str]] = []
+
+    def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+        self.calls.append((start, end))
+        return {tickers: self.df.loc[start:end].copy()}
+
+
+def test_detect_revision_unchanged_rescale_refetch():
+    cached = _mk_ohlcv("2000-01-01", "2000-01-10")
+
+    assert detect_revision(cached, cached.iloc[-3:].copy()).kind == UNCHANGED
+
+    dividend = cached.copy()
+    dividend["Adj Close"] *= 0.97
+    check = detect_revision(cached, dividend.iloc[-3:])
+    assert check.kind == RESCALE
+    assert set(check.factors) == {"Adj Close"}
+    assert np.isclose(check.factors["Adj Close"], 0.97)
+
+    fixed = cached.copy()
+    fixed.iloc[-1, fixed.columns.get_loc("Close")] += 5.0
+    assert detect_revision(cached, fixed.iloc[-3:]).kind == REFETCH
+
+
+def test_volume_is_checked_against_the_price_factor():
+    cached = _mk_ohlcv("2000-01-01", "2000-01-10")
+
+    # A late volume correction is not a revision
+    late = cached.copy()
+    late.iloc[-3, late.columns.get_loc("Volume")] = 1250.0
+    assert detect_revision(cached, late.iloc[-4:]).kind == UNCHANGED
+
+    # A 2:1 split halves every price and doubles the volume
+    split = cached.copy()
+    prices = ["Open", "High", "Low", "Close", "Adj Close"]
+    split[prices] *= 0.5
+    split["Volume"] *= 2.0
+    check = detect_revision(cached, split.iloc[-3:])
+    assert check.kind == RESCALE
+    assert check.factors == dict.fromkeys(prices, 0.5) | {"Volume": 2.0}
+
+    # Volume is only rescaled along with a matching price factor
+    split["Volume"] = cached["Volume"] * 3.0
+    assert "Volume" not in detect_revision(cached, split.iloc[-3:]).factors
+
+    event = check.event("2000-01-08", "2000-01-10", now=pd.Timestamp("2000-01-11"))
+    assert event["detected_at"] == "2000-01-11 00:00:00"
+    assert pd.Timestamp(check.event("a", "b")["detected_at"]).tz is None
+
+
+def test_apply_rescale_limits_rows():
+    df = _mk_ohlcv("2000-01-01", "2000-01-05")
+
+    out = apply_rescale(df, {"Adj Close": 0.5}, rows=df.index[:2])
+
+    assert np.allclose(out["Adj Close"].iloc[:2], df["Adj Close"].iloc[:2] * 0.5)
+    assert np.allclose(out["Adj Close"].iloc[2:], df["Adj Close"].iloc[2:])
+
+
+def test_probe_rescales_cached_history_on_extension(tmp_path):
+    provider = MutableProvider(_mk_ohlcv("2000-01-01", "2000-01-20"))
+    ds = (
+        DataStackBuilder()
+        .with_provider(provider)
+        .with_parquet_cache(tmp_path)
+        .with_revision_probe(3)
+        .build()
+    )
+    ds.get_ohlcv("X", start="2000-01-01", end="2000-01-10", verbose=False)
+
+    # A dividend goes ex after the cached range: all history is re-adjusted
+    revised = _mk_ohlcv("2000-01-01", "2000-01-20")
+    revised.loc[:"2000-01-14", "Adj Close"] *= 0.98
+    provider.df = revised
+
+    (df,) = ds.get_ohlcv("X", start="2000-01-01", end="2000-01-15", verbose=False)
+
+    assert len(provider.calls) == 2
+    assert provider.calls[-1][0] == "2000-01-07"
+    assert np.allclose(df["Adj Close"], revised.loc[:"2000-01-15", "Adj Close"])
+    events = ds.cache.read_meta("X", "1d")["adjustment_events"]
+    assert events[-1]["type"] == RESCALE
+
+
+def test_probe_ignores_updates_of_the_last_cached_bar(tmp_path):
+    provider = MutableProvider(_mk_ohlcv("2000-01-01", "2000-01-20"))
+    ds = (
+        DataStackBuilder()
+        .with_provider(provider)
+        .with_parquet_cache(tmp_path)
+        .with_revision_probe(3)
+        .build()
+    )
+    # The last bar was cached while still forming
+    partial = _mk_ohlcv("2000-01-01", "2000-01-20")
+    partial.loc["2000-01-10", ["High", "Close"]] = [106.0, 104.5]
+    provider.df = partial
+    ds.get_ohlcv("X", start="2000-01-01", end="2000-01-10", verbose=False)
+
+    provider.df = _mk_ohlcv("2000-01-01", "2000-01-20")
+    (df,) = ds.get_ohlcv("X", start="2000-01-01", end="2000-01-15", verbose=False)
+
+    assert provider.calls[-1] == ("2000-01-07", "2000-01-15")
+    assert len(provider.calls) == 2
+    assert df.loc["2000-01-10", "Close"] == 109.0
+    assert "adjustment_events" not in ds.cache.read_meta("X", "1d")
+
+
+def test_check_revisions_refetches_only_changed_tickers(tmp_path):
+    base = _mk_ohlcv("2000-01-01", "2000-01-10")
+
+    class Universe(DataProvider):
+        def __init__(self):
+            self.data = {"A": base.copy(), "B": base.copy()}
+            self.calls: list[str] = []
+
+        def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+            self.calls.append(tickers)
+            return {tickers: self.data[tickers].loc[start:end].copy()}
+
+    provider = Universe()
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+    ds.get_ohlcv(["A", "B"], start="2000-01-01", end="2000-01-10", verbose=False)
+    provider.calls.clear()
+
+    provider.data["B"].loc["2000-01-09", "Close"] = 500.0
+    checks = ds.check_revisions(["A", "B"], probe_bars=3, verbose=False)
+
+    assert checks["A"].kind == UNCHANGED
+    assert checks["B"].kind == REFETCH
+    assert provider.calls == ["A", "B", "B"]
+    assert ds.cache.read("B", "1d").loc["2000-01-09", "Close"] == 500.0
@@ -0,0 +1,225 @@
+import json
+import multiprocessing as mp
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from trading_lab.data.datastack import DataStackBuilder
+from trading_lab.data.providers.base import DataProvider
+from trading_lab.data.shard import (
+    RUN_DIR,
+    LeaseQueue,
+    _item_key,
+    run_id_for,
+    run_sharded_refresh,
+    shard_of,
+)
+
+TICKERS = [f"T{i:02d}" for i in range(12)]
+START, END = "2000-01-01", "2000-01-20"
+
+
+class LoggingProvider(DataProvider):
+    """
+    Synthetic daily bars; appends one line per fetch to a shared log file.
+    """
+
+    def __init__(self, log_path, delay=0.0, broken=()):
+        self.log_path = log_path
+        self.delay = delay
+        self.broken = set(broken)
+
+    def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+        with open(self.log_path, "a") as f:
+            f.write(f"{os.getpid()} {tickers}\n")
+        time.sleep(self.delay)
+        if tickers in self.broken:
+            raise ConnectionError("provider down")
+        idx = pd.date_range(start, end, freq="D")
+        df = pd.DataFrame({"Close": range(len(idx))}, index=idx, dtype=float)
+        return {tickers: df}
+
+
+def _stack(cache_dir, log_path, **kw):
+    return (
+        DataStackBuilder()
+        .with_provider(LoggingProvider(log_path, **kw))
+        .with_parquet_cache(cache_dir)
+        .build()
+    )
+
+
+def _worker(cache_dir, log_path, shard, n_shards):
+    stack = _stack(cache_dir, log_path, delay=0.02)
+    run_sharded_refresh(
+        stack,
+        TICKERS,
+        ["1d"],
+        START,
+        END,
+        shard=shard,
+        n_shards=n_shards,
+        worker_id=f"w{shard}",
+        poll=0.05,
+        verbose=False,
+    )
+
+
+def _run_dir(cache_dir):
+    return cache_dir / RUN_DIR / run_id_for(TICKERS, ["1d"], START, END)
+
+
+def test_shard_of_is_stable_and_spread():
+    assert shard_of("AAPL", 4) == shard_of("AAPL", 4)
+    counts = pd.Series([shard_of(f"X{i}", 4) for i in range(400)]).value_counts()
+    assert len(counts) == 4 and counts.min() > 60
+
+
+def test_processes_share_one_directory(tmp_path):
+    cache_dir = tmp_path / "cache"
+    log_path = tmp_path / "fetch.log"
+    ctx = mp.get_context("fork")
+    procs = [
+        ctx.Process(target=_worker, args=(cache_dir, log_path, i, 3)) for i in range(3)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    fetched = [line.split()[1] for line in log_path.read_text().splitlines()]
+    assert sorted(fetched) == TICKERS
+    assert len({line.split()[0] for line in log_path.read_text().splitlines()}) > 1
+
+    manifest = json.loads((_run_dir(cache_dir) / "manifest.json").read_text())
+    assert len(manifest["items"]) == len(TICKERS)
+    assert {r["status"] for r in manifest["items"].values()} == {"ok"}
+    assert set(manifest["workers"]) <= {"w0", "w1", "w2"}
+    assert all((cache_dir / f"{t}_1d.parquet").exists() for t in TICKERS)
+
+
+def test_single_worker_steals_other_shards_and_expired_leases(tmp_path):
+    cache_dir = tmp_path / "cache"
+    log_path = tmp_path / "fetch.log"
+    root = _run_dir(cache_dir)
+
+    # A crashed worker left a lease that has already expired...
+    dead = LeaseQueue(root, "dead", lease_ttl=-1.0)
+    assert dead.claim(_item_key("T03", "1d"))
+    # ...and a live worker holds one that expires shortly
+    live = LeaseQueue(root, "live", lease_ttl=0.3)
+    assert live.claim(_item_key("T04", "1d"))
+
+    stack = _stack(cache_dir, log_path)
+    summary = run_sharded_refresh(
+        stack,
+        TICKERS,
+        ["1d"],
+        START,
+        END,
+        shard=0,
+        n_shards=4,
+        poll=0.05,
+        verbose=False,
+    )
+
+    assert len(summary.results) == len(TICKERS)
+    fetched = [line.split()[1] for line in log_path.read_text().splitlines()]
+    assert sorted(fetched) == TICKERS
+    assert (root / "manifest.json").exists()
+
+    # Re-running the same refresh is a no-op
+    again = run_sharded_refresh(
+        stack, TICKERS, ["1d"], START, END, shard=1, n_shards=4, verbose=False
+    )
+    assert again.results == []
+
+
+def test_failures_are_recorded_and_retried_on_request(tmp_path):
+    cache_dir = tmp_path / "cache"
+    log_path = tmp_path / "fetch.log"
+
+    stack = _stack(cache_dir, log_path, broken={"T05"})
+    summary = run_sharded_refresh(
+        stack, TICKERS, ["1d"], START, END, shard=0, n_shards=1, verbose=False
+    )
+    assert [f.ticker for f in summary.failures] == ["T05"]
+    manifest = json.loads((_run_dir(cache_dir) / "manifest.json").read_text())
+    assert manifest["items"][_item_key("T05", "1d")]["status"] == "error"
+
+    stack = _stack(cache_dir, log_path)
+    summary = run_sharded_refresh(
+        stack,
+        TICKERS,
+        ["1d"],
+        START,
+        END,
+        shard=0,
+        n_shards=1,
+        verbose=False,
+        retry_failed=True,
+    )
+    assert [r.ticker for r in summary.results] == ["T05"]
+    assert not summary.failures
+
+
+def test_claim_is_exclusive(tmp_path):
+    a = LeaseQueue(tmp_path, "a")
+    b = LeaseQueue(tmp_path, "b")
+    assert a.claim("k")
+    assert not b.claim("k")
+    a.complete("k", {"status": "ok"})
+    assert not b.claim("k")
+
+    with pytest.raises(ValueError):
+        run_sharded_refresh(None, [], ["1d"], START, END, shard=2, n_shards=2)
+
+
+def test_heartbeat_keeps_slow_items_from_being_stolen(tmp_path):
+    cache_dir = tmp_path / "cache"
+    log_path = tmp_path / "fetch.log"
+    # Home shards 1 and 0
+    tickers = ["T00", "T03"]
+
+    def worker(shard):
+        # Worker 1 is done with its own item long before worker 0's expires
+        run_sharded_refresh(
+            _stack(cache_dir, log_path, delay=0.6 if shard == 0 else 0.0),
+            tickers,
+            ["1d"],
+            START,
+            END,
+            shard=shard,
+            n_shards=2,
+            worker_id=f"w{shard}",
+            lease_ttl=0.15,
+            poll=0.05,
+            verbose=False,
+        )
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(2)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join(timeout=30)
+
+    fetched = [line.split()[1] for line in log_path.read_text().splitlines()]
+    assert sorted(fetched) == tickers
+
+
+def test_empty_lease_expires_after_ttl(tmp_path):
+    queue = LeaseQueue(tmp_path, "b", lease_ttl=60.0)
+    # A worker died between creating its lease and writing it
+    lease = tmp_path / "leases" / "k.lease"
+    lease.touch()
+    assert queue.is_leased("k") and not queue.claim("k")
+
+    old = time.time() - 120
+    os.utime(lease, (old, old))
+    assert queue.claim("k")
+    assert json.loads(lease.read_text())["worker"] == "b"
+    assert queue.renew("k") and not LeaseQueue(tmp_path, "c").renew("k")
@@ -1,8 +1,10 @@
+import asyncio
+
 import pandas as pd
 import pytest
 
 from trading_lab.data.datastack import DataStackBuilder
-from trading_lab.data.providers.base import DataProvider
+from trading_lab.data.providers.base import AsyncDataProvider, DataProvider
 
 
 def _mk_ohlcv(start: str, end: str) -> pd.DataFrame:
@@ -202,3 +204,216 @@ def test_stack_multiple_tickers_single_call(tmp_path):
     # cache files exist for both tickers
     assert (tmp_path / "FCHI_1d.parquet").exists()
     assert (tmp_path / "STOXX_1d.parquet").exists()
+
+
+class SlowAsyncProvider(AsyncDataProvider):
+    """
+    Async provider with per-ticker delays, tracking peak concurrency.
+    """
+
+    def __init__(self, data_by_ticker: dict[str, pd.DataFrame], delays: dict):
+        self.data_by_ticker = data_by_ticker
+        self.delays = delays
+        self.in_flight = 0
+        self.peak = 0
+
+    async def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(tickers, 0.0))
+        finally:
+            self.in_flight -= 1
+        return {tickers: self.data_by_ticker[tickers].loc[start:end].copy()}
+
+
+def test_aget_ohlcv_wraps_blocking_provider(tmp_path):
+    """
+    A blocking provider is offloaded to an executor and results match get_ohlcv.
+    """
+    provider = DummyProvider(
+        {
+            "^FCHI": _mk_ohlcv("2000-01-01", "2000-01-10"),
+            "^STOXX": _mk_ohlcv("2000-01-01", "2000-01-10"),
+        }
+    )
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+
+    async def collect():
+        return {
+            t: df
+            async for t, df in ds.aget_ohlcv(
+                ["^FCHI", "^STOXX"],
+                start="2000-01-03",
+                end="2000-01-06",
+                verbose=False,
+            )
+        }
+
+    out = asyncio.run(collect())
+
+    assert set(out) == {"^FCHI", "^STOXX"}
+    assert out["^FCHI"].index.min() == pd.Timestamp("2000-01-03")
+    assert out["^FCHI"].index.max() == pd.Timestamp("2000-01-06")
+    assert (tmp_path / "STOXX_1d.parquet").exists()
+
+
+def test_aget_ohlcv_streams_in_completion_order_with_bounded_concurrency(tmp_path):
+    data = {t: _mk_ohlcv("2000-01-01", "2000-01-10") for t in ("A", "B", "C", "D")}
+    provider = SlowAsyncProvider(data, delays={"A": 0.2, "B": 0.0, "C": 0.05, "D": 0.0})
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+
+    async def collect():
+        return [
+            t
+            async for t, _ in ds.aget_ohlcv(
+                ["A", "B", "C", "D"],
+                start="2000-01-01",
+                end="2000-01-05",
+                verbose=False,
+                max_concurrency=2,
+            )
+        ]
+
+    order = asyncio.run(collect())
+
+    assert sorted(order) == ["A", "B", "C", "D"]
+    assert order[-1] == "A"
+    assert provider.peak <= 2
+
+
+def test_aget_ohlcv_early_close_cancels_pending(tmp_path):
+    data = {t: _mk_ohlcv("2000-01-01", "2000-01-10") for t in ("FAST", "SLOW")}
+    provider = SlowAsyncProvider(data, delays={"FAST": 0.0, "SLOW": 10.0})
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+
+    async def first_only():
+        it = ds.aget_ohlcv(
+            ["FAST", "SLOW"], start="2000-01-01", end="2000-01-05", verbose=False
+        )
+        first = await it.__anext__()
+        await it.aclose()
+        return first[0]
+
+    assert asyncio.run(asyncio.wait_for(first_only(), timeout=5)) == "FAST"
+    assert provider.in_flight == 0
+    assert not (tmp_path / "SLOW_1d.parquet").exists()
+
+
+def test_blocking_methods_reject_async_provider(tmp_path):
+    provider = SlowAsyncProvider({"A": _mk_ohlcv("2000-01-01", "2000-01-10")}, {})
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+
+    with pytest.raises(TypeError, match="sync needs a blocking"):
+        ds.get_ohlcv("A", start="2000-01-01", end="2000-01-05", verbose=False)
+    with pytest.raises(TypeError, match="check_revisions needs a blocking"):
+        ds.check_revisions("A", verbose=False)
+
+
+def test_iter_ohlcv_yields_pairs_in_input_order(tmp_path):
+    provider = DummyProvider(
+        {
+            "^FCHI": _mk_ohlcv("2000-01-01", "2000-01-10"),
+            "^STOXX": _mk_ohlcv("2000-01-01", "2000-01-10"),
+        }
+    )
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+
+    it = ds.iter_ohlcv(
+        ["^FCHI", "^STOXX"], start="2000-01-03", end="2000-01-06", verbose=False
+    )
+    pairs = list(it)
+
+    assert [t for t, _ in pairs] == ["^FCHI", "^STOXX"]
+    assert pairs[1][1].index.min() == pd.Timestamp("2000-01-03")
+    assert pairs[1][1].index.max() == pd.Timestamp("2000-01-06")
+
+
+def test_iter_ohlcv_chunked_matches_full_slice(tmp_path):
+    full = _mk_ohlcv("2000-01-01", "2000-01-31")
+    provider = DummyProvider({"^FCHI": full})
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+
+    chunks = list(
+        ds.iter_ohlcv(
+            "^FCHI", start="2000-01-02", end="2000-01-20", verbose=False, chunk="7D"
+        )
+    )
+    (expected,) = ds.get_ohlcv(
+        "^FCHI", start="2000-01-02", end="2000-01-20", verbose=False
+    )
+
+    assert len(chunks) == 3
+    assert all(len(df) <= 7 for _, df in chunks)
+    stitched = pd.concat([df for _, df in chunks])
+    pd.testing.assert_frame_equal(stitched, expected, check_freq=False)
+
+    # Chunked reads come from the cache: only the initial sync hit the provider
+    assert len(provider.calls) == 1
+
+
+def test_parquet_read_range_prunes_rows_and_columns(tmp_path):
+    provider = DummyProvider({"^FCHI": _mk_ohlcv("2000-01-01", "2000-01-10")})
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+    ds.get_ohlcv("^FCHI", start="2000-01-01", end="2000-01-10", verbose=False)
+
+    df = ds.cache.read_range(
+        "^FCHI", "1d", start="2000-01-03", end="2000-01-05", columns=["Adj Close"]
+    )
+
+    assert list(df.columns) == ["Adj Close"]
+    assert df.index.min() == pd.Timestamp("2000-01-03")
+    assert df.index.max() == pd.Timestamp("2000-01-05")
+
+
+def test_parquet_read_range_keeps_partial_date_periods(tmp_path):
+    full = _mk_ohlcv("2000-01-01", "2001-03-31")
+    provider = DummyProvider({"^FCHI": full})
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+    ds.get_ohlcv("^FCHI", start="2000-01-01", end="2001-03-31", verbose=False)
+
+    # A month or year end bound covers its whole period, as with .loc
+    for start, end in [
+        ("2000-01", "2000-01"),
+        ("2000-02-15", "2000"),
+        ("2000-12-30", "2001-02"),
+    ]:
+        df = ds.cache.read_range("^FCHI", "1d", start=start, end=end)
+        pd.testing.assert_frame_equal(df, full.loc[start:end], check_freq=False)
+
+
+def test_lazy_defers_io_until_collect(tmp_path):
+    provider = DummyProvider({"^FCHI": _mk_ohlcv("2000-01-01", "2000-01-10")})
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+
+    handle = ds.lazy("^FCHI", start="2000-01-02", end="2000-01-06", verbose=False)
+    handle = handle["Adj Close"].pipe(lambda s: s * 2)
+
+    assert provider.calls == []
+    assert not (tmp_path / "FCHI_1d.parquet").exists()
+
+    out = handle.collect()
+
+    assert isinstance(out, pd.Series)
+    assert out.name == "Adj Close"
+    assert out.index.min() == pd.Timestamp("2000-01-02")
+    assert out.index.max() == pd.Timestamp("2000-01-06")
+    assert out.iloc[0] == 2.0
+
+
+def test_lazy_projection_and_cache_hit(tmp_path):
+    provider = DummyProvider({"^FCHI": _mk_ohlcv("2000-01-01", "2000-01-10")})
+    ds = DataStackBuilder().with_provider(provider).with_parquet_cache(tmp_path).build()
+    ds.get_ohlcv("^FCHI", start="2000-01-01", end="2000-01-10", verbose=False)
+    calls = len(provider.calls)
+
+    out = (
+        ds.lazy("^FCHI", start="2000-01-01", end="2000-01-10", verbose=False)
+        .select("Open", "Close")
+        .between("2000-01-03", "2000-01-04")
+        .collect()
+    )
+
+    assert list(out.columns) == ["Open", "Close"]
+    assert len(out) == 2
+    assert len(provider.calls) == calls
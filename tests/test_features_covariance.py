@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.features.covariance import (
+    _ledoit_wolf,
+    ewma_covariance,
+    min_variance_weights,
+    risk_contributions,
+    risk_parity_weights,
+    rolling_covariance,
+)
+
+
+def _returns(n=300, k=5, nan_frac=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    mix = rng.standard_normal((k, k)) * 0.3 + np.eye(k)
+    x = 0.01 * rng.standard_normal((n, k)) @ mix + 0.001
+    x[rng.random(x.shape) < nan_frac] = np.nan
+    idx = pd.date_range("2020-01-01", periods=n, freq="B")
+    return pd.DataFrame(x, index=idx, columns=[f"A{i}" for i in range(k)])
+
+
+def _pandas_rolling_cov(df, window, min_periods=None):
+    roll = df.rolling(window, min_periods=min_periods or window).cov()
+    return roll.to_numpy().reshape(len(df), df.shape[1], df.shape[1])
+
+
+@pytest.mark.parametrize("nan_frac", [0.0, 0.1])
+@pytest.mark.parametrize("window", [2, 20, 60])
+def test_rolling_covariance_matches_pandas(nan_frac, window):
+    df = _returns(nan_frac=nan_frac)
+    mp = max(2, window // 2) if nan_frac else None
+
+    cov = rolling_covariance(df, window, min_periods=mp)
+    expected = _pandas_rolling_cov(df, window, mp)
+
+    assert cov.data.shape == (len(df), 15)
+    assert np.allclose(cov.dense(), expected, equal_nan=True, atol=1e-14)
+
+
+def test_rolling_covariance_step_and_correlation():
+    df = _returns()
+    full = rolling_covariance(df, 40)
+    thin = rolling_covariance(df, 40, step=21, dtype=np.float32)
+
+    assert thin.data.dtype == np.float32
+    assert list(thin.index) == list(df.index[20::21])
+    assert np.allclose(thin.data, full.data[20::21], rtol=1e-5, equal_nan=True)
+
+    corr = full.to_correlation()
+    ts = df.index[-1]
+    expected = df.iloc[-40:].corr()
+    assert np.allclose(corr.at(ts), expected)
+    assert np.allclose(full.diagonal().iloc[-1], df.iloc[-40:].var())
+
+
+def test_ledoit_wolf_matches_reference_formula():
+    rng = np.random.default_rng(3)
+    x = rng.standard_normal((30, 8))
+    xc = x - x.mean(axis=0)
+    n, p = xc.shape
+
+    # Reference (as in sklearn.covariance.ledoit_wolf_shrinkage)
+    s = xc.T @ xc / n
+    mu = np.trace(s) / p
+    delta_ = (s**2).sum()
+    beta = ((xc**2).T @ (xc**2)).sum() / n - delta_
+    beta /= p * n
+    delta = (delta_ - 2 * mu * np.trace(s) + p * mu**2) / p
+    expected_shrink = min(beta, delta) / delta
+
+    iu, ju = np.triu_indices(p)
+    shrunk, shrink = _ledoit_wolf(s[iu, ju], (xc**2).sum(axis=1), n, iu, ju)
+
+    assert shrink == pytest.approx(expected_shrink)
+    expected = (1 - shrink) * s + shrink * mu * np.eye(p)
+    assert np.allclose(shrunk, expected[iu, ju])
+
+
+def test_rolling_covariance_shrinkage_is_better_conditioned():
+    df = _returns(n=120, k=20)
+    raw = rolling_covariance(df, 25).dense(-1)
+    shrunk = rolling_covariance(df, 25, shrinkage=True).dense(-1)
+
+    assert np.linalg.cond(shrunk) < np.linalg.cond(raw)
+    assert np.trace(shrunk) == pytest.approx(np.trace(raw))
+
+
+def test_ewma_covariance_matches_pandas_products():
+    df = _returns(n=200, k=3)
+    cov = ewma_covariance(df, span=30, min_periods=1)
+
+    x = df.to_numpy()
+    for i, j in [(0, 0), (0, 2), (1, 2)]:
+        expected = pd.Series(x[:, i] * x[:, j]).ewm(span=30, adjust=False).mean()
+        assert np.allclose(cov.dense()[:, i, j], expected)
+
+
+def test_ewma_covariance_demeaned_and_min_periods():
+    df = _returns(n=400, k=3)
+    cov = ewma_covariance(df, halflife=200, demean=True, min_periods=10)
+
+    assert not cov.valid[:9].any() and cov.valid[9:].all()
+    m = cov.dense(-1)
+    assert np.allclose(m, m.T)
+    assert np.all(np.linalg.eigvalsh(m) > 0)
+    # Long half-life: close to the sample covariance
+    assert np.allclose(m, df.cov(), rtol=0.35, atol=2e-5)
+
+    with pytest.raises(ValueError):
+        ewma_covariance(df, span=10, halflife=5)
+
+
+def test_min_variance_and_risk_parity_weights():
+    df = _returns(n=300, k=6, seed=4)
+    cov = rolling_covariance(df, 60, step=5)
+
+    mv = min_variance_weights(cov)
+    rp = risk_parity_weights(cov)
+
+    valid = cov.valid
+    assert mv[~valid].isna().all().all() and rp[~valid].isna().all().all()
+    assert np.allclose(mv[valid].sum(axis=1), 1.0)
+    assert np.allclose(rp[valid].sum(axis=1), 1.0)
+    assert (rp[valid] > 0).all().all()
+
+    rc = risk_contributions(rp[valid], cov)
+    rc = rc.dropna()
+    assert np.allclose(rc, 1.0 / 6, atol=1e-8)
+
+    # Min-variance: gradient S w is proportional to 1 on each date
+    m = cov.dense(np.flatnonzero(valid))
+    g = np.einsum("kij,kj->ki", m, mv[valid].to_numpy())
+    assert np.allclose(g, g[:, :1])
+
+    budget = np.array([3, 1, 1, 1, 1, 1], dtype=float)
+    rb = risk_parity_weights(cov, budget=budget)
+    rc = risk_contributions(rb[valid], cov).dropna()
+    assert np.allclose(rc, budget / budget.sum(), atol=1e-8)
+
+
+@pytest.mark.filterwarnings("error")
+def test_weights_survive_zero_variance_assets():
+    df = _returns(n=300, k=4, seed=5)
+    # A suspended asset: constant returns over the first half
+    df.iloc[:150, 3] = 0.0
+    cov = rolling_covariance(df, 60, step=5)
+    singular = cov.valid & (cov.diagonal()["A3"].abs() < 1e-15).to_numpy()
+    assert singular.any() and (cov.valid & ~singular).any()
+
+    mv = min_variance_weights(cov)
+    assert np.allclose(mv[cov.valid].sum(axis=1), 1.0)
+    # No weight on the riskless direction; the rest is the 3-asset solution
+    assert (mv.loc[singular, "A3"].abs() < 1e-12).all()
+    sub = rolling_covariance(df.iloc[:, :3], 60, step=5)
+    pd.testing.assert_frame_equal(
+        mv.loc[singular, ["A0", "A1", "A2"]],
+        min_variance_weights(sub).loc[singular],
+    )
+
+    rp = risk_parity_weights(cov)
+    assert rp[singular].isna().all().all()
+    assert np.allclose(rp[cov.valid & ~singular].sum(axis=1), 1.0)
@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
 
+from trading_lab.data.datastack import DataStackBuilder
+from trading_lab.data.providers.base import DataProvider
 from trading_lab.features.indicators import rsi
 
 
@@ -26,3 +28,193 @@ def test_rsi_returns_series_without_all_nan():
     # With a flat series, RSI may be NaN due to 0/0; our implementation drops NaNs.
     # Ensure function returns a Series (possibly empty) without raising.
     assert isinstance(out, pd.Series)
+
+
+# ---------------------------------------------------------------------------
+# OHLCV indicators
+# ---------------------------------------------------------------------------
+
+from trading_lab.features.indicators import (
+    atr,
+    bollinger_bands,
+    garman_klass_volatility,
+    macd,
+    obv,
+    parkinson_volatility,
+    stochastic,
+    true_range,
+    vwap,
+    yang_zhang_volatility,
+)
+
+
+def _ohlcv(n=300, seed=0, ticker=None):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-01", periods=n, freq="D")
+    close = 100 * np.exp(np.cumsum(0.01 * rng.standard_normal(n)))
+    open_ = close * np.exp(0.003 * rng.standard_normal(n))
+    high = np.maximum(open_, close) * np.exp(np.abs(0.005 * rng.standard_normal(n)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(0.005 * rng.standard_normal(n)))
+    df = pd.DataFrame(
+        {
+            "Open": open_,
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Volume": rng.integers(1_000, 10_000, n).astype(float),
+        },
+        index=idx,
+    )
+    if ticker:
+        df.attrs["ticker"] = ticker
+    return df
+
+
+def _panel(tickers=("AAA", "BBB", "CCC")):
+    frames = {t: _ohlcv(seed=i) for i, t in enumerate(tickers)}
+    return pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+
+
+def test_rsi_is_float64():
+    idx = pd.date_range("2020-01-01", periods=40, freq="D")
+    px = pd.Series(np.r_[np.linspace(100, 120, 20), np.linspace(120, 110, 20)], idx)
+    assert rsi(px).dtype == np.float64
+
+
+def test_atr_matches_pandas_reference():
+    df = _ohlcv(ticker="AAA")
+    prev = df["Close"].shift(1)
+    tr = pd.concat(
+        [df["High"] - df["Low"], (df["High"] - prev).abs(), (df["Low"] - prev).abs()],
+        axis=1,
+    ).max(axis=1)
+    expected = tr.ewm(alpha=1 / 14, adjust=False).mean().iloc[13:]
+
+    out = atr(df, 14)
+    assert out.name == "AAA_atr_14"
+    assert out.dtype == np.float64
+    assert np.allclose(out, expected)
+    assert np.allclose(true_range(df), tr)
+
+
+def test_bollinger_macd_stochastic():
+    df = _ohlcv()
+    c = df["Close"]
+
+    bb = bollinger_bands(df, 20, 2.0)
+    mid, sd = c.rolling(20).mean(), c.rolling(20).std(ddof=0)
+    assert np.allclose(bb["bb_upper_20_2"], (mid + 2 * sd).dropna())
+    assert np.allclose(bb["bb_lower_20_2"], (mid - 2 * sd).dropna())
+
+    m = macd(df)
+    line = c.ewm(span=12, adjust=False).mean() - c.ewm(span=26, adjust=False).mean()
+    sig = line.ewm(span=9, adjust=False).mean()
+    assert np.allclose(m["macd_12_26_9"], line.loc[m.index])
+    assert np.allclose(m["macd_hist_12_26_9"], (line - sig).loc[m.index])
+
+    st = stochastic(df, 14, 3)
+    hh, ll = df["High"].rolling(14).max(), df["Low"].rolling(14).min()
+    k = 100 * (c - ll) / (hh - ll)
+    assert np.allclose(st["stoch_k_14_3"], k.loc[st.index])
+    assert np.allclose(st["stoch_d_14_3"], k.rolling(3).mean().loc[st.index])
+    assert ((st >= 0) & (st <= 100)).all().all()
+
+
+def test_volume_indicators():
+    df = _ohlcv()
+    c, v = df["Close"], df["Volume"]
+
+    expected_obv = (np.sign(c.diff()).fillna(0) * v).cumsum()
+    assert np.allclose(obv(df), expected_obv)
+
+    tp = (df["High"] + df["Low"] + c) / 3
+    expected = (tp * v).rolling(20).sum() / v.rolling(20).sum()
+    assert np.allclose(vwap(df, 20), expected.dropna())
+    assert np.allclose(vwap(df, None), (tp * v).cumsum() / v.cumsum())
+
+
+def test_range_volatilities():
+    df = _ohlcv()
+    o, h, l, c = (df[k] for k in ("Open", "High", "Low", "Close"))
+    w = 20
+
+    park = np.sqrt((np.log(h / l) ** 2).rolling(w).mean() / (4 * np.log(2)))
+    assert np.allclose(parkinson_volatility(df, w), park.dropna())
+
+    gk = 0.5 * np.log(h / l) ** 2 - (2 * np.log(2) - 1) * np.log(c / o) ** 2
+    assert np.allclose(
+        garman_klass_volatility(df, w), np.sqrt(gk.rolling(w).mean()).dropna()
+    )
+
+    k = 0.34 / (1.34 + (w + 1) / (w - 1))
+    rs = np.log(h / c) * np.log(h / o) + np.log(l / c) * np.log(l / o)
+    yz = np.sqrt(
+        np.log(o / c.shift(1)).rolling(w).var()
+        + k * np.log(c / o).rolling(w).var()
+        + (1 - k) * rs.rolling(w).mean()
+    )
+    assert np.allclose(yang_zhang_volatility(df, w), yz.dropna())
+
+
+def test_panel_matches_per_ticker_frames():
+    panel = _panel()
+
+    out = atr(panel, 14)
+    assert list(out.columns) == ["AAA", "BBB", "CCC"]
+    assert out.columns.name == "atr_14"
+    assert len(out) == len(panel)
+    for t in out.columns:
+        frame = panel.xs(t, axis=1, level=1)
+        assert np.allclose(out[t].dropna(), atr(frame, 14))
+
+    bb = bollinger_bands(panel, 20)
+    assert bb.columns.nlevels == 2
+    frame = panel.xs("BBB", axis=1, level=1)
+    assert np.allclose(
+        bb["bb_mid_20_2"]["BBB"].dropna(), bollinger_bands(frame, 20)["bb_mid_20_2"]
+    )
+
+    yz = yang_zhang_volatility(panel, 10)
+    assert np.allclose(
+        yz["CCC"].dropna(), yang_zhang_volatility(panel.xs("CCC", axis=1, level=1), 10)
+    )
+
+
+def test_panel_warm_up_starts_at_each_asset_first_bar():
+    panel = _panel()
+    panel.loc[panel.index[:50], (slice(None), "BBB")] = np.nan
+
+    out = atr(panel, 14)
+    late = panel.xs("BBB", axis=1, level=1).iloc[50:]
+    pd.testing.assert_series_equal(
+        out["BBB"].dropna(), atr(late, 14), check_names=False
+    )
+    assert out["BBB"].first_valid_index() == panel.index[63]
+
+    m = macd(panel)
+    assert np.allclose(m["macd_signal_12_26_9"]["BBB"].dropna(), macd(late).iloc[:, 1])
+
+
+class FrameProvider(DataProvider):
+    def __init__(self, df):
+        self.df = df
+
+    def fetch_ohlcv(self, tickers, start, end, timeframe, **kwargs):
+        return {tickers: self.df.loc[start:end]}
+
+
+def test_single_frame_names_carry_the_ticker(tmp_path):
+    stack = (
+        DataStackBuilder()
+        .with_provider(FrameProvider(_ohlcv()))
+        .with_parquet_cache(tmp_path)
+        .build()
+    )
+    (df,) = stack.get_ohlcv("AAA", "2020-01-01", "2020-06-30", verbose=False)
+    assert atr(df).name == "AAA_atr_14"
+    assert list(stochastic(df).columns) == ["AAA_stoch_k_14_3", "AAA_stoch_d_14_3"]
+
+    plain = _ohlcv()
+    assert atr(plain).name == "atr_14"
+    assert obv(plain, name="BBB").name == "BBB_obv"
+    assert macd(plain, name="BBB").columns[0] == "BBB_macd_12_26_9"
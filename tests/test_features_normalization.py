@@ -1,7 +1,17 @@
+import warnings
+
 import numpy as np
 import pandas as pd
 
-from trading_lab.features.normalization import zscore, clip_series
+from trading_lab.features.normalization import (
+    zscore,
+    clip_series,
+    cross_sectional_demean,
+    cross_sectional_quantiles,
+    cross_sectional_rank,
+    cross_sectional_winsorize,
+    cross_sectional_zscore,
+)
 
 
 def test_zscore_rolling_properties():
@@ -26,3 +36,98 @@ def test_clip_series_preserves_name():
     assert out.name == "X"
     assert out.min() >= -1.0
     assert out.max() <= 1.0
+
+
+def _panel(n_dates=30, n_assets=12, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-01", periods=n_dates, freq="D")
+    cols = [f"A{i}" for i in range(n_assets)]
+    x = rng.standard_normal((n_dates, n_assets))
+    x[rng.random(x.shape) < 0.15] = np.nan
+    return pd.DataFrame(x, index=idx, columns=cols)
+
+
+def test_cross_sectional_zscore_matches_row_apply():
+    panel = _panel()
+
+    z = cross_sectional_zscore(panel)
+    expected = panel.sub(panel.mean(axis=1), axis=0).div(panel.std(axis=1), axis=0)
+
+    pd.testing.assert_frame_equal(z, expected)
+
+
+def test_cross_sectional_demean_within_groups():
+    panel = _panel()
+    groups = pd.Series(["tech", "energy", "banks"] * 4, index=panel.columns)
+
+    out = cross_sectional_demean(panel, groups)
+
+    for cols in groups.groupby(groups).groups.values():
+        block = panel[cols]
+        expected = block.sub(block.mean(axis=1), axis=0)
+        pd.testing.assert_frame_equal(out[cols], expected)
+
+
+def test_cross_sectional_small_and_empty_groups_stay_local():
+    panel = _panel()
+    groups = pd.Series(
+        ["big"] * 8 + ["pair"] * 2 + ["single", "empty"], index=panel.columns
+    )
+    panel["A11"] = np.nan
+
+    d = cross_sectional_demean(panel, groups)
+    z = cross_sectional_zscore(panel, groups)
+
+    big = panel.iloc[:, :8]
+    pd.testing.assert_frame_equal(d.iloc[:, :8], big.sub(big.mean(axis=1), axis=0))
+    pd.testing.assert_frame_equal(
+        z.iloc[:, :8],
+        big.sub(big.mean(axis=1), axis=0).div(big.std(axis=1), axis=0),
+    )
+    # The single-member group has a mean but no dispersion
+    assert (d["A10"].dropna() == 0).all()
+    assert z["A10"].isna().all()
+    assert d["A11"].isna().all() and z["A11"].isna().all()
+
+
+def test_cross_sectional_zscore_ungrouped_assets_are_nan():
+    panel = _panel()
+    groups = pd.Series(["a"] * 6 + [None] * 6, index=panel.columns)
+
+    z = cross_sectional_zscore(panel, groups)
+
+    assert z.iloc[:, 6:].isna().all().all()
+    assert z.iloc[:, :6].notna().sum().sum() == panel.iloc[:, :6].notna().sum().sum()
+
+
+def test_cross_sectional_rank_pct_ignores_nan():
+    panel = _panel()
+
+    r = cross_sectional_rank(panel)
+
+    assert r.isna().equals(panel.isna())
+    assert (r.max(axis=1) == 1.0).all()
+
+
+def test_cross_sectional_quantiles_match_nanquantile():
+    panel = _panel(n_assets=25)
+    panel.iloc[3] = np.nan
+
+    q = cross_sectional_quantiles(panel, (0.05, 0.5, 0.95))
+
+    with warnings.catch_warnings():
+        # All-NaN row
+        warnings.simplefilter("ignore", RuntimeWarning)
+        expected = np.nanquantile(panel.to_numpy(), [0.05, 0.5, 0.95], axis=1).T
+    assert np.allclose(q, expected, equal_nan=True)
+
+
+def test_cross_sectional_winsorize_clips_to_quantiles():
+    panel = _panel(n_assets=50)
+
+    w = cross_sectional_winsorize(panel, lower=0.1, upper=0.9)
+    bounds = cross_sectional_quantiles(panel, (0.1, 0.9))
+
+    assert w.isna().equals(panel.isna())
+    assert (w.min(axis=1).to_numpy() >= bounds[:, 0] - 1e-12).all()
+    assert (w.max(axis=1).to_numpy() <= bounds[:, 1] + 1e-12).all()
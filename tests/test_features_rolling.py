@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.features.rolling import (
+    rolling_max,
+    rolling_mean,
+    rolling_min,
+    rolling_moments,
+    rolling_std,
+    window_sum,
+)
+
+
+def _panel(n=300, k=4, nan_frac=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((n, k))
+    x[rng.random(x.shape) < nan_frac] = np.nan
+    return x
+
+
+@pytest.mark.parametrize("window", [1, 3, 20, 299, 300, 400])
+@pytest.mark.parametrize("min_periods", [None, 1])
+def test_rolling_moments_match_pandas(window, min_periods):
+    x = _panel()
+    roll = pd.DataFrame(x).rolling(window, min_periods=min_periods or window)
+
+    m = rolling_moments(x, window, min_periods=min_periods)[window]
+
+    assert np.allclose(m["mean"], roll.mean().to_numpy(), equal_nan=True)
+    assert np.allclose(m["var"], roll.var().to_numpy(), equal_nan=True)
+    assert np.allclose(m["sum"], roll.sum().to_numpy(), equal_nan=True)
+
+
+def test_window_sum_of_any_rank():
+    x = np.random.default_rng(1).standard_normal((50, 3, 2))
+    out = window_sum(x, 7)
+    ref = pd.DataFrame(x.reshape(50, -1)).rolling(7, min_periods=1).sum()
+    assert np.allclose(out.reshape(50, -1), ref)
+    with pytest.raises(ValueError):
+        window_sum(x, 0)
+
+
+def test_rolling_moments_multiple_windows_at_once():
+    x = _panel(k=1)[:, 0]
+
+    m = rolling_moments(x, (5, 50))
+
+    assert set(m) == {5, 50}
+    assert np.allclose(m[5]["std"], rolling_std(x, 5), equal_nan=True)
+    assert np.allclose(m[50]["mean"], rolling_mean(x, 50), equal_nan=True)
+
+
+@pytest.mark.parametrize("window", [1, 7, 64])
+def test_rolling_min_max_match_pandas(window):
+    x = _panel()
+    roll = pd.DataFrame(x).rolling(window, min_periods=2 if window > 1 else 1)
+    mp = 2 if window > 1 else 1
+
+    assert np.allclose(rolling_min(x, window, mp), roll.min(), equal_nan=True)
+    assert np.allclose(rolling_max(x, window, mp), roll.max(), equal_nan=True)
+
+
+def test_rolling_std_is_stable_on_large_levels():
+    # Price-like series: large level, small dispersion, long history
+    rng = np.random.default_rng(1)
+    x = 1e6 + np.cumsum(rng.standard_normal(200_000)) * 1e-2
+
+    sd = rolling_std(x, 20)
+    ref = pd.Series(x - 1e6).rolling(20).std().to_numpy()
+
+    assert np.allclose(sd, ref, rtol=1e-6, equal_nan=True)
+
+
+def test_rolling_std_constant_window_is_zero():
+    sd = rolling_std(np.full(30, 101.3), 10)
+
+    assert (sd[9:] == 0.0).all()
+
+
+def test_rolling_moments_rejects_bad_min_periods():
+    with pytest.raises(ValueError):
+        rolling_moments(np.arange(10.0), 5, min_periods=6)
+
+
+@pytest.mark.filterwarnings("error")
+def test_rolling_moments_infinities_only_poison_their_windows():
+    x = _panel()
+    x[50, 0], x[120, 1] = np.inf, -np.inf
+    inf = np.isinf(x)
+
+    m = rolling_moments(x, 20)[20]
+
+    # Same result as pandas on the finite values, NaN where a window holds an inf
+    roll = pd.DataFrame(np.where(inf, np.nan, x)).rolling(20)
+    hit = pd.DataFrame(inf.astype(float)).rolling(20, min_periods=1).sum() > 0
+    assert np.allclose(m["mean"], roll.mean().mask(hit), equal_nan=True)
+    assert np.allclose(m["sum"], roll.sum().mask(hit), equal_nan=True)
+    assert np.allclose(m["std"], pd.DataFrame(x).rolling(20).std(), equal_nan=True)
+    assert np.isnan(m["mean"][50:70, 0]).all()
+    assert np.isfinite(m["mean"][70:, 0]).sum() > 0
+    counts = pd.DataFrame(x).rolling(20, min_periods=1).count()
+    assert (m["count"] == counts).all().all()
+
+
+def _exact_std(x, window):
+    # Two-pass std of every full window, each centered on its own mean
+    w = np.lib.stride_tricks.sliding_window_view(x, window)
+    return np.sqrt(((w - w.mean(1, keepdims=True)) ** 2).sum(1) / (window - 1))
+
+
+@pytest.mark.parametrize("engine", ["numpy", "pandas"])
+def test_rolling_std_follows_a_drifting_level(engine):
+    # Geometric walk drifting from 1 to ~1e11: the mean moves by many
+    # orders of magnitude, a single global center would lose every digit.
+    rng = np.random.default_rng(2)
+    x = np.exp(np.linspace(0, 25.2, 20_000) + 0.01 * rng.standard_normal(20_000))
+
+    sd = rolling_std(x, 20, engine=engine)
+    ref = _exact_std(x, 20)
+
+    assert x[-1] > 5e10
+    assert np.allclose(sd[19:], ref, rtol=1e-6, atol=0)
+
+
+@pytest.mark.parametrize("engine", ["numpy", "pandas"])
+def test_rolling_std_survives_a_level_shift(engine):
+    # Small real dispersion on either side of a jump from 1 to 1e9
+    rng = np.random.default_rng(3)
+    x = np.r_[np.ones(500), np.full(500, 1e9)] + 7e-4 * rng.standard_normal(1000)
+
+    sd = rolling_std(x, 50, engine=engine)
+    ref = _exact_std(x, 50)
+
+    assert np.allclose(sd[49:500], ref[:451], rtol=1e-9)
+    # After the shift the data only carries ~1e-7 absolute precision
+    assert np.allclose(sd[549:], ref[500:], rtol=1e-3)
+    assert (sd[549:] > 0).all()
+
+
+def test_rolling_std_on_price_range_matches_two_pass():
+    rng = np.random.default_rng(4)
+    x = np.linspace(10, 3000, 50_000) * np.exp(0.01 * rng.standard_normal(50_000))
+
+    sd = rolling_std(x, 30, engine="numpy")
+
+    assert np.allclose(sd[29:], _exact_std(x, 30), rtol=1e-11, atol=0)
+
+
+def test_rolling_moments_engines_agree():
+    x = _panel(n=2000, k=3)
+    num = rolling_moments(x, [5, 60], engine="numpy")
+    pds = rolling_moments(x, [5, 60], engine="pandas")
+
+    for w in (5, 60):
+        for key in ("count", "mean", "var"):
+            assert np.allclose(num[w][key], pds[w][key], equal_nan=True)
+    with pytest.raises(ValueError):
+        rolling_moments(x, 5, engine="numba")
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.data.cache.parquet import ParquetCacheProvider
+from trading_lab.features.indicators import rsi
+from trading_lab.features.normalization import zscore
+from trading_lab.features.returns import log_returns
+from trading_lab.features.store import FeatureStore
+from trading_lab.features.trend import sma_crossover_signal
+
+
+def _ohlcv(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-01", periods=n, freq="D")
+    close = 100 * np.exp(np.cumsum(0.01 * rng.standard_normal(n)))
+    return pd.DataFrame(
+        {"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1.0},
+        index=idx,
+    )
+
+
+@pytest.fixture
+def setup(tmp_path):
+    cache = ParquetCacheProvider(tmp_path / "cache")
+    full = _ohlcv()
+    cache.write("AAA", "1d", full.iloc[:300])
+    store = FeatureStore(cache, tmp_path / "features")
+    return cache, store, full
+
+
+def test_compute_then_hit_keeps_function_naming(setup):
+    _, store, full = setup
+
+    first = store.get("AAA", "sma_crossover_signal", fast=5, slow=20)
+    again = store.get("AAA", "sma_crossover_signal", fast=5, slow=20)
+
+    expected = sma_crossover_signal(full["Close"].iloc[:300], fast=5, slow=20)
+    pd.testing.assert_series_equal(first, expected, check_freq=False)
+    pd.testing.assert_series_equal(again, expected, check_freq=False)
+    assert again.name == "Close_sma_x_5_20"
+    assert (store.stats.rebuilds, store.stats.hits) == (1, 1)
+
+
+def test_incremental_extension_matches_full_recompute(setup):
+    cache, store, full = setup
+    store.get("AAA", "zscore", window=50)
+
+    cache.write("AAA", "1d", full)
+    out = store.get("AAA", "zscore", window=50)
+
+    expected = zscore(log_returns(full["Close"]), window=50)
+    assert store.stats.extends == 1
+    assert out.name == expected.name
+    assert out.index.equals(expected.index)
+    assert np.allclose(out, expected, rtol=1e-9)
+
+
+def test_params_are_part_of_the_key(setup):
+    _, store, _ = setup
+    a = store.path_for("AAA", "1d", "zscore", window=50)
+    b = store.path_for("AAA", "1d", "zscore", window=60)
+    c = store.path_for("AAA", "1d", "zscore")
+    d = store.path_for("AAA", "1d", "zscore", window=252)
+    assert a != b and c == d
+
+
+def test_revised_history_triggers_rebuild(setup):
+    cache, store, full = setup
+    store.get("AAA", "log_returns")
+
+    revised = full.copy()
+    revised.iloc[:350, :4] *= 0.98
+    revised.iloc[10, 3] *= 1.05
+    cache.write("AAA", "1d", revised)
+    out = store.get("AAA", "log_returns")
+
+    assert store.stats.rebuilds == 2 and store.stats.extends == 0
+    assert np.allclose(out, log_returns(revised["Close"]))
+
+
+def test_ewm_features_recompute_in_full(setup):
+    cache, store, full = setup
+    store.get("AAA", "rsi", window=14)
+
+    cache.write("AAA", "1d", full)
+    out = store.get("AAA", "rsi", window=14, start="2020-06-01")
+
+    assert store.stats.rebuilds == 2
+    expected = rsi(full["Close"], window=14).loc["2020-06-01":]
+    assert np.allclose(out, expected)
+
+
+def test_invalidate_and_missing_source(setup):
+    _, store, _ = setup
+    store.get("AAA", "sma", window=10)
+    store.get("AAA", "sma", window=20)
+
+    assert store.invalidate("AAA", "1d", "sma") == 2
+    with pytest.raises(ValueError):
+        store.get("BBB", "sma")
+    with pytest.raises(KeyError):
+        store.get("AAA", "not_a_feature")
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ("yfinance", "arch", "matplotlib", "statsmodels")
+
+
+def _loaded_heavy_modules(code: str) -> list[str]:
+    """
+    Run `code` in a fresh interpreter and report which heavy deps it imported.
+    """
+    probe = (
+        f"{code}\n"
+        "import sys\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+def test_parquet_only_stack_does_not_import_optional_deps(tmp_path):
+    code = (
+        "from trading_lab.data import DataStack, DataStackBuilder\n"
+        f"ds = DataStackBuilder().with_parquet_cache({str(tmp_path)!r}).build()\n"
+        f"ds.cache.read('^FCHI', '1d')\n"
+    )
+    assert _loaded_heavy_modules(code) == []
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "trading_lab",
+        "trading_lab.models.garch",
+        "trading_lab.utils.plotting",
+        "trading_lab.features.returns",
+        "trading_lab.features.volatility",
+    ],
+)
+def test_module_import_is_lightweight(module):
+    assert _loaded_heavy_modules(f"import {module}") == []
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.models.bootstrap import (
+    block_bootstrap,
+    bootstrap_drawdown,
+    bootstrap_loss_difference,
+    bootstrap_sharpe,
+    circular_indices,
+    max_drawdown,
+    qlike_loss,
+    sample_mean,
+    stationary_indices,
+)
+
+
+def _returns(n=1000, mu=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2015-01-01", periods=n, freq="B")
+    return pd.Series(mu + 0.01 * rng.standard_normal(n), index=idx, name="strat")
+
+
+def test_stationary_indices_have_geometric_blocks():
+    rng = np.random.default_rng(0)
+    idx = stationary_indices(500, 200, 10.0, rng)
+    assert idx.shape == (200, 500)
+    assert idx.min() >= 0 and idx.max() < 500
+
+    # Blocks continue with +1 (mod n); breaks are block starts
+    breaks = (np.diff(idx, axis=1) % 500) != 1
+    mean_block = idx.size / (breaks.sum() + len(idx))
+    assert mean_block == pytest.approx(10.0, rel=0.1)
+
+
+def test_circular_indices_are_fixed_blocks():
+    rng = np.random.default_rng(0)
+    idx = circular_indices(103, 50, 10, rng)
+    assert idx.shape == (50, 103)
+    steps = np.diff(idx, axis=1) % 103
+    inside = np.ones(102, dtype=bool)
+    inside[9::10] = False
+    assert (steps[:, inside] == 1).all()
+
+
+def test_results_do_not_depend_on_workers():
+    r = _returns(n=300)
+    kw = {"n_boot": 400, "block": 5, "seed": 7, "chunk": 100}
+    one = bootstrap_sharpe(r, workers=1, **kw)
+    two = bootstrap_sharpe(r, workers=2, **kw)
+    np.testing.assert_array_equal(one.samples, two.samples)
+    assert one.names == ["strat"]
+
+    other = bootstrap_sharpe(r, workers=1, **{**kw, "seed": 8})
+    assert not np.array_equal(one.samples, other.samples)
+
+
+def test_sharpe_interval_and_p_values():
+    strong = bootstrap_sharpe(_returns(mu=0.002), n_boot=2000, seed=0)
+    assert strong.p_value()[0] < 0.01
+    assert strong.p_value(alternative="less")[0] > 0.99
+
+    null = bootstrap_sharpe(_returns(mu=0.0, seed=3), n_boot=2000, seed=0)
+    lo, hi = null.confidence_interval(0.95)[0]
+    assert lo < 0.0 < hi
+    assert null.p_value()[0] > 0.05
+
+    table = strong.summary()
+    assert list(table.columns) == [
+        "estimate",
+        "std_error",
+        "ci_low",
+        "ci_high",
+        "p_value",
+    ]
+    assert table.loc["strat", "ci_low"] > 0
+
+
+def test_max_drawdown_matches_equity_curve():
+    r = _returns(n=400, seed=5)
+    wealth = np.exp(r.cumsum())
+    expected = (1 - wealth / np.maximum(wealth.cummax(), 1.0)).max()
+    assert max_drawdown(r.to_numpy()[None])[0] == pytest.approx(expected)
+
+    simple = np.expm1(r)
+    assert max_drawdown(simple.to_numpy()[None], log=False)[0] == pytest.approx(
+        expected
+    )
+
+    res = bootstrap_drawdown(r, n_boot=500, seed=1)
+    assert res.estimate[0] == pytest.approx(expected)
+    assert (res.samples >= 0).all() and (res.samples < 1).all()
+
+
+def test_joint_resampling_keeps_columns_aligned():
+    r = _returns(n=200)
+    df = pd.DataFrame({"a": r, "b": r})
+    res = block_bootstrap(df, sample_mean, n_boot=300, block=4, seed=0)
+    assert res.names == ["a", "b"]
+    np.testing.assert_array_equal(res.samples[:, 0], res.samples[:, 1])
+
+    with pytest.raises(ValueError):
+        block_bootstrap(df.where(df > 0), sample_mean)
+    with pytest.raises(ValueError):
+        block_bootstrap(df, sample_mean, method="iid")
+
+
+def test_loss_difference_prefers_the_true_volatility():
+    rng = np.random.default_rng(4)
+    n = 800
+    idx = pd.date_range("2018-01-01", periods=n, freq="B")
+    true_vol = pd.Series(1.0 + 0.5 * np.sin(np.arange(n) / 40), index=idx)
+    realized = true_vol * np.exp(0.2 * rng.standard_normal(n))
+    noisy = true_vol * np.exp(0.4 * rng.standard_normal(n))
+
+    # Patton form: the realized proxy itself is the best forecast
+    assert (qlike_loss(true_vol, true_vol) < qlike_loss(noisy, true_vol)).all()
+
+    res = bootstrap_loss_difference(true_vol, noisy, realized, n_boot=1000, seed=0)
+    assert res.names == ["qlike", "mse"]
+    assert (res.estimate < 0).all()
+    assert (res.p_value() < 0.01).all()
+
+    with pytest.raises(ValueError):
+        bootstrap_loss_difference(true_vol, noisy, realized, loss="mae")
+
+    # Flat windows give a zero proxy: QLIKE stays finite there and every
+    # loss is computed on the same dates
+    flat = realized.copy()
+    flat.iloc[::50] = 0.0
+    res = bootstrap_loss_difference(true_vol, noisy, flat, n_boot=200, seed=0)
+    assert np.isfinite(res.estimate).all() and np.isfinite(res.samples).all()
+    mse = bootstrap_loss_difference(
+        true_vol, noisy, flat, loss="mse", n_boot=200, seed=0
+    )
+    assert mse.estimate[0] == res.estimate[1]
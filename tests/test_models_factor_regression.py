@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.models.factor_regression import (
+    residual_features,
+    rolling_factor_regression,
+)
+
+
+def _panel(n=200, n_assets=4, k=2, nan_frac=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-01", periods=n, freq="B")
+    f = pd.DataFrame(0.01 * rng.standard_normal((n, k)), index=idx)
+    f.columns = [f"F{j}" for j in range(k)]
+    b = rng.standard_normal((k, n_assets))
+    r = 0.0005 + f.to_numpy() @ b + 0.005 * rng.standard_normal((n, n_assets))
+    r[rng.random(r.shape) < nan_frac] = np.nan
+    f.iloc[5, 0] = np.nan
+    returns = pd.DataFrame(r, index=idx, columns=[f"A{i}" for i in range(n_assets)])
+    return returns, f
+
+
+def _lstsq(y, f):
+    ok = ~np.isnan(y) & ~np.isnan(f).any(axis=1)
+    x = np.column_stack([np.ones(ok.sum()), f[ok]])
+    coef, *_ = np.linalg.lstsq(x, y[ok], rcond=None)
+    e = y[ok] - x @ coef
+    r2 = 1 - (e @ e) / ((y[ok] - y[ok].mean()) ** 2).sum()
+    return coef, r2, ok.sum()
+
+
+@pytest.mark.parametrize("window", [30, None])
+def test_matches_per_window_lstsq(window):
+    returns, factors = _panel()
+    res = rolling_factor_regression(
+        returns, factors, window=window, min_periods=10, chunk_assets=3
+    )
+
+    r, f = returns.to_numpy(), factors.to_numpy()
+    for t in [40, 99, 199]:
+        lo = 0 if window is None else t - window + 1
+        for i in range(returns.shape[1]):
+            coef, r2, nobs = _lstsq(r[lo : t + 1, i], f[lo : t + 1])
+            assert res.alpha.iloc[t, i] == pytest.approx(coef[0], abs=1e-12)
+            assert res.betas["F0"].iloc[t, i] == pytest.approx(coef[1], rel=1e-9)
+            assert res.betas["F1"].iloc[t, i] == pytest.approx(coef[2], rel=1e-9)
+            assert res.r2.iloc[t, i] == pytest.approx(r2, rel=1e-9)
+            assert res.nobs.iloc[t, i] == nobs
+
+
+def test_min_periods_and_residuals():
+    returns, factors = _panel()
+    res = rolling_factor_regression(returns, factors, window=30, min_periods=20)
+
+    assert res.alpha.iloc[:18].isna().all().all()
+    assert (res.alpha.notna() == (res.nobs >= 20)).all().all()
+
+    # In-sample residual at t uses the fit through t
+    t, i = 150, 2
+    if not np.isnan(returns.iloc[t, i]):
+        fitted = res.alpha.iloc[t, i] + sum(
+            res.betas[c].iloc[t, i] * factors[c].iloc[t] for c in factors.columns
+        )
+        assert res.resid.iloc[t, i] == pytest.approx(returns.iloc[t, i] - fitted)
+    assert res.resid[returns.isna()].isna().all().all()
+
+
+def test_lagged_residuals_use_previous_fit():
+    returns, factors = _panel(nan_frac=0.0)
+    res = rolling_factor_regression(returns, factors, window=40, lag=1)
+
+    t = 120
+    fitted = res.alpha.iloc[t - 1] + sum(
+        res.betas[c].iloc[t - 1] * factors[c].iloc[t] for c in factors.columns
+    )
+    assert np.allclose(res.resid.iloc[t], returns.iloc[t] - fitted)
+
+
+def test_residual_features():
+    returns, factors = _panel(n=300)
+    res = rolling_factor_regression(returns, factors, window=60)
+
+    feats = residual_features(res.resid, z_window=50, vol_window=20)
+
+    assert feats["zscore"].shape == returns.shape
+    assert feats["vol"].shape == returns.shape
+    col = res.resid["A1"].dropna()
+    expected = col.rolling(20).std().dropna()
+    assert np.allclose(feats["vol"]["A1"].dropna(), expected)
@@ -0,0 +1,142 @@
+import os
+
+import arch
+import numpy as np
+import pandas as pd
+
+from trading_lab.models.fit_cache import FitCache, GarchFit
+from trading_lab.models.garch import fit_garch, rolling_garch_forecast
+from trading_lab.models.simulation import GarchParams
+
+
+def _returns(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-01", periods=n, freq="D")
+    return pd.Series(0.01 * rng.standard_t(6, n), index=idx)
+
+
+def _no_arch(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("refit on a cache hit")
+
+    monkeypatch.setattr(arch, "arch_model", fail)
+
+
+def test_fit_is_memoized_on_disk(tmp_path, monkeypatch):
+    r = _returns()
+    direct = fit_garch(r, p=2, q=1)
+
+    first = fit_garch(r, p=2, q=1, cache=FitCache(tmp_path))
+    _no_arch(monkeypatch)
+    cache = FitCache(tmp_path)
+    again = fit_garch(r, p=2, q=1, cache=cache)
+    assert cache.stats().hits == 1
+
+    pd.testing.assert_series_equal(again.params, direct.params)
+    pd.testing.assert_frame_equal(again.param_cov, direct.param_cov)
+    pd.testing.assert_series_equal(again.resid, direct.resid)
+    pd.testing.assert_series_equal(
+        again.conditional_volatility, direct.conditional_volatility
+    )
+    assert again.loglikelihood == direct.loglikelihood
+    pd.testing.assert_frame_equal(
+        again.forecast(horizon=5).variance,
+        direct.forecast(horizon=5).variance,
+        rtol=1e-10,
+    )
+    assert first.loglikelihood == again.loglikelihood
+
+    # Simulation accepts cached fits
+    a = GarchParams.from_fits({"A": direct})
+    b = GarchParams.from_fits({"A": again})
+    np.testing.assert_array_equal(a.last_variance, b.last_variance)
+
+
+def test_key_covers_values_index_and_spec(tmp_path):
+    cache = FitCache(tmp_path)
+    r = _returns(n=300)
+    fit_garch(r, cache=cache)
+    fit_garch(r, q=2, cache=cache)
+    fit_garch(r, dist="normal", cache=cache)
+    shifted = r.copy()
+    shifted.index = shifted.index + pd.Timedelta(days=1)
+    fit_garch(shifted, cache=cache)
+    fit_garch(r * 1.01, cache=cache)
+    stats = cache.stats()
+    assert (stats.hits, stats.writes, stats.files) == (0, 5, 5)
+
+
+def test_rolling_rerun_only_fits_new_dates(tmp_path, monkeypatch):
+    r = _returns(n=320)
+    cache = FitCache(tmp_path)
+    before = rolling_garch_forecast(r.iloc[:-4], 1, 1, test_size=6, cache=cache)
+
+    calls = []
+    real = arch.arch_model
+    monkeypatch.setattr(
+        arch, "arch_model", lambda *a, **k: calls.append(1) or real(*a, **k)
+    )
+    cache = FitCache(tmp_path)
+    after = rolling_garch_forecast(r, 1, 1, test_size=10, cache=cache)
+
+    assert len(calls) == 4
+    assert cache.stats().hits == 6
+    pd.testing.assert_series_equal(after.iloc[:6], before)
+
+    plain = rolling_garch_forecast(r, 1, 1, test_size=10)
+    np.testing.assert_allclose(after, plain, rtol=1e-10)
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    a, b, c = (_returns(n=200, seed=s) for s in range(3))
+    fit_garch(a, cache=FitCache(tmp_path))
+    (path_a,) = tmp_path.glob("*/*.npz")
+    size = path_a.stat().st_size
+
+    cache = FitCache(tmp_path, max_bytes=int(2.5 * size))
+    fit_garch(b, cache=cache)
+    (path_b,) = set(tmp_path.glob("*/*.npz")) - {path_a}
+    old = path_a.stat().st_mtime - 100
+    os.utime(path_a, (old - 100, old - 100))
+    os.utime(path_b, (old, old))
+
+    # The hit refreshes a, so b is now the least recently used
+    assert isinstance(fit_garch(a, cache=cache), GarchFit)
+    fit_garch(c, cache=cache)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.writes, stats.evictions, stats.files) == (1, 2, 1, 2)
+    assert path_a.exists() and not path_b.exists()
+
+
+def test_size_bound_scans_the_directory_once(tmp_path, monkeypatch):
+    cache = FitCache(tmp_path, max_bytes=10**9)
+    scans = []
+    files = FitCache._files
+
+    def counted(self):
+        scans.append(1)
+        return files(self)
+
+    monkeypatch.setattr(FitCache, "_files", counted)
+
+    for seed in range(4):
+        fit_garch(_returns(n=200, seed=seed), cache=cache)
+
+    assert len(scans) == 1
+    assert cache.stats().files == 4
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = FitCache(tmp_path)
+    r = _returns(n=200)
+    fit_garch(r, cache=cache)
+    (path,) = tmp_path.glob("*/*.npz")
+    path.write_bytes(b"torn")
+
+    fit = fit_garch(r, cache=cache)
+    assert cache.stats().misses == 2
+    assert np.isfinite(fit.loglikelihood)
+
+    cache.clear()
+    assert cache.stats().files == 0
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.models.fit_cache import FitCache
+from trading_lab.models.garch import fit_garch
+from trading_lab.models.simulation import (
+    GarchParams,
+    simulate_garch_cumulative,
+    simulate_garch_paths,
+    var_es_summary,
+)
+
+
+def _returns(n=800, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-01", periods=n, freq="D")
+    return pd.Series(0.01 * rng.standard_t(6, n), index=idx)
+
+
+@pytest.fixture(scope="module")
+def fits():
+    return {
+        "A": fit_garch(_returns(seed=1), p=1, q=1, dist="t"),
+        "B": fit_garch(_returns(seed=2), p=2, q=1, dist="normal"),
+    }
+
+
+def test_from_fits_pads_orders(fits):
+    params = GarchParams.from_fits(fits)
+
+    assert params.names == ["A", "B"]
+    assert params.alpha.shape == (2, 2)
+    assert params.alpha[0, 1] == 0.0
+    assert np.isfinite(params.nu[0]) and np.isinf(params.nu[1])
+    assert params.last_variance[0, -1] == pytest.approx(
+        fits["A"].conditional_volatility.iloc[-1] ** 2
+    )
+
+
+def test_simulated_variance_matches_analytic_forecast(fits):
+    params = GarchParams.from_fits(fits)
+    horizon = 5
+
+    paths = simulate_garch_paths(params, horizon, n_paths=40_000, seed=7)
+    assert paths.shape == (40_000, horizon, 2)
+
+    for j, name in enumerate(params.names):
+        expected = fits[name].forecast(horizon=horizon).variance.iloc[-1].to_numpy()
+        assert np.allclose((paths[:, :, j] ** 2).mean(axis=0), expected, rtol=0.05)
+
+
+def test_seeded_and_independent_of_workers(fits):
+    params = GarchParams.from_fits(fits)
+
+    a = simulate_garch_cumulative(params, 10, 3000, seed=3, chunk_paths=1000)
+    b = simulate_garch_cumulative(params, 10, 3000, seed=3, chunk_paths=1000)
+    c = simulate_garch_cumulative(params, 10, 3000, seed=3, chunk_paths=1000, workers=2)
+    d = simulate_garch_cumulative(params, 10, 3000, seed=4, chunk_paths=1000)
+
+    assert a.shape == (3000, 2)
+    assert np.array_equal(a, b)
+    assert np.array_equal(a, c)
+    assert not np.array_equal(a, d)
+
+
+def test_cumulative_equals_summed_paths(fits):
+    params = GarchParams.from_fits(fits)
+
+    paths = simulate_garch_paths(params, 4, 500, seed=11, chunk_paths=200)
+    cum = simulate_garch_cumulative(params, 4, 500, seed=11, chunk_paths=200)
+
+    assert np.allclose(paths.sum(axis=1), cum)
+
+
+def test_var_es_summary():
+    rng = np.random.default_rng(0)
+    samples = rng.standard_normal((200_000, 2)) * [1.0, 2.0]
+
+    out = var_es_summary(samples, names=["x", "y"], alphas=(0.05,))
+
+    assert list(out.index) == ["x", "y"]
+    assert out.loc["x", "VaR_0.05"] == pytest.approx(1.645, rel=0.02)
+    assert out.loc["y", "VaR_0.05"] == pytest.approx(2 * 1.645, rel=0.02)
+    assert out.loc["x", "ES_0.05"] == pytest.approx(2.063, rel=0.02)
+    assert (out["ES_0.05"] > out["VaR_0.05"]).all()
+
+
+def test_from_fits_rejects_models_it_cannot_simulate(tmp_path):
+    from arch import arch_model
+
+    r = _returns(seed=3) * 100
+    gjr = arch_model(r, mean="Zero", vol="GARCH", p=1, o=1, q=1).fit(disp="off")
+    mean = arch_model(r, mean="Constant", vol="GARCH").fit(disp="off")
+    fits = {
+        "ged": fit_garch(_returns(seed=3), dist="ged"),
+        "skewt": fit_garch(_returns(seed=3), dist="skewt"),
+        "ged_cached": fit_garch(_returns(seed=3), dist="ged", cache=FitCache(tmp_path)),
+        "gjr": gjr,
+        "mean": mean,
+    }
+    for name, res in fits.items():
+        with pytest.raises(ValueError, match=name):
+            GarchParams.from_fits({name: res})
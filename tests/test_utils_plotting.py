@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.utils.plotting import (
+    downsample,
+    export_figures,
+    lttb_indices,
+    minmax_indices,
+    plot_series,
+)
+
+
+def _walk(n=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.standard_normal(n))
+
+
+def test_minmax_keeps_envelope_and_bounds_size():
+    y = _walk()
+    y[123] = np.nan
+
+    idx = minmax_indices(y, n_buckets=500)
+
+    assert len(idx) <= 1000
+    assert np.all(np.diff(idx) > 0)
+    assert np.nanmax(y[idx]) == np.nanmax(y)
+    assert np.nanmin(y[idx]) == np.nanmin(y)
+    assert not np.isnan(y[idx]).any()
+
+
+def test_lttb_keeps_endpoints_and_count():
+    y = _walk()
+    x = np.arange(len(y), dtype=float)
+
+    idx = lttb_indices(x, y, n_out=1000)
+
+    assert len(idx) == 1000
+    assert idx[0] == 0
+    assert idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_downsample_short_series_is_unchanged():
+    x = np.arange(10.0)
+    y = np.sin(x)
+
+    xs, ys = downsample(x, y, max_points=100, method="lttb")
+
+    assert np.array_equal(xs, x)
+    assert np.array_equal(ys, y)
+
+
+def test_downsample_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        downsample(np.arange(10.0), np.arange(10.0), method="every_nth")
+
+
+def test_export_figures_headless(tmp_path):
+    idx = pd.date_range("2020-01-01", periods=50_000, freq="min")
+    px = pd.Series(_walk(50_000), index=idx, name="PX")
+    panel = pd.DataFrame({"PX": px, "VOL": px.diff().abs()})
+
+    paths = export_figures(
+        [("px", px, "Price"), ("panel", panel, "Panel")],
+        out_dir=tmp_path,
+        workers=1,
+        max_points=500,
+    )
+
+    assert [p.name for p in paths] == ["px.png", "panel.png"]
+    assert all(p.stat().st_size > 0 for p in paths)
+
+
+def test_plot_series_overlays_dataframe_columns(monkeypatch):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    monkeypatch.setattr(plt, "show", lambda: None)
+    panel = pd.DataFrame({"a": _walk(5000), "b": _walk(5000, seed=1)})
+
+    plot_series(panel, "Panel", max_points=100)
+    (ax,) = plt.gcf().axes
+    assert [line.get_label() for line in ax.get_lines()] == ["a", "b"]
+    assert all(len(line.get_xdata()) <= 100 for line in ax.get_lines())
+
+    plot_series([1.0, 2.0, 3.0], "List")
+    (ax,) = plt.gcf().axes
+    assert list(ax.get_lines()[0].get_ydata()) == [1.0, 2.0, 3.0]
+    plt.close("all")
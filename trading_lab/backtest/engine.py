@@ -0,0 +1,512 @@
+"""
+Event-driven backtester for path-dependent position rules.
+
+Stop-losses, trailing stops and banded rebalancing depend on the path of
+fills and prices, so they cannot be written as shifted vectorized signals.
+Here bars are processed one at a time, but every bar updates all assets at
+once, and the whole state (positions, pending orders, entry prices,
+trailing extremes, cash) lives in preallocated NumPy arrays. Nothing is
+allocated in pandas until the run is over.
+
+Bar t, in order:
+1. orders decided at the close of t-1 fill at the open of t, paying
+   `cost_bps` on traded notional;
+2. stops are checked against the bar's Low/High and exit at the stop
+   level, or at the open if it gapped through; a stopped asset stays flat
+   until its target leaves the stopped side;
+3. the book is marked to the close and trailing extremes are updated;
+4. target weights of bar t become orders for t + 1, for assets whose
+   weight drifted more than `rebalance_band` from target (entries, exits
+   and flips always trade).
+
+Given Close prices only, orders fill at the close they were decided on
+(market-on-close, the event-driven equivalent of `w.shift(1) * returns`)
+and stops are checked and filled at closes.
+
+The bar loop is a scalar loop over assets with no temporaries
+(`_run_bars_loop`), run under numba when it is installed (`jit=None` picks
+it up automatically). Without numba, universes above `SCALAR_MAX_ASSETS`
+use the same steps vectorized across assets on every bar (`_run_bars`),
+which is faster in plain Python once there are enough assets per bar.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import cache
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.data.cache.base import CacheProvider
+from trading_lab.data.format.ohlcv import normalize_ohlcv
+
+STOP_LOSS = 1
+TRAILING_STOP = 2
+
+PANEL_FIELDS = ("Open", "High", "Low", "Close")
+
+# Widest universe the pure-Python scalar loop beats the per-bar NumPy one on
+SCALAR_MAX_ASSETS = 16
+
+
+@dataclass
+class BacktestResult:
+    """
+    Output of `run_backtest`; all frames share the price index/columns.
+
+    Attributes
+    ----------
+    equity, cash, costs : pd.Series
+        Per bar, at the close (`costs` is paid during the bar).
+    positions : pd.DataFrame
+        Holdings (units) at the close.
+    fills : pd.DataFrame
+        Signed units traded during the bar, including stop exits.
+    stops : pd.DataFrame
+        int8 stop events: 0 none, 1 stop-loss, 2 trailing stop.
+    elapsed : float
+        Seconds spent in the bar loop.
+    initial_capital : float
+    """
+
+    equity: pd.Series
+    cash: pd.Series
+    costs: pd.Series
+    positions: pd.DataFrame
+    fills: pd.DataFrame
+    stops: pd.DataFrame
+    elapsed: float
+    initial_capital: float = 1.0
+
+    @property
+    def returns(self) -> pd.Series:
+        out = self.equity.pct_change()
+        out.iloc[0] = self.equity.iloc[0] / self.initial_capital - 1.0
+        out.name = "returns"
+        return out
+
+    @property
+    def n_events(self) -> int:
+        """
+        Bar-events processed (bars x assets).
+        """
+        return self.positions.size
+
+    @property
+    def events_per_second(self) -> float:
+        return self.n_events / self.elapsed if self.elapsed > 0 else float("inf")
+
+
+def _run_bars(
+    fill_px,
+    open_,
+    high,
+    low,
+    close,
+    tradable,
+    target,
+    stop_loss,
+    trailing_stop,
+    band,
+    cost,
+    capital,
+    pos_out,
+    fill_out,
+    stop_out,
+    cash_out,
+    equity_out,
+    cost_out,
+):
+    """
+    Bar loop over (T, N) float64 arrays; writes into the *_out arrays.
+    Pending orders fill at `fill_px`; `open_` is the stop gap reference.
+
+    Disabled stops are passed as NaN. `_run_bars_loop` is the per-asset
+    version (compiled under numba); the two must stay step for step the same.
+    """
+    n_bars, n_assets = close.shape
+    pos = np.zeros(n_assets)
+    order = np.zeros(n_assets)
+    entry = np.zeros(n_assets)
+    extreme = np.zeros(n_assets)
+    locked = np.zeros(n_assets)
+    cash = capital
+    no_stop = np.full(n_assets, np.inf)
+    use_sl = not np.isnan(stop_loss)
+    use_tr = not np.isnan(trailing_stop)
+
+    for t in range(n_bars):
+        f = fill_px[t]
+        o = open_[t]
+        h = high[t]
+        lo = low[t]
+        c = close[t]
+        ok = tradable[t]
+
+        # 1. Fill yesterday's orders
+        q = np.where(ok, order, 0.0)
+        new_pos = pos + q
+        opened = (q != 0.0) & (np.sign(new_pos) != np.sign(pos))
+        entry = np.where(opened, f, entry)
+        extreme = np.where(opened, f, extreme)
+        fee = cost * (np.abs(q) * f).sum()
+        cash -= (q * f).sum() + fee
+        fills = q
+        pos = new_pos
+        order[:] = 0.0
+
+        # 2. Stops, intrabar
+        side = np.sign(pos)
+        long_sl = entry * (1.0 - stop_loss) if use_sl else -no_stop
+        long_tr = extreme * (1.0 - trailing_stop) if use_tr else -no_stop
+        short_sl = entry * (1.0 + stop_loss) if use_sl else no_stop
+        short_tr = extreme * (1.0 + trailing_stop) if use_tr else no_stop
+        long_lvl = np.maximum(long_sl, long_tr)
+        short_lvl = np.minimum(short_sl, short_tr)
+        hit_long = (side > 0.0) & ok & (lo <= long_lvl)
+        hit_short = (side < 0.0) & ok & (h >= short_lvl)
+        hit = hit_long | hit_short
+        # Stop level, or the open on a gap; never outside the bar's range
+        px = np.where(hit_long, np.maximum(np.minimum(o, long_lvl), lo), 0.0)
+        px = np.where(hit_short, np.minimum(np.maximum(o, short_lvl), h), px)
+        q = np.where(hit, -pos, 0.0)
+        stop_fee = cost * (np.abs(q) * px).sum()
+        cash -= (q * px).sum() + stop_fee
+        fee += stop_fee
+        trailing = np.where(hit_long, long_tr >= long_sl, short_tr <= short_sl)
+        stop_out[t] = np.where(hit, np.where(trailing, 2.0, 1.0), 0.0)
+        fills = fills + q
+        pos = np.where(hit, 0.0, pos)
+        locked = np.where(hit, side, locked)
+
+        # 3. Mark to the close, update trailing extremes
+        side = np.sign(pos)
+        extreme = np.where(
+            side > 0.0,
+            np.maximum(extreme, h),
+            np.where(side < 0.0, np.minimum(extreme, lo), extreme),
+        )
+        equity = cash + (pos * c).sum()
+
+        # 4. Orders for the next bar
+        w_tgt = target[t]
+        locked = np.where(np.sign(w_tgt) != locked, 0.0, locked)
+        w_tgt = np.where(locked != 0.0, 0.0, w_tgt)
+        if equity <= 0.0:
+            w_tgt = w_tgt * 0.0
+        c_safe = np.where(c > 0.0, c, 1.0)
+        w_cur = pos * c_safe / equity if equity > 0.0 else pos * 0.0
+        trade = (np.abs(w_tgt - w_cur) > band) | (np.sign(w_tgt) != np.sign(pos))
+        trade = trade & ok
+        order = np.where(trade, w_tgt * max(equity, 0.0) / c_safe - pos, 0.0)
+
+        pos_out[t] = pos
+        fill_out[t] = fills
+        cash_out[t] = cash
+        equity_out[t] = equity
+        cost_out[t] = fee
+
+
+def _run_bars_loop(
+    fill_px,
+    open_,
+    high,
+    low,
+    close,
+    tradable,
+    target,
+    stop_loss,
+    trailing_stop,
+    band,
+    cost,
+    capital,
+    pos_out,
+    fill_out,
+    stop_out,
+    cash_out,
+    equity_out,
+    cost_out,
+):
+    """
+    `_run_bars` as scalar loops over assets: one pass fills, stops and
+    marks every asset, a second one places orders once the bar's equity is
+    known. Nothing is allocated per bar.
+    """
+    n_bars, n_assets = close.shape
+    pos = np.zeros(n_assets)
+    order = np.zeros(n_assets)
+    entry = np.zeros(n_assets)
+    extreme = np.zeros(n_assets)
+    locked = np.zeros(n_assets)
+    cash = capital
+    use_sl = not np.isnan(stop_loss)
+    use_tr = not np.isnan(trailing_stop)
+
+    for t in range(n_bars):
+        fee = 0.0
+        value = 0.0
+        for i in range(n_assets):
+            f = fill_px[t, i]
+            h = high[t, i]
+            lo = low[t, i]
+            ok = tradable[t, i]
+
+            # 1. Fill yesterday's order
+            q = order[i] if ok else 0.0
+            p = pos[i] + q
+            if q != 0.0 and np.sign(p) != np.sign(pos[i]):
+                entry[i] = f
+                extreme[i] = f
+            paid = cost * abs(q) * f
+            fee += paid
+            cash -= q * f + paid
+            fills = q
+            order[i] = 0.0
+
+            # 2. Stops, intrabar
+            side = np.sign(p)
+            long_sl = entry[i] * (1.0 - stop_loss) if use_sl else -np.inf
+            long_tr = extreme[i] * (1.0 - trailing_stop) if use_tr else -np.inf
+            short_sl = entry[i] * (1.0 + stop_loss) if use_sl else np.inf
+            short_tr = extreme[i] * (1.0 + trailing_stop) if use_tr else np.inf
+            hit_long = side > 0.0 and ok and lo <= max(long_sl, long_tr)
+            hit_short = side < 0.0 and ok and h >= min(short_sl, short_tr)
+            stop_out[t, i] = 0.0
+            if hit_long or hit_short:
+                o = open_[t, i]
+                if hit_long:
+                    px = max(min(o, max(long_sl, long_tr)), lo)
+                    trailing = long_tr >= long_sl
+                else:
+                    px = min(max(o, min(short_sl, short_tr)), h)
+                    trailing = short_tr <= short_sl
+                paid = cost * abs(p) * px
+                fee += paid
+                cash += p * px - paid
+                stop_out[t, i] = 2.0 if trailing else 1.0
+                fills -= p
+                p = 0.0
+                locked[i] = side
+
+            # 3. Mark to the close, update the trailing extreme
+            if p > 0.0:
+                extreme[i] = max(extreme[i], h)
+            elif p < 0.0:
+                extreme[i] = min(extreme[i], lo)
+            pos[i] = p
+            fill_out[t, i] = fills
+            value += p * close[t, i]
+
+        equity = cash + value
+
+        # 4. Orders for the next bar
+        for i in range(n_assets):
+            p = pos[i]
+            w_tgt = target[t, i]
+            if np.sign(w_tgt) != locked[i]:
+                locked[i] = 0.0
+            if locked[i] != 0.0 or equity <= 0.0:
+                w_tgt = 0.0
+            c = close[t, i]
+            c_safe = c if c > 0.0 else 1.0
+            w_cur = p * c_safe / equity if equity > 0.0 else 0.0
+            trade = abs(w_tgt - w_cur) > band or np.sign(w_tgt) != np.sign(p)
+            if trade and tradable[t, i]:
+                order[i] = w_tgt * max(equity, 0.0) / c_safe - p
+            pos_out[t, i] = p
+
+        cash_out[t] = cash
+        equity_out[t] = equity
+        cost_out[t] = fee
+
+
+@cache
+def _kernel(jit: bool | None):
+    if jit is False:
+        return _run_bars
+    try:
+        from numba import njit
+    except ImportError:
+        if jit:
+            raise ImportError("jit=True needs numba installed")
+        return _run_bars
+    return njit(cache=True, nogil=True)(_run_bars_loop)
+
+
+def _split_prices(prices: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    {field: (T, N) frame} from a Close frame or a (field, ticker) panel.
+    """
+    if isinstance(prices.columns, pd.MultiIndex):
+        fields = prices.columns.get_level_values(0)
+        if "Close" not in fields:
+            raise KeyError("price panel has no 'Close' field")
+        return {f: prices[f] for f in PANEL_FIELDS if f in fields}
+    return {"Close": prices}
+
+
+def run_backtest(
+    prices: pd.DataFrame,
+    target_weights: pd.DataFrame,
+    stop_loss: float | None = None,
+    trailing_stop: float | None = None,
+    rebalance_band: float = 0.0,
+    cost_bps: float = 0.0,
+    initial_capital: float = 1.0,
+    jit: bool | None = None,
+) -> BacktestResult:
+    """
+    Simulate target weights with stops and banded rebalancing.
+
+    Parameters
+    ----------
+    prices : pd.DataFrame
+        Close prices (time x tickers) or an OHLC panel with (field, ticker)
+        MultiIndex columns (e.g. from `panel_from_cache`). Open enables
+        next-open fills, High/Low intrabar stops. A missing Close marks an
+        asset as untradable for the bar (it is valued at its last price).
+    target_weights : pd.DataFrame
+        Desired weight of each asset in equity at each close; reindexed to
+        the prices, missing -> 0. See `signal_weights`.
+    stop_loss, trailing_stop : float, optional
+        Fractional adverse move from the entry price / from the best price
+        since entry that closes the position. The entry price is reset only
+        when a position is opened or flipped, not on rebalances.
+    rebalance_band : float
+        No trade while |weight - target| <= band.
+    cost_bps : float
+        Cost per unit of traded notional, in basis points.
+    jit : bool, optional
+        Use numba for the bar loop; None uses it if installed.
+    """
+    fields = _split_prices(prices)
+    close_df = fields["Close"]
+    index, columns = close_df.index, close_df.columns
+
+    raw_close = close_df.to_numpy(dtype=np.float64)
+    tradable = ~np.isnan(raw_close)
+    # Mark untradable bars at the last price (0 before the first one)
+    close = np.nan_to_num(close_df.ffill().to_numpy(dtype=np.float64))
+
+    def _field(name: str, default: np.ndarray) -> np.ndarray:
+        if name not in fields:
+            return default
+        arr = fields[name].reindex(index=index, columns=columns)
+        arr = arr.to_numpy(dtype=np.float64)
+        return np.where(np.isnan(arr), default, arr)
+
+    open_ = _field("Open", close)
+    high = np.maximum(_field("High", close), np.maximum(open_, close))
+    low = np.minimum(_field("Low", close), np.minimum(open_, close))
+    if "Open" in fields:
+        fill_px = open_
+    else:
+        # Market-on-close: an order fills at the close it was decided on
+        fill_px = np.vstack([close[:1], close[:-1]])
+
+    target = target_weights.reindex(index=index, columns=columns).to_numpy(
+        dtype=np.float64, copy=True
+    )
+    target[np.isnan(target)] = 0.0
+
+    n_bars, n_assets = close.shape
+    pos_out = np.empty((n_bars, n_assets))
+    fill_out = np.empty((n_bars, n_assets))
+    stop_out = np.empty((n_bars, n_assets))
+    cash_out = np.empty(n_bars)
+    equity_out = np.empty(n_bars)
+    cost_out = np.empty(n_bars)
+
+    kernel = _kernel(jit)
+    if kernel is _run_bars and close.shape[1] <= SCALAR_MAX_ASSETS:
+        kernel = _run_bars_loop
+    t0 = time.perf_counter()
+    kernel(
+        fill_px,
+        open_,
+        high,
+        low,
+        close,
+        tradable,
+        target,
+        np.nan if stop_loss is None else float(stop_loss),
+        np.nan if trailing_stop is None else float(trailing_stop),
+        float(rebalance_band),
+        float(cost_bps) * 1e-4,
+        float(initial_capital),
+        pos_out,
+        fill_out,
+        stop_out,
+        cash_out,
+        equity_out,
+        cost_out,
+    )
+    elapsed = time.perf_counter() - t0
+
+    def _frame(a: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(a, index=index, columns=columns)
+
+    return BacktestResult(
+        equity=pd.Series(equity_out, index=index, name="equity"),
+        cash=pd.Series(cash_out, index=index, name="cash"),
+        costs=pd.Series(cost_out, index=index, name="costs"),
+        positions=_frame(pos_out),
+        fills=_frame(fill_out),
+        stops=_frame(stop_out.astype(np.int8)),
+        elapsed=elapsed,
+        initial_capital=float(initial_capital),
+    )
+
+
+def signal_weights(
+    signal: pd.DataFrame,
+    vol: pd.DataFrame | None = None,
+    target_vol: float | None = None,
+    max_weight: float = 1.0,
+    max_gross: float | None = None,
+    eps: float = 1e-12,
+) -> pd.DataFrame:
+    """
+    Target weights from a signal panel, optionally vol-targeted per asset.
+
+    w = signal * target_vol / vol (as `volatility_target_weights`), clipped
+    to [-max_weight, max_weight], then scaled down on bars where the gross
+    exposure sum(|w|) exceeds `max_gross`. Missing vol gives weight 0.
+    """
+    w = signal.astype(float)
+    if target_vol is not None:
+        if vol is None:
+            raise ValueError("target_vol needs a vol panel")
+        w = w * (target_vol / vol.reindex_like(w).clip(lower=eps))
+    w = w.clip(lower=-max_weight, upper=max_weight).fillna(0.0)
+    if max_gross is not None:
+        gross = w.abs().sum(axis=1)
+        scale = (max_gross / gross.where(gross > max_gross)).fillna(1.0)
+        w = w.mul(scale, axis=0)
+    return w
+
+
+def panel_from_cache(
+    cache: CacheProvider,
+    tickers: Sequence[str],
+    timeframe: str = "1d",
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+    fields: Sequence[str] = PANEL_FIELDS,
+) -> pd.DataFrame:
+    """
+    Replay cached OHLC bars as a (field, ticker) panel, without touching
+    any provider. Tickers are aligned on the union of their timestamps.
+    """
+    frames = {}
+    for t in tickers:
+        df = cache.read_range(t, timeframe, start=start, end=end, columns=fields)
+        if df is None:
+            raise KeyError(f"no cached data for {t} {timeframe}")
+        frames[t] = normalize_ohlcv(df, keep_cols=fields)
+    panel = pd.concat(frames, axis=1).swaplevel(axis=1)
+    present = [f for f in fields if f in panel.columns.get_level_values(0)]
+    return panel.loc[:, present]
@@ -1,3 +1,21 @@
-from trading_lab.data.datastack import DataStackBuilder, DataStack
+"""
+Data layer: providers, caches and the DataStack builder.
+
+Public names are resolved lazily (PEP 562) so that importing a submodule such
+as `trading_lab.data.types` does not pull in the whole stack.
+"""
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from trading_lab.data.datastack import DataStack, DataStackBuilder
 
 __all__ = ["DataStackBuilder", "DataStack"]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        from trading_lab.data import datastack
+
+        return getattr(datastack, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,101 @@
+"""
+Command-line entry point: python -m trading_lab.data refresh ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+import pandas as pd
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m trading_lab.data")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("refresh", help="warm/refresh the cache for a universe")
+    p.add_argument("--universe", required=True, help="ticker list file")
+    p.add_argument(
+        "--timeframes", default="1d", help="comma-separated, e.g. 1d,1h (default 1d)"
+    )
+    p.add_argument("--start", required=True)
+    p.add_argument("--end", default=None, help="default: today")
+    p.add_argument("--cache-dir", default="data/cache")
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="threads (default 4; not with --shard)",
+    )
+    p.add_argument(
+        "--journal", default=None, help="default: <cache-dir>/refresh_journal.jsonl"
+    )
+    p.add_argument("--no-resume", action="store_true", help="ignore the journal")
+    p.add_argument(
+        "--shard",
+        default=None,
+        help="i/n: run as worker i of n over a shared --cache-dir (leases, no journal)",
+    )
+    p.add_argument("--worker-id", default=None)
+    p.add_argument("--lease-ttl", type=float, default=600.0, help="seconds")
+    p.add_argument(
+        "--retry-failed", action="store_true", help="sharded: retry failed items"
+    )
+    p.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+    if args.shard is not None and args.workers is not None:
+        # One sharded worker refreshes one item at a time; scale out by
+        # starting more --shard processes instead
+        parser.error("--workers cannot be combined with --shard")
+    if args.workers is None:
+        args.workers = 4
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+
+    from trading_lab.data.datastack import DataStackBuilder
+    from trading_lab.data.refresh import read_universe, refresh_universe
+
+    stack = DataStackBuilder().with_parquet_cache(args.cache_dir).build()
+    end = args.end or str(pd.Timestamp.today().date())
+    tickers = read_universe(args.universe)
+    timeframes = [tf.strip() for tf in args.timeframes.split(",") if tf.strip()]
+
+    if args.shard is not None:
+        from trading_lab.data.shard import run_sharded_refresh
+
+        shard, n_shards = (int(x) for x in args.shard.split("/"))
+        summary = run_sharded_refresh(
+            stack,
+            tickers,
+            timeframes,
+            start=args.start,
+            end=end,
+            shard=shard,
+            n_shards=n_shards,
+            worker_id=args.worker_id,
+            lease_ttl=args.lease_ttl,
+            retry_failed=args.retry_failed,
+            verbose=not args.quiet,
+        )
+    else:
+        summary = refresh_universe(
+            stack,
+            tickers,
+            timeframes,
+            start=args.start,
+            end=end,
+            workers=args.workers,
+            journal=args.journal,
+            resume=not args.no_resume,
+            verbose=not args.quiet,
+        )
+    print(summary.format())
+    return 1 if summary.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 from pathlib import Path
+
 import pandas as pd
 
+from trading_lab.data.cache.policy import CachePolicy
+from trading_lab.data.format.ohlcv import slice_timeseries
+
 
 class CacheProvider(ABC):
     """
     Cache backend for OHLCV time series keyed by (ticker, timeframe).
     """
 
+    policy: CachePolicy | None = None
+    # Read-only caches (e.g. pinned snapshots) are served as-is: the
+    # DataStack never plans fetches or writes against them.
+    read_only: bool = False
+
     @abstractmethod
     def read(self, ticker: str, timeframe: str) -> pd.DataFrame | None:
         raise NotImplementedError
@@ -21,3 +31,55 @@ class CacheProvider(ABC):
     @abstractmethod
     def path_for(self, ticker: str, timeframe: str) -> Path:
         raise NotImplementedError
+
+    def bounds(
+        self, ticker: str, timeframe: str
+    ) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        """
+        First and last cached timestamps, or None if nothing is cached.
+
+        Backends that can answer from metadata/index only should override.
+        """
+        df = self.read(ticker, timeframe)
+        if df is None or df.empty:
+            return None
+        idx = pd.to_datetime(df.index)
+        return idx.min(), idx.max()
+
+    def read_range(
+        self,
+        ticker: str,
+        timeframe: str,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> pd.DataFrame | None:
+        """
+        Read the [start, end] slice (inclusive, pandas `.loc` semantics) and
+        optionally a subset of columns.
+
+        Backends that can prune rows/columns on disk should override this;
+        the default reads the full frame and slices it in memory.
+        """
+        df = self.read(ticker, timeframe)
+        if df is None:
+            return None
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return slice_timeseries(df.sort_index(), start, end)
+
+    def read_meta(self, ticker: str, timeframe: str) -> dict:
+        """
+        Small JSON-able metadata stored alongside (ticker, timeframe).
+        """
+        return {}
+
+    def update_meta(self, ticker: str, timeframe: str, **fields) -> None:
+        """
+        Merge `fields` into the metadata of (ticker, timeframe).
+        """
+
+    def flush(self) -> None:
+        """
+        Persist state buffered in memory (e.g. access records).
+        """
@@ -1,24 +1,148 @@
 from __future__ import annotations
 
+import atexit
+import json
+import os
+import threading
+import weakref
+from collections.abc import Sequence
+from dataclasses import replace
 from pathlib import Path
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
 from trading_lab.data.cache.base import CacheProvider
+from trading_lab.data.cache.policy import CachePolicy, CacheStats, utcnow
+from trading_lab.data.format.ohlcv import slice_timeseries
 
 
 def _sanitize_ticker(ticker: str) -> str:
     return ticker.replace("^", "").replace("/", "_").replace("=", "_")
 
 
+def _as_bound(x: str | pd.Timestamp, tz) -> pd.Timestamp:
+    ts = pd.Timestamp(x)
+    if tz is not None and ts.tzinfo is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tzinfo is not None:
+        return ts.tz_localize(None)
+    return ts
+
+
+def _index_column(schema: pa.Schema) -> str | None:
+    """
+    Name of the stored (single, named) pandas index column, if any.
+    """
+    index_cols = (schema.pandas_metadata or {}).get("index_columns", [])
+    if len(index_cols) != 1 or not isinstance(index_cols[0], str):
+        return None
+    return index_cols[0]
+
+
+def _period_end(x: str | pd.Timestamp) -> pd.Timestamp:
+    """
+    Last instant `x` covers as a `.loc` bound: partial-date strings
+    ("2020", "2020-01", "2020-01-31") span their whole period.
+    """
+    if not isinstance(x, str):
+        return pd.Timestamp(x)
+    ts = pd.Timestamp(x)
+    end = pd.Period(x).end_time
+    return end.tz_localize(ts.tzinfo) if ts.tzinfo is not None else end
+
+
+def _index_filters(
+    path: Path, start: str | pd.Timestamp | None, end: str | pd.Timestamp | None
+) -> list[tuple] | None:
+    """
+    Build pyarrow row filters on the stored DatetimeIndex column.
+
+    The upper bound is the end of the period a partial-date string covers,
+    so that it keeps its inclusive `.loc` meaning; the exact slice is
+    applied after reading.
+    """
+    schema = pq.read_schema(path)
+    name = _index_column(schema)
+    if name is None:
+        return None
+
+    tz = getattr(schema.field(name).type, "tz", None)
+
+    filters = []
+    if start is not None:
+        filters.append((name, ">=", _as_bound(start, tz)))
+    if end is not None:
+        filters.append((name, "<=", _as_bound(_period_end(end), tz)))
+    return filters or None
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_suffix(".meta.json")
+
+
+def _load_meta(path: Path) -> dict:
+    mpath = _meta_path(path)
+    if not mpath.exists():
+        return {}
+    try:
+        return json.loads(mpath.read_text())
+    except (OSError, ValueError):
+        # A torn/corrupt sidecar only loses bookkeeping, never data
+        return {}
+
+
+def _save_meta(path: Path, meta: dict) -> None:
+    mpath = _meta_path(path)
+    tmp = mpath.with_name(f"{mpath.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(meta, sort_keys=True, default=str))
+    os.replace(tmp, mpath)
+
+
+# Reads buffered in memory before their access times are written to the
+# sidecars (see ParquetCacheProvider.flush)
+ACCESS_FLUSH_EVERY = 64
+
+# Providers holding buffered access records, flushed at interpreter exit
+_UNFLUSHED: weakref.WeakSet = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    for cache in list(_UNFLUSHED):
+        cache.flush()
+
+
 class ParquetCacheProvider(CacheProvider):
     """
     Parquet cache with one file per (ticker, timeframe):
       data/cache/{TICKER}_{TIMEFRAME}.parquet
+    plus a JSON metadata sidecar:
+      data/cache/{TICKER}_{TIMEFRAME}.meta.json
+
+    With a CachePolicy that sets `max_bytes`, files are evicted (LRU/LFU)
+    after each write until the cache fits the budget. Sizes and access
+    times live in an in-memory table, built from the sidecars once (on
+    first use) and kept up to date by this instance, so a write costs
+    O(1) bookkeeping instead of a directory scan. Reads are recorded in
+    the table and written to the sidecars in batches of
+    `ACCESS_FLUSH_EVERY`, by `flush()` (called at the end of a refresh run)
+    or at interpreter exit; files added by other processes enter the table
+    when first read or at the next instance's scan. The table is guarded by
+    a lock, so one instance can be shared by threads.
     """
 
-    def __init__(self, root_dir: Path):
+    def __init__(self, root_dir: Path, policy: CachePolicy | None = None):
         self.root_dir = root_dir
         self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.policy = policy
+        self._stats = CacheStats()
+        # path -> [size, last_access | None, access_count, fetched_at]
+        self._usage: dict[Path, list] | None = None
+        self._pending: set[Path] = set()
+        self._lock = threading.RLock()
 
     def path_for(self, ticker: str, timeframe: str) -> Path:
         fname = f"{_sanitize_ticker(ticker)}_{timeframe}.parquet"
@@ -27,9 +151,221 @@ class ParquetCacheProvider(CacheProvider):
     def read(self, ticker: str, timeframe: str) -> pd.DataFrame | None:
         path = self.path_for(ticker, timeframe)
         if not path.exists():
+            self._stats.misses += 1
             return None
+        self._record_access(path)
         return pd.read_parquet(path)
 
     def write(self, ticker: str, timeframe: str, df: pd.DataFrame) -> None:
         path = self.path_for(ticker, timeframe)
-        df.to_parquet(path)
+        # Readers (and other hosts sharing the directory) never see a torn file
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        self._stats.writes += 1
+
+        now, size = self._now(), path.stat().st_size
+        with self._lock:
+            meta = _load_meta(path)
+            meta.update(fetched_at=now, bytes=size)
+            if self._tracks_access:
+                table = self._usage_table()
+                entry = table.get(path)
+                if entry is None:
+                    last = meta.get("last_access")
+                    entry = table[path] = [
+                        size,
+                        None if last is None else float(last),
+                        int(meta.get("access_count", 0)),
+                        now,
+                    ]
+                entry[0], entry[3] = size, now
+                if path in self._pending:
+                    self._pending.discard(path)
+                    meta.update(last_access=entry[1], access_count=entry[2])
+            _save_meta(path, meta)
+            self._enforce_budget(keep=path)
+
+    def read_meta(self, ticker: str, timeframe: str) -> dict:
+        return _load_meta(self.path_for(ticker, timeframe))
+
+    def update_meta(self, ticker: str, timeframe: str, **fields) -> None:
+        path = self.path_for(ticker, timeframe)
+        meta = _load_meta(path)
+        meta.update(fields)
+        _save_meta(path, meta)
+
+    def evict(self, ticker: str, timeframe: str) -> int:
+        """
+        Delete the cached file and its metadata. Returns the bytes freed.
+        """
+        return self._evict_path(self.path_for(ticker, timeframe))
+
+    def stats(self) -> CacheStats:
+        """
+        Hit/miss/eviction counters of this instance and current disk usage.
+        """
+        files = list(self.root_dir.glob("*.parquet"))
+        return replace(
+            self._stats,
+            files=len(files),
+            total_bytes=sum(p.stat().st_size for p in files),
+        )
+
+    def _now(self) -> float:
+        clock = self.policy.clock if self.policy is not None else utcnow
+        return clock().timestamp()
+
+    @property
+    def _tracks_access(self) -> bool:
+        return self.policy is not None and self.policy.tracks_access
+
+    @staticmethod
+    def _load_usage(path: Path) -> list:
+        meta = _load_meta(path)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        last = meta.get("last_access")
+        fetched = float(meta.get("fetched_at", 0.0))
+        return [
+            size,
+            None if last is None else float(last),
+            int(meta.get("access_count", 0)),
+            fetched,
+        ]
+
+    def _usage_table(self) -> dict[Path, list]:
+        """
+        Sizes and access records of every cached file, scanned once. Callers
+        hold `_lock`.
+        """
+        if self._usage is None:
+            self._usage = {
+                p: self._load_usage(p) for p in self.root_dir.glob("*.parquet")
+            }
+        return self._usage
+
+    def _entry(self, path: Path) -> list:
+        table = self._usage_table()
+        entry = table.get(path)
+        if entry is None:
+            # Written by another process since the scan
+            entry = table[path] = self._load_usage(path)
+        return entry
+
+    def _record_access(self, path: Path) -> None:
+        with self._lock:
+            self._stats.hits += 1
+            if not self._tracks_access:
+                return
+            entry = self._entry(path)
+            entry[1] = self._now()
+            entry[2] += 1
+            self._pending.add(path)
+            _UNFLUSHED.add(self)
+            if len(self._pending) >= ACCESS_FLUSH_EVERY:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Write buffered access records to the sidecars.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            _UNFLUSHED.discard(self)
+            for path in pending:
+                entry = (self._usage or {}).get(path)
+                if entry is None or not path.exists():
+                    continue
+                meta = _load_meta(path)
+                meta.update(last_access=entry[1], access_count=entry[2])
+                _save_meta(path, meta)
+
+    def _evict_path(self, path: Path) -> int:
+        with self._lock:
+            if self._usage is not None:
+                self._usage.pop(path, None)
+            self._pending.discard(path)
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                return 0
+            _meta_path(path).unlink(missing_ok=True)
+            self._stats.evictions += 1
+            self._stats.bytes_evicted += size
+            return size
+
+    def _enforce_budget(self, keep: Path | None = None) -> None:
+        """
+        Evict files by the policy's order until the budget holds. The file
+        just written (`keep`) is never evicted. Callers hold `_lock`.
+        """
+        if self.policy is None or self.policy.max_bytes is None:
+            return
+
+        table = self._usage_table()
+        total = sum(e[0] for e in table.values())
+        if total <= self.policy.max_bytes:
+            return
+
+        entries = [
+            (p, size, fetched if last is None else last, count)
+            for p, (size, last, count, fetched) in table.items()
+            if p != keep
+        ]
+
+        if self.policy.eviction == "lfu":
+            entries.sort(key=lambda e: (e[3], e[2]))
+        else:
+            entries.sort(key=lambda e: e[2])
+
+        for p, size, _, _ in entries:
+            if total <= self.policy.max_bytes:
+                break
+            total -= self._evict_path(p) or size
+
+    def bounds(
+        self, ticker: str, timeframe: str
+    ) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        """
+        First/last timestamps, reading only the index column.
+        """
+        path = self.path_for(ticker, timeframe)
+        if not path.exists():
+            return None
+        name = _index_column(pq.read_schema(path))
+        if name is None:
+            return super().bounds(ticker, timeframe)
+
+        col = pq.read_table(path, columns=[name]).column(name)
+        if len(col) == 0:
+            return None
+        mm = pc.min_max(col)
+        return pd.Timestamp(mm["min"].as_py()), pd.Timestamp(mm["max"].as_py())
+
+    def read_range(
+        self,
+        ticker: str,
+        timeframe: str,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> pd.DataFrame | None:
+        """
+        Read a row/column subset, pushing both down to the Parquet reader.
+        """
+        path = self.path_for(ticker, timeframe)
+        if not path.exists():
+            self._stats.misses += 1
+            return None
+        self._record_access(path)
+        if columns is not None:
+            available = set(pq.read_schema(path).names)
+            columns = [c for c in columns if c in available]
+        df = pd.read_parquet(
+            path, columns=columns, filters=_index_filters(path, start, end)
+        )
+        return slice_timeseries(df.sort_index(), start, end)
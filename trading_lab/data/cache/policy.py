@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from trading_lab.data.types import timeframe_delta
+
+# Trailing bars that the provider may still revise (partial current bar,
+# late prints, end-of-day corrections). Older bars are treated as final.
+DEFAULT_STALE_BARS = {
+    "1m": 5,
+    "2m": 5,
+    "5m": 3,
+    "15m": 2,
+    "30m": 2,
+    "90m": 2,
+    "1h": 2,
+    "1d": 2,
+    "5d": 1,
+    "1wk": 1,
+    "1mo": 1,
+    "3mo": 1,
+}
+
+# Minimum time between two refreshes of the same volatile tail.
+DEFAULT_TTL = {
+    "1m": pd.Timedelta(minutes=1),
+    "2m": pd.Timedelta(minutes=2),
+    "5m": pd.Timedelta(minutes=5),
+    "15m": pd.Timedelta(minutes=15),
+    "30m": pd.Timedelta(minutes=30),
+    "90m": pd.Timedelta(minutes=30),
+    "1h": pd.Timedelta(minutes=30),
+    "1d": pd.Timedelta(hours=1),
+    "5d": pd.Timedelta(hours=6),
+    "1wk": pd.Timedelta(hours=6),
+    "1mo": pd.Timedelta(hours=12),
+    "3mo": pd.Timedelta(hours=12),
+}
+
+EVICTION_MODES = ("lru", "lfu")
+
+
+def utcnow() -> pd.Timestamp:
+    """
+    Current time as a naive UTC timestamp (the cache's reference clock).
+    """
+    return pd.Timestamp.now(tz="UTC").tz_localize(None)
+
+
+def as_naive_utc(ts: pd.Timestamp) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        return ts.tz_convert("UTC").tz_localize(None)
+    return ts
+
+
+@dataclass
+class CachePolicy:
+    """
+    Refresh and retention rules for a cache.
+
+    Parameters
+    ----------
+    stale_bars : dict
+        Per timeframe, how many trailing bars may still be revised. When the
+        cached history ends inside that window, requests reaching it refetch
+        the tail instead of trusting the cached bars.
+    ttl : dict
+        Per timeframe, the minimum age of the last fetch before the volatile
+        tail is refetched again.
+    max_bytes : int, optional
+        Global size budget across all cache files. Files are evicted after
+        each write until the budget holds. None disables eviction (and
+        access tracking).
+    eviction : str
+        "lru" (least recently read) or "lfu" (least frequently read, ties
+        broken by recency).
+    clock : callable
+        Returns "now" as a naive UTC timestamp; injectable for tests.
+    """
+
+    stale_bars: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_STALE_BARS))
+    ttl: dict[str, pd.Timedelta] = field(default_factory=lambda: dict(DEFAULT_TTL))
+    max_bytes: int | None = None
+    eviction: str = "lru"
+    clock: Callable[[], pd.Timestamp] = utcnow
+
+    def __post_init__(self):
+        if self.eviction not in EVICTION_MODES:
+            raise ValueError(
+                f"Unknown eviction mode '{self.eviction}'. Supported: {EVICTION_MODES}"
+            )
+        if self.max_bytes is not None and self.max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+
+    @property
+    def tracks_access(self) -> bool:
+        return self.max_bytes is not None
+
+    def tail_start(
+        self,
+        timeframe: str,
+        last_cached: pd.Timestamp,
+        req_end: pd.Timestamp,
+        fetched_at: float | None,
+    ) -> pd.Timestamp | None:
+        """
+        Start of the cached tail to refetch, or None if the tail is final.
+
+        The tail is refetched only if (a) the last cached bar is recent enough
+        to still be revised, (b) the request reaches into that tail, and
+        (c) the previous fetch is older than the timeframe's TTL.
+        """
+        n_bars = self.stale_bars.get(timeframe, 0)
+        if n_bars <= 0:
+            return None
+
+        now = self.clock()
+        delta = timeframe_delta(timeframe)
+        last = as_naive_utc(last_cached)
+        volatile_from = now - n_bars * delta
+
+        if last < volatile_from:
+            return None
+
+        start = last - n_bars * delta
+        if as_naive_utc(req_end) < start:
+            return None
+
+        ttl = self.ttl.get(timeframe)
+        if (
+            fetched_at is not None
+            and ttl is not None
+            and now - pd.Timestamp(fetched_at, unit="s") < ttl
+        ):
+            return None
+
+        return start
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters for one cache provider instance, plus current disk usage.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    bytes_evicted: int = 0
+    files: int = 0
+    total_bytes: int = 0
@@ -0,0 +1,356 @@
+"""
+Content-addressed snapshots of a Parquet cache.
+
+`ParquetCacheProvider.write` replaces files in place, so the data a run saw
+is gone after the next refresh. A snapshot freezes the cache without
+copying it:
+
+- each cached frame is cut into time chunks (calendar years for daily and
+  slower bars, months for intraday ones); a chunk is stored once, as an
+  immutable Parquet object named by the SHA-256 of its content, so
+  unchanged history is shared by every snapshot and a refresh that only
+  appends bars adds one new object per series;
+- a snapshot is a small JSON manifest listing, per (ticker, timeframe),
+  the chunk hashes with their time bounds, plus the cache metadata; its id
+  is the hash of that listing, so snapshotting an unchanged cache is a
+  no-op returning the same id;
+- files unchanged since the previous snapshot (same size and mtime) are
+  not even re-read: their chunk lists come from a local index.
+
+`SnapshotCacheProvider` is a read-only cache view of one manifest; reads
+go straight to the object files (range reads only open overlapping
+chunks), so a pinned `DataStack` reads as fast as the live cache.
+
+Layout under {cache_root}/_snapshots/:
+    objects/{h[:2]}/{h}.parquet   manifests/{id}.json   index.json
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as pads
+import pyarrow.parquet as pq
+
+from trading_lab.data.cache.base import CacheProvider
+from trading_lab.data.cache.parquet import (
+    ParquetCacheProvider,
+    _index_column,
+    _load_meta,
+    _period_end,
+    _sanitize_ticker,
+)
+from trading_lab.data.cache.policy import utcnow
+from trading_lab.data.format.ohlcv import slice_timeseries
+from trading_lab.data.types import timeframe_delta
+
+SNAPSHOT_DIR = "_snapshots"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _entry_key(ticker: str, timeframe: str) -> str:
+    # Stem of ParquetCacheProvider.path_for
+    return f"{_sanitize_ticker(ticker)}_{timeframe}"
+
+
+def _chunk_keys(index: pd.DatetimeIndex, timeframe: str) -> np.ndarray:
+    """
+    One integer key per row: the calendar year (daily and slower bars) or
+    year-month (intraday bars).
+    """
+    if timeframe_delta(timeframe) < pd.Timedelta(days=1):
+        return index.year.to_numpy() * 12 + index.month.to_numpy()
+    return index.year.to_numpy()
+
+
+def chunk_hash(chunk: pd.DataFrame) -> str:
+    """
+    SHA-256 of a frame's content: columns, dtypes, index and values.
+    """
+    header = json.dumps(
+        [
+            [str(c) for c in chunk.columns],
+            [str(d) for d in chunk.dtypes],
+            str(chunk.index.dtype),
+            chunk.index.name,
+        ]
+    )
+    rows = pd.util.hash_pandas_object(chunk, index=True).to_numpy()
+    h = hashlib.sha256(header.encode())
+    h.update(rows.tobytes())
+    return h.hexdigest()
+
+
+class SnapshotStore:
+    """
+    Object store and manifests of the snapshots of one cache directory.
+    """
+
+    def __init__(self, root_dir: str | Path):
+        self.root_dir = Path(root_dir)
+        for sub in ("objects", "manifests"):
+            (self.root_dir / sub).mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def for_cache(cls, cache: CacheProvider) -> SnapshotStore:
+        if not isinstance(cache, ParquetCacheProvider):
+            raise TypeError("snapshots need a ParquetCacheProvider")
+        return cls(Path(cache.root_dir) / SNAPSHOT_DIR)
+
+    def object_path(self, digest: str) -> Path:
+        return self.root_dir / "objects" / digest[:2] / f"{digest}.parquet"
+
+    def manifest_path(self, snapshot_id: str) -> Path:
+        return self.root_dir / "manifests" / f"{snapshot_id}.json"
+
+    def _put(self, chunk: pd.DataFrame) -> str:
+        digest = chunk_hash(chunk)
+        path = self.object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            chunk.to_parquet(tmp)
+            os.replace(tmp, path)
+        return digest
+
+    def _load_index(self) -> dict:
+        try:
+            return json.loads((self.root_dir / "index.json").read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _chunks_of(self, path: Path, timeframe: str) -> list[dict]:
+        df = pd.read_parquet(path).sort_index()
+        if df.empty:
+            # Keep the schema: one row-less chunk without time bounds
+            return [{"hash": self._put(df), "start": None, "end": None, "rows": 0}]
+        keys = _chunk_keys(pd.DatetimeIndex(df.index), timeframe)
+        cuts = np.flatnonzero(np.diff(keys)) + 1
+        chunks = []
+        for a, b in zip(np.r_[0, cuts], np.r_[cuts, len(df)]):
+            part = df.iloc[a:b]
+            chunks.append(
+                {
+                    "hash": self._put(part),
+                    "start": part.index[0].isoformat(),
+                    "end": part.index[-1].isoformat(),
+                    "rows": int(b - a),
+                }
+            )
+        return chunks
+
+    def create(self, cache: ParquetCacheProvider, label: str | None = None) -> str:
+        """
+        Snapshot every (ticker, timeframe) in the cache; returns the id.
+        """
+        index = self._load_index()
+        entries = {}
+        for path in sorted(Path(cache.root_dir).glob("*.parquet")):
+            stat = path.stat()
+            fingerprint = [stat.st_size, stat.st_mtime_ns]
+            known = index.get(path.stem)
+            tf = path.stem.rpartition("_")[2]
+            if known is not None and known["fingerprint"] == fingerprint:
+                chunks = known["chunks"]
+            else:
+                chunks = self._chunks_of(path, tf)
+                index[path.stem] = {"fingerprint": fingerprint, "chunks": chunks}
+
+            meta = _load_meta(path)
+            # Access bookkeeping changes on every read; it is not data
+            for k in ("last_access", "access_count"):
+                meta.pop(k, None)
+            entries[path.stem] = {"timeframe": tf, "chunks": chunks, "meta": meta}
+
+        _write_atomic(
+            self.root_dir / "index.json",
+            json.dumps(index, sort_keys=True).encode(),
+        )
+
+        body = json.dumps(entries, sort_keys=True, default=str)
+        snapshot_id = hashlib.sha256(body.encode()).hexdigest()[:16]
+        mpath = self.manifest_path(snapshot_id)
+        if not mpath.exists():
+            manifest = {
+                "id": snapshot_id,
+                "created_at": str(utcnow()),
+                "label": label,
+                "entries": entries,
+            }
+            _write_atomic(mpath, json.dumps(manifest, default=str).encode())
+        return snapshot_id
+
+    def manifest(self, snapshot_id: str) -> dict:
+        path = self.manifest_path(snapshot_id)
+        if not path.exists():
+            raise KeyError(f"unknown snapshot {snapshot_id!r}")
+        return json.loads(path.read_text())
+
+    def list(self) -> pd.DataFrame:
+        """
+        One row per snapshot: id, created_at, label, series and rows.
+        """
+        rows = []
+        for path in self.root_dir.glob("manifests/*.json"):
+            m = json.loads(path.read_text())
+            rows.append(
+                {
+                    "id": m["id"],
+                    "created_at": pd.Timestamp(m["created_at"]),
+                    "label": m.get("label"),
+                    "series": len(m["entries"]),
+                    "rows": sum(
+                        c["rows"] for e in m["entries"].values() for c in e["chunks"]
+                    ),
+                }
+            )
+        cols = ["id", "created_at", "label", "series", "rows"]
+        return pd.DataFrame(rows, columns=cols).sort_values("created_at")
+
+    def delete(self, snapshot_id: str) -> None:
+        """
+        Drop a manifest; its objects go at the next `gc`.
+        """
+        self.manifest_path(snapshot_id).unlink(missing_ok=True)
+
+    def gc(self) -> int:
+        """
+        Delete objects no manifest refers to. Returns the bytes freed.
+        """
+        live = set()
+        for path in self.root_dir.glob("manifests/*.json"):
+            for e in json.loads(path.read_text())["entries"].values():
+                live.update(c["hash"] for c in e["chunks"])
+
+        # Keep the incremental index consistent with the objects
+        index = self._load_index()
+        index = {
+            k: v
+            for k, v in index.items()
+            if all(c["hash"] in live for c in v["chunks"])
+        }
+        _write_atomic(
+            self.root_dir / "index.json",
+            json.dumps(index, sort_keys=True).encode(),
+        )
+
+        freed = 0
+        for path in self.root_dir.glob("objects/*/*.parquet"):
+            if path.stem not in live:
+                freed += path.stat().st_size
+                path.unlink()
+        return freed
+
+    def open(self, snapshot_id: str) -> SnapshotCacheProvider:
+        return SnapshotCacheProvider(self, self.manifest(snapshot_id))
+
+
+class SnapshotCacheProvider(CacheProvider):
+    """
+    Read-only cache view of one snapshot.
+
+    Keys resolve like `ParquetCacheProvider.path_for`; bounds and metadata
+    come from the manifest without touching the data.
+    """
+
+    read_only = True
+
+    def __init__(self, store: SnapshotStore, manifest: dict):
+        self.store = store
+        self.snapshot_id = manifest["id"]
+        self.entries = manifest["entries"]
+
+    def path_for(self, ticker: str, timeframe: str) -> Path:
+        # Logical name only: the data live in the object store
+        key = _entry_key(ticker, timeframe)
+        return self.store.manifest_path(self.snapshot_id).with_name(f"{key}.parquet")
+
+    def _entry(self, ticker: str, timeframe: str) -> dict | None:
+        return self.entries.get(_entry_key(ticker, timeframe))
+
+    def _read_chunks(
+        self, chunks: list[dict], columns: Sequence[str] | None = None
+    ) -> pd.DataFrame:
+        paths = [str(self.store.object_path(c["hash"])) for c in chunks]
+        dataset = pads.dataset(paths, format="parquet")
+        if columns is not None:
+            schema = pq.read_schema(paths[0])
+            keep = [c for c in columns if c in schema.names]
+            index_col = _index_column(schema)
+            if index_col is not None:
+                keep.append(index_col)
+            table = dataset.to_table(columns=keep)
+        else:
+            table = dataset.to_table()
+        df = table.to_pandas()
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        return df
+
+    def read(self, ticker: str, timeframe: str) -> pd.DataFrame | None:
+        entry = self._entry(ticker, timeframe)
+        if entry is None:
+            return None
+        return self._read_chunks(entry["chunks"])
+
+    def write(self, ticker: str, timeframe: str, df: pd.DataFrame) -> None:
+        raise PermissionError(f"snapshot {self.snapshot_id} is read-only")
+
+    def bounds(
+        self, ticker: str, timeframe: str
+    ) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        entry = self._entry(ticker, timeframe)
+        if entry is None:
+            return None
+        chunks = entry["chunks"]
+        if chunks[0]["start"] is None:
+            return None
+        return pd.Timestamp(chunks[0]["start"]), pd.Timestamp(chunks[-1]["end"])
+
+    def read_range(
+        self,
+        ticker: str,
+        timeframe: str,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> pd.DataFrame | None:
+        """
+        Read only the chunks overlapping [start, end], then slice exactly.
+        """
+        entry = self._entry(ticker, timeframe)
+        if entry is None:
+            return None
+        chunks = entry["chunks"]
+        if chunks[0]["start"] is None:
+            return self._read_chunks(chunks, columns)
+        # Chunks are calendar periods: compare on naive dates, padded a day
+        # either side, and let slice_timeseries apply the exact bounds
+        lo = None if start is None else pd.Timestamp(start).tz_localize(None)
+        hi = None if end is None else _period_end(end).tz_localize(None)
+        day = pd.Timedelta(days=1)
+        keep = [
+            c
+            for c in chunks
+            if (lo is None or pd.Timestamp(c["end"]).tz_localize(None) + day >= lo)
+            and (hi is None or pd.Timestamp(c["start"]).tz_localize(None) - day <= hi)
+        ]
+        if not keep:
+            keep = chunks[:1]
+        df = self._read_chunks(keep, columns)
+        return slice_timeseries(df, start, end)
+
+    def read_meta(self, ticker: str, timeframe: str) -> dict:
+        entry = self._entry(ticker, timeframe)
+        return dict(entry["meta"]) if entry is not None else {}
@@ -1,17 +1,34 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from collections.abc import AsyncIterator, Iterator, Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass, replace
+from itertools import pairwise
 from pathlib import Path
-from typing import Sequence
 
 import pandas as pd
 
-from trading_lab.data.types import validate_timeframe
-from trading_lab.data.format.ohlcv import normalize_ohlcv, merge_timeseries
-from trading_lab.data.providers.base import DataProvider
-from trading_lab.data.providers.yahoo import YahooDataProvider
 from trading_lab.data.cache.base import CacheProvider
 from trading_lab.data.cache.parquet import ParquetCacheProvider
+from trading_lab.data.cache.policy import CachePolicy, utcnow
+from trading_lab.data.format.ohlcv import merge_timeseries, normalize_ohlcv
+from trading_lab.data.lazy import LazyOHLCV
+from trading_lab.data.providers.base import (
+    AsyncDataProvider,
+    DataProvider,
+    as_async_provider,
+)
+from trading_lab.data.quality import QualityRules, screen_ohlcv
+from trading_lab.data.revisions import (
+    REFETCH,
+    RESCALE,
+    UNCHANGED,
+    RevisionCheck,
+    apply_rescale,
+    detect_revision,
+)
+from trading_lab.data.types import timeframe_delta, validate_timeframe
 
 
 def _to_ts(x: str) -> pd.Timestamp:
@@ -26,13 +43,26 @@ def _missing_ranges(
 
     Returns a list of (start, end) ranges to fetch.
     """
+    if existing is None or existing.empty:
+        return [(start, end)]
+
+    return _missing_ranges_for_bounds(
+        (existing.index.min(), existing.index.max()), start, end
+    )
+
+
+def _missing_ranges_for_bounds(
+    bounds: tuple[pd.Timestamp, pd.Timestamp] | None, start: str, end: str
+) -> list[tuple[str, str]]:
+    """
+    Same as _missing_ranges, from the cached (first, last) timestamps only.
+    """
     req_start, req_end = _to_ts(start), _to_ts(end)
 
-    if existing is None or existing.empty:
+    if bounds is None:
         return [(start, end)]
 
-    ex_start = existing.index.min()
-    ex_end = existing.index.max()
+    ex_start, ex_end = bounds
 
     ranges = []
 
@@ -54,10 +84,368 @@ def _missing_ranges(
     return cleaned
 
 
+def _quarantined(meta: dict) -> pd.DatetimeIndex:
+    """
+    Sorted timestamps of the bars the quality screen dropped from the cache.
+    """
+    stamps = [pd.Timestamp(x) for x in meta.get("quarantined", [])]
+    return pd.DatetimeIndex(stamps).sort_values()
+
+
+def _with_tail_refresh(
+    needed: list[tuple[str, str]], tail_start: pd.Timestamp, end: str
+) -> list[tuple[str, str]]:
+    """
+    Replace the right-side extension (if any) by one segment starting at the
+    volatile tail, so the tail and the new bars are fetched together.
+    """
+    tail_start = tail_start.normalize()
+    kept = [(a, b) for a, b in needed if _to_ts(a) < tail_start]
+    seg_end = max([_to_ts(end)] + [_to_ts(b) for a, b in needed])
+    kept.append((str(tail_start.date()), str(seg_end.date())))
+    return kept
+
+
+def _with_revision_probe(
+    needed: list[tuple[str, str]], cached_start: pd.Timestamp, probe_start: pd.Timestamp
+) -> list[tuple[str, str]]:
+    """
+    Start every right-side segment at `probe_start` (at the latest), so that
+    it overlaps the cached tail and can be compared with it.
+    """
+    out = []
+    for a, b in needed:
+        if _to_ts(a) >= cached_start and _to_ts(a) > probe_start:
+            a = str(probe_start.date())
+        out.append((a, b))
+    return out
+
+
+def _time_chunks(
+    start: str, end: str, chunk: str | pd.Timedelta
+) -> list[tuple[pd.Timestamp | str, pd.Timestamp | str]]:
+    """
+    Split [start, end] into consecutive inclusive windows of length `chunk`.
+
+    Inner boundaries are exact timestamps; the last window keeps the caller's
+    `end` so that partial-date strings keep pandas' inclusive semantics.
+    """
+    req_start, req_end = _to_ts(start), _to_ts(end)
+    edges = list(pd.date_range(req_start, req_end, freq=chunk))
+    if not edges or edges[0] != req_start:
+        edges.insert(0, req_start)
+
+    one_ns = pd.Timedelta(1, "ns")
+    out: list[tuple[pd.Timestamp | str, pd.Timestamp | str]] = []
+    for a, b in pairwise(edges):
+        out.append((a, b - one_ns))
+    out.append((edges[-1], end))
+    return out
+
+
+def _tagged(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    # Lets feature functions name their outputs "{ticker}_..."
+    df.attrs["ticker"] = ticker
+    return df
+
+
+def _merge_fetched(
+    merged: pd.DataFrame | None, fetched: dict[str, pd.DataFrame], t: str
+) -> pd.DataFrame | None:
+    df_new = fetched.get(t)
+    if df_new is None or df_new.empty:
+        return merged
+    return merge_timeseries(merged, normalize_ohlcv(df_new))
+
+
 @dataclass
 class DataStack:
-    provider: DataProvider
+    provider: DataProvider | AsyncDataProvider
     cache: CacheProvider
+    # Bars of cached history re-fetched with every right-side extension to
+    # detect retroactive adjustment revisions (0 disables the probe).
+    revision_probe_bars: int = 0
+    # Screening of every frame written to the cache (None disables it)
+    quality: QualityRules | None = None
+
+    def _segments(
+        self,
+        t: str,
+        tf: str,
+        bounds: tuple[pd.Timestamp, pd.Timestamp] | None,
+        start: str,
+        end: str,
+    ) -> list[tuple[str, str]]:
+        """
+        Segments to fetch: missing edges, plus the volatile cached tail when
+        the cache policy says it may have been revised. Nothing for a
+        read-only (pinned) cache. Quarantined bars count as covered: they
+        were fetched and dropped, and fetching them again on every call
+        would only drop them again.
+        """
+        if self.cache.read_only:
+            return []
+        if bounds is None:
+            return _missing_ranges_for_bounds(bounds, start, end)
+
+        meta = self.cache.read_meta(t, tf)
+        quarantined = _quarantined(meta)
+        if len(quarantined):
+            bounds = (
+                min(bounds[0], quarantined[0]),
+                max(bounds[1], quarantined[-1]),
+            )
+        needed = _missing_ranges_for_bounds(bounds, start, end)
+
+        policy = self.cache.policy
+        if policy is not None:
+            fetched_at = meta.get("fetched_at")
+            tail = policy.tail_start(tf, bounds[1], _to_ts(end), fetched_at)
+            if tail is not None:
+                needed = _with_tail_refresh(needed, tail, end)
+
+        if self.revision_probe_bars > 0:
+            probe_start = bounds[1] - self.revision_probe_bars * timeframe_delta(tf)
+            needed = _with_revision_probe(needed, bounds[0], probe_start)
+
+        return needed
+
+    def _probe_ignore(self, t: str, tf: str, cached: pd.DataFrame) -> pd.Index:
+        """
+        Cached bars left out of the revision comparison: the volatile tail
+        (per the cache policy, and at least the last bar, which may still
+        have been forming when cached), and the bars flagged by the quality
+        screen, which the cache may hold repaired while the provider still
+        serves them raw. Neither difference is a revision, and neither must
+        trigger a rescale or a refetch.
+        """
+        n_tail = 1
+        policy = self.cache.policy
+        if policy is not None:
+            n_tail = max(n_tail, policy.stale_bars.get(tf, 0))
+        ignore = cached.index[-n_tail:]
+
+        bars = self.cache.read_meta(t, tf).get("quality", {}).get("bars", [])
+        if bars:
+            flagged = pd.DatetimeIndex([pd.Timestamp(b["ts"]) for b in bars])
+            ignore = ignore.union(flagged.intersection(cached.index))
+        return ignore
+
+    def _absorb(
+        self,
+        t: str,
+        tf: str,
+        cached: pd.DataFrame | None,
+        merged: pd.DataFrame | None,
+        fetched: dict[str, pd.DataFrame],
+        segment: tuple[str, str],
+        probe: bool = True,
+    ) -> tuple[pd.DataFrame | None, RevisionCheck, tuple[str, str] | None]:
+        """
+        Merge one fetched segment, checking its overlap with the cached bars
+        (volatile tail excluded) for adjustment revisions when the probe is
+        enabled.
+
+        Returns the merged frame, the revision check and, if the revision
+        cannot be repaired by a rescale, the range to refetch in full.
+        """
+        df_new = fetched.get(t)
+        if df_new is None or df_new.empty:
+            return merged, RevisionCheck(UNCHANGED), None
+        df_new = normalize_ohlcv(df_new)
+
+        check = RevisionCheck(UNCHANGED)
+        refetch = None
+        if probe and cached is not None and not cached.empty:
+            check = detect_revision(
+                cached, df_new, ignore=self._probe_ignore(t, tf, cached)
+            )
+            if check.kind != UNCHANGED:
+                events = self.cache.read_meta(t, tf).get("adjustment_events", [])
+                policy = self.cache.policy
+                clock = policy.clock if policy is not None else utcnow
+                events.append(check.event(*segment, now=clock()))
+                self.cache.update_meta(t, tf, adjustment_events=events[-100:])
+            if check.kind == RESCALE:
+                merged = apply_rescale(merged, check.factors, rows=cached.index)
+            elif check.kind == REFETCH:
+                refetch = (str(cached.index.min().date()), segment[1])
+
+        return merge_timeseries(merged, df_new), check, refetch
+
+    def _read_cached(
+        self, t: str, tf: str, start: str, end: str, verbose: bool
+    ) -> tuple[pd.DataFrame | None, list[tuple[str, str]]]:
+        """
+        Read the cached frame for (t, tf) and plan the segments to fetch.
+        """
+        cached = self.cache.read(t, tf)
+        if cached is not None and not cached.empty:
+            cached = normalize_ohlcv(cached)
+
+        bounds = None
+        if cached is not None and not cached.empty:
+            bounds = (cached.index.min(), cached.index.max())
+        needed = self._segments(t, tf, bounds, start, end)
+
+        if verbose:
+            cache_path = self.cache.path_for(t, tf)
+            if cached is None or cached.empty:
+                print(
+                    f"[CACHE] MISS {t} {tf} -> will fetch {needed} ({cache_path.name})"
+                )
+            else:
+                print(
+                    f"[CACHE] HIT  {t} {tf} [{cached.index.min()} → {cached.index.max()}] -> need {needed}"
+                )
+
+        return cached, needed
+
+    def _persist(
+        self,
+        t: str,
+        tf: str,
+        start: str,
+        end: str,
+        merged: pd.DataFrame | None,
+        needed: list[tuple[str, str]],
+    ) -> pd.DataFrame:
+        """
+        Persist the merged frame if anything was fetched, and return it.
+
+        With quality rules, the whole merged frame is screened first (a
+        spike at the previous last bar is only confirmed by the next one)
+        and the summary is stored in the cache metadata, along with the
+        timestamps of quarantined bars (see `_segments`).
+        """
+        report = None
+        if needed and self.quality is not None and merged is not None:
+            merged, report = screen_ohlcv(merged, self.quality)
+
+        if merged is None or merged.empty:
+            raise RuntimeError(f"No data available for {t} ({tf}) in {start}..{end}")
+
+        # Persist updated cache if we fetched anything
+        if needed:
+            self.cache.write(t, tf, merged)
+            if report is not None:
+                fields = {"quality": report.meta()}
+                if report.action == "quarantine":
+                    # Bars screened again this time replace their old record
+                    dropped = report.flags.index[report.flags.to_numpy() != 0]
+                    old = _quarantined(self.cache.read_meta(t, tf))
+                    if len(old):
+                        dropped = old.difference(report.flags.index).union(dropped)
+                    fields["quarantined"] = [ts.isoformat() for ts in dropped]
+                self.cache.update_meta(t, tf, **fields)
+
+        return merged
+
+    def plan(
+        self, ticker: str, timeframe: str, start: str, end: str
+    ) -> list[tuple[str, str]]:
+        """
+        Segments `sync` would fetch for (ticker, timeframe) over [start, end],
+        from the cache bounds and metadata only. Empty when the cache is up
+        to date (or read-only).
+        """
+        tf = validate_timeframe(timeframe)
+        return self._segments(ticker, tf, self.cache.bounds(ticker, tf), start, end)
+
+    def _require_blocking(self, method: str, alternative: str | None = None):
+        """
+        Raise TypeError if `method` would call an AsyncDataProvider
+        synchronously (and get a coroutine back instead of data).
+        """
+        if isinstance(self.provider, AsyncDataProvider):
+            hint = (
+                f"; use {alternative} with an AsyncDataProvider" if alternative else ""
+            )
+            raise TypeError(f"{method} needs a blocking DataProvider{hint}")
+
+    def sync(
+        self,
+        ticker: str,
+        timeframe: str,
+        start: str,
+        end: str,
+        verbose: bool = False,
+        **provider_kwargs,
+    ) -> pd.DataFrame:
+        """
+        Bring the cache for (ticker, timeframe) up to date over [start, end]
+        and return the full merged frame.
+        """
+        t, tf = ticker, validate_timeframe(timeframe)
+        self._require_blocking("sync", "aget_ohlcv")
+
+        cached, needed = self._read_cached(t, tf, start, end, verbose)
+        merged = cached
+
+        # Fetch only missing segments
+        for seg_start, seg_end in needed:
+            fetched = self.provider.fetch_ohlcv(
+                tickers=t,
+                start=seg_start,
+                end=seg_end,
+                timeframe=tf,
+                **provider_kwargs,
+            )
+            merged, _, refetch = self._absorb(
+                t,
+                tf,
+                cached,
+                merged,
+                fetched,
+                (seg_start, seg_end),
+                self.revision_probe_bars > 0,
+            )
+            if refetch is not None:
+                if verbose:
+                    print(f"[CACHE] REVISED {t} {tf} -> refetch {refetch}")
+                fetched = self.provider.fetch_ohlcv(
+                    tickers=t,
+                    start=refetch[0],
+                    end=refetch[1],
+                    timeframe=tf,
+                    **provider_kwargs,
+                )
+                merged = _merge_fetched(merged, fetched, t)
+
+        return self._persist(t, tf, start, end, merged, needed)
+
+    def _ensure_cached(
+        self,
+        t: str,
+        tf: str,
+        start: str,
+        end: str,
+        verbose: bool,
+        provider_kwargs: dict,
+    ) -> None:
+        """
+        Make sure the cache covers [start, end] for (t, tf), without reading
+        the cached frame when it already does.
+        """
+        bounds = self.cache.bounds(t, tf)
+        needed = self._segments(t, tf, bounds, start, end)
+        if needed:
+            self.sync(t, tf, start, end, verbose, **provider_kwargs)
+        elif verbose:
+            print(f"[CACHE] HIT  {t} {tf} [{bounds[0]} → {bounds[1]}] -> need []")
+
+    def _load(
+        self,
+        t: str,
+        tf: str,
+        start: str,
+        end: str,
+        verbose: bool,
+        provider_kwargs: dict,
+    ) -> pd.DataFrame:
+        merged = self.sync(t, tf, start, end, verbose, **provider_kwargs)
+        # Return requested slice
+        return _tagged(merged.loc[start:end].copy(), t)
 
     def get_ohlcv(
         self,
@@ -78,51 +466,254 @@ class DataStack:
         out = []
 
         for t in tlist:
-            cached = self.cache.read(t, tf)
-            if cached is not None and not cached.empty:
-                cached = normalize_ohlcv(cached)
+            out.append(self._load(t, tf, start, end, verbose, provider_kwargs))
 
-            needed = _missing_ranges(cached, start, end)
+        return tuple(out)
 
-            if verbose:
-                cache_path = self.cache.path_for(t, tf)
-                if cached is None or cached.empty:
-                    print(
-                        f"[CACHE] MISS {t} {tf} -> will fetch {needed} ({cache_path.name})"
-                    )
-                else:
-                    print(
-                        f"[CACHE] HIT  {t} {tf} [{cached.index.min()} → {cached.index.max()}] -> need {needed}"
-                    )
-
-            # Fetch only missing segments
-            merged = cached
-            for seg_start, seg_end in needed:
+    def iter_ohlcv(
+        self,
+        tickers: str | Sequence[str],
+        start: str,
+        end: str,
+        timeframe: str = "1d",
+        verbose: bool = True,
+        chunk: str | pd.Timedelta | None = None,
+        **provider_kwargs,
+    ) -> Iterator[tuple[str, pd.DataFrame]]:
+        """
+        Generator variant of get_ohlcv yielding (ticker, DataFrame) pairs.
+
+        Only one ticker is held in memory at a time. With `chunk` (a pandas
+        frequency such as "30D" or "1MS"), each ticker's cache is brought up
+        to date first and then re-read from the cache one time window at a
+        time, so long intraday histories are yielded as consecutive slices
+        of bounded size. A ticker may then appear in several pairs.
+        """
+        tf = validate_timeframe(timeframe)
+        tlist = [tickers] if isinstance(tickers, str) else list(tickers)
+
+        for t in tlist:
+            if chunk is None:
+                yield t, self._load(t, tf, start, end, verbose, provider_kwargs)
+                continue
+
+            # Sync the cache, then drop the full frame before chunked reads
+            self.sync(t, tf, start, end, verbose, **provider_kwargs)
+
+            for a, b in _time_chunks(start, end, chunk):
+                df = self.cache.read_range(t, tf, start=a, end=b)
+                if df is None or df.empty:
+                    continue
+                yield t, _tagged(normalize_ohlcv(df), t)
+
+    def check_revisions(
+        self,
+        tickers: str | Sequence[str],
+        timeframe: str = "1d",
+        probe_bars: int = 5,
+        verbose: bool = True,
+        **provider_kwargs,
+    ) -> dict[str, RevisionCheck]:
+        """
+        Fetch only the last `probe_bars` cached bars of each ticker and
+        compare them with the cache.
+
+        Uniform changes (new dividend/split adjustment) are applied to the
+        cached history as a vectorized rescale; anything else triggers a full
+        refetch of that ticker only. Detected events are appended to the
+        cache metadata under "adjustment_events".
+        """
+        tf = validate_timeframe(timeframe)
+        self._require_blocking("check_revisions")
+        tlist = [tickers] if isinstance(tickers, str) else list(tickers)
+        delta = timeframe_delta(tf)
+
+        out: dict[str, RevisionCheck] = {}
+        for t in tlist:
+            cached = self.cache.read(t, tf)
+            if cached is None or cached.empty:
+                continue
+            cached = normalize_ohlcv(cached)
+
+            last = cached.index.max()
+            segment = (
+                str((last - probe_bars * delta).date()),
+                str((last + delta).date()),
+            )
+            fetched = self.provider.fetch_ohlcv(
+                tickers=t,
+                start=segment[0],
+                end=segment[1],
+                timeframe=tf,
+                **provider_kwargs,
+            )
+            merged, check, refetch = self._absorb(
+                t, tf, cached, cached, fetched, segment
+            )
+            if refetch is not None:
                 fetched = self.provider.fetch_ohlcv(
                     tickers=t,
-                    start=seg_start,
-                    end=seg_end,
+                    start=refetch[0],
+                    end=refetch[1],
                     timeframe=tf,
                     **provider_kwargs,
                 )
-                df_new = fetched.get(t)
-                if df_new is None or df_new.empty:
-                    continue
-                merged = merge_timeseries(merged, normalize_ohlcv(df_new))
+                merged = _merge_fetched(merged, fetched, t)
+
+            if check.kind != UNCHANGED:
+                self.cache.write(t, tf, merged)
+            if verbose:
+                print(f"[REVISION] {t} {tf} -> {check.kind} {check.factors or ''}")
+            out[t] = check
+
+        return out
+
+    def snapshot(self, label: str | None = None) -> str:
+        """
+        Freeze the current Parquet cache as a content-addressed snapshot and
+        return its id (see `trading_lab.data.cache.snapshot`).
+        """
+        from trading_lab.data.cache.snapshot import SnapshotStore
+
+        return SnapshotStore.for_cache(self.cache).create(self.cache, label=label)
+
+    def pin(self, snapshot_id: str) -> DataStack:
+        """
+        A stack reading from snapshot `snapshot_id` of this stack's cache.
+
+        The pinned stack never fetches or writes: requests are answered
+        from the snapshot, clipped to what it holds.
+        """
+        from trading_lab.data.cache.snapshot import SnapshotStore
+
+        store = SnapshotStore.for_cache(self.cache)
+        return replace(self, cache=store.open(snapshot_id), revision_probe_bars=0)
+
+    def lazy(
+        self,
+        ticker: str,
+        start: str,
+        end: str,
+        timeframe: str = "1d",
+        verbose: bool = True,
+        **provider_kwargs,
+    ) -> LazyOHLCV:
+        """
+        Deferred OHLCV handle for one ticker.
+
+        Nothing is read until `.collect()`; column selections made before any
+        `.pipe()` step are pushed down to the cache reader, e.g.
+
+            ds.lazy("^FCHI", "2000-01-01", "2025-12-31")["Adj Close"]
+              .pipe(log_returns)
+              .collect()
+        """
+        return LazyOHLCV(
+            stack=self,
+            ticker=ticker,
+            start=start,
+            end=end,
+            timeframe=validate_timeframe(timeframe),
+            verbose=verbose,
+            provider_kwargs=provider_kwargs,
+        )
 
-            if merged is None or merged.empty:
-                raise RuntimeError(
-                    f"No data available for {t} ({tf}) in {start}..{end}"
+    async def _aload(
+        self,
+        provider: AsyncDataProvider,
+        executor: Executor | None,
+        t: str,
+        tf: str,
+        start: str,
+        end: str,
+        verbose: bool,
+        provider_kwargs: dict,
+    ) -> pd.DataFrame:
+        loop = asyncio.get_running_loop()
+
+        # Parquet I/O is blocking: keep it off the event loop
+        cached, needed = await loop.run_in_executor(
+            executor, self._read_cached, t, tf, start, end, verbose
+        )
+        merged = cached
+
+        for seg_start, seg_end in needed:
+            fetched = await provider.fetch_ohlcv(
+                tickers=t,
+                start=seg_start,
+                end=seg_end,
+                timeframe=tf,
+                **provider_kwargs,
+            )
+            merged, _, refetch = await loop.run_in_executor(
+                executor,
+                self._absorb,
+                t,
+                tf,
+                cached,
+                merged,
+                fetched,
+                (seg_start, seg_end),
+                self.revision_probe_bars > 0,
+            )
+            if refetch is not None:
+                fetched = await provider.fetch_ohlcv(
+                    tickers=t,
+                    start=refetch[0],
+                    end=refetch[1],
+                    timeframe=tf,
+                    **provider_kwargs,
                 )
+                merged = _merge_fetched(merged, fetched, t)
 
-            # Persist updated cache if we fetched anything
-            if needed:
-                self.cache.write(t, tf, merged)
+        merged = await loop.run_in_executor(
+            executor, self._persist, t, tf, start, end, merged, needed
+        )
+        return _tagged(merged.loc[start:end].copy(), t)
+
+    async def aget_ohlcv(
+        self,
+        tickers: str | Sequence[str],
+        start: str,
+        end: str,
+        timeframe: str = "1d",
+        verbose: bool = True,
+        max_concurrency: int = 8,
+        executor: Executor | None = None,
+        **provider_kwargs,
+    ) -> AsyncIterator[tuple[str, pd.DataFrame]]:
+        """
+        Asyncio variant of get_ohlcv.
 
-            # Return requested slice
-            out.append(merged.loc[start:end].copy())
+        Yields (ticker, DataFrame) pairs in completion order. At most
+        `max_concurrency` tickers are in flight; blocking providers and cache
+        I/O run in `executor` (default: the loop's thread pool). Closing the
+        iterator early, or cancelling the consuming task, cancels the
+        outstanding tickers.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
 
-        return tuple(out)
+        tf = validate_timeframe(timeframe)
+        tlist = [tickers] if isinstance(tickers, str) else list(tickers)
+        provider = as_async_provider(self.provider, executor=executor)
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def one(t: str) -> tuple[str, pd.DataFrame]:
+            async with sem:
+                df = await self._aload(
+                    provider, executor, t, tf, start, end, verbose, provider_kwargs
+                )
+                return t, df
+
+        tasks = [asyncio.ensure_future(one(t)) for t in tlist]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     def get_price_series(self, ticker: str, start: str, end: str) -> pd.DataFrame:
         """
@@ -143,22 +734,60 @@ class DataStackBuilder:
     Builder to compose a DataStack with:
     - data provider (Yahoo default)
     - cache provider (Parquet default)
+
+    The default Yahoo provider is only imported and constructed in build(),
+    so cache-only stacks never pay the yfinance import.
     """
 
     def __init__(self):
-        self._provider: DataProvider = YahooDataProvider()
+        self._provider: DataProvider | AsyncDataProvider | None = None
         self._cache: CacheProvider | None = None
+        self._revision_probe_bars = 0
+        self._quality: QualityRules | None = None
 
-    def with_provider(self, provider: DataProvider) -> "DataStackBuilder":
+    def with_provider(
+        self, provider: DataProvider | AsyncDataProvider
+    ) -> DataStackBuilder:
         self._provider = provider
         return self
 
-    def with_parquet_cache(self, root_dir: str | Path) -> "DataStackBuilder":
-        self._cache = ParquetCacheProvider(Path(root_dir))
+    def with_parquet_cache(
+        self, root_dir: str | Path, policy: CachePolicy | None = None
+    ) -> DataStackBuilder:
+        self._cache = ParquetCacheProvider(Path(root_dir), policy=policy)
+        return self
+
+    def with_revision_probe(self, n_bars: int) -> DataStackBuilder:
+        """
+        Overlap every cache extension with the last `n_bars` cached bars to
+        detect retroactive adjustment revisions. The volatile tail (at least
+        the last cached bar) is not compared, so `n_bars` should exceed it.
+        """
+        self._revision_probe_bars = n_bars
+        return self
+
+    def with_quality_checks(
+        self, rules: QualityRules | None = None, **kwargs
+    ) -> DataStackBuilder:
+        """
+        Screen every frame written to the cache for bad bars, e.g.
+        `with_quality_checks(action="repair")`; keyword arguments build
+        the QualityRules when none are given.
+        """
+        self._quality = rules if rules is not None else QualityRules(**kwargs)
         return self
 
     def build(self) -> DataStack:
         if self._cache is None:
             # Default cache directory
             self._cache = ParquetCacheProvider(Path("data/cache"))
-        return DataStack(provider=self._provider, cache=self._cache)
+        if self._provider is None:
+            from trading_lab.data.providers.yahoo import YahooDataProvider
+
+            self._provider = YahooDataProvider()
+        return DataStack(
+            provider=self._provider,
+            cache=self._cache,
+            revision_probe_bars=self._revision_probe_bars,
+            quality=self._quality,
+        )
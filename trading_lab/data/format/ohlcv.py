@@ -41,3 +41,30 @@ def merge_timeseries(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
     merged = merged[~merged.index.duplicated(keep="last")]
     merged = merged.sort_index()
     return merged
+
+
+def slice_timeseries(
+    df: pd.DataFrame,
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    """
+    Inclusive `.loc[start:end]` slice on a sorted DatetimeIndex.
+
+    Timestamp bounds are aligned to the index timezone (naive bounds are
+    read as wall-clock time in the index's zone).
+    """
+    tz = getattr(df.index, "tz", None)
+
+    def _align(x):
+        if not isinstance(x, pd.Timestamp):
+            return x
+        if tz is not None and x.tzinfo is None:
+            return x.tz_localize(tz)
+        if tz is None and x.tzinfo is not None:
+            return x.tz_localize(None)
+        return x
+
+    # Slice each side separately: pandas refuses mixed string/Timestamp
+    # bounds on tz-aware indexes.
+    return df.loc[_align(start) :].loc[: _align(end)]
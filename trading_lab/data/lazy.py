@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from trading_lab.data.datastack import DataStack
+
+
+@dataclass(frozen=True)
+class LazyOHLCV:
+    """
+    Deferred OHLCV query for one (ticker, timeframe) returned by DataStack.lazy.
+
+    The handle only records the request: the date range, an optional column
+    projection and a chain of functions (e.g. feature calls) to apply. Every
+    method returns a new handle; `collect()` syncs the cache if needed, reads
+    only the projected rows/columns and runs the chain.
+    """
+
+    stack: DataStack
+    ticker: str
+    start: str
+    end: str
+    timeframe: str = "1d"
+    verbose: bool = True
+    provider_kwargs: dict = field(default_factory=dict)
+    columns: tuple[str, ...] | None = None
+    squeeze: bool = False
+    steps: tuple[tuple[Callable, tuple, dict], ...] = ()
+
+    def select(self, *columns: str) -> LazyOHLCV:
+        """
+        Keep only `columns` (a DataFrame is produced).
+        """
+        if self.steps:
+            return self.pipe(lambda df: df[list(columns)])
+        return replace(self, columns=tuple(columns), squeeze=False)
+
+    def __getitem__(self, key: str | Sequence[str]) -> LazyOHLCV:
+        """
+        `handle["Adj Close"]` yields a Series, `handle[["Open", "Close"]]`
+        a DataFrame, mirroring pandas indexing.
+        """
+        if isinstance(key, str):
+            if self.steps:
+                return self.pipe(lambda df: df[key])
+            return replace(self, columns=(key,), squeeze=True)
+        return self.select(*key)
+
+    def between(self, start: str, end: str) -> LazyOHLCV:
+        """
+        Narrow the date range.
+        """
+        if self.steps:
+            raise ValueError("between() must be applied before pipe()")
+        return replace(self, start=start, end=end)
+
+    def pipe(self, func: Callable, *args: Any, **kwargs: Any) -> LazyOHLCV:
+        """
+        Append `func(data, *args, **kwargs)` to the deferred chain.
+        """
+        return replace(self, steps=self.steps + ((func, args, kwargs),))
+
+    def collect(self) -> pd.DataFrame | pd.Series:
+        """
+        Materialize the query.
+        """
+        stack = self.stack
+        stack._ensure_cached(
+            self.ticker,
+            self.timeframe,
+            self.start,
+            self.end,
+            self.verbose,
+            self.provider_kwargs,
+        )
+
+        data = stack.cache.read_range(
+            self.ticker,
+            self.timeframe,
+            start=self.start,
+            end=self.end,
+            columns=self.columns,
+        )
+        if data is None or data.empty:
+            raise RuntimeError(
+                f"No data available for {self.ticker} ({self.timeframe}) in {self.start}..{self.end}"
+            )
+
+        data.attrs["ticker"] = self.ticker
+        out: pd.DataFrame | pd.Series = data
+        if self.squeeze:
+            out = data[self.columns[0]]
+
+        for func, args, kwargs in self.steps:
+            out = func(out, *args, **kwargs)
+        return out
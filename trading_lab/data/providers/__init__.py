@@ -1,3 +1,13 @@
-from trading_lab.data.providers.base import DataProvider
+from trading_lab.data.providers.base import (
+    AsyncDataProvider,
+    DataProvider,
+    ExecutorAsyncProvider,
+    as_async_provider,
+)
 
-__all__ = ["DataProvider"]
+__all__ = [
+    "AsyncDataProvider",
+    "DataProvider",
+    "ExecutorAsyncProvider",
+    "as_async_provider",
+]
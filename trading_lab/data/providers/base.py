@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from functools import partial
 from typing import Sequence
 import pandas as pd
 
@@ -23,3 +26,66 @@ class DataProvider(ABC):
         Returns a dict: {ticker: DataFrame(OHLCV)} for the requested range.
         """
         raise NotImplementedError
+
+
+class AsyncDataProvider(ABC):
+    """
+    Asyncio-native counterpart of DataProvider.
+
+    Implementations must not block the event loop while fetching.
+    """
+
+    @abstractmethod
+    async def fetch_ohlcv(
+        self,
+        tickers: str | Sequence[str],
+        start: str,
+        end: str,
+        timeframe: str,
+        **kwargs,
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Returns a dict: {ticker: DataFrame(OHLCV)} for the requested range.
+        """
+        raise NotImplementedError
+
+
+class ExecutorAsyncProvider(AsyncDataProvider):
+    """
+    Adapt a blocking DataProvider (e.g. yfinance) to AsyncDataProvider by
+    running each fetch in an executor (default: the loop's thread pool).
+    """
+
+    def __init__(self, provider: DataProvider, executor: Executor | None = None):
+        self.provider = provider
+        self.executor = executor
+
+    async def fetch_ohlcv(
+        self,
+        tickers: str | Sequence[str],
+        start: str,
+        end: str,
+        timeframe: str,
+        **kwargs,
+    ) -> dict[str, pd.DataFrame]:
+        loop = asyncio.get_running_loop()
+        call = partial(
+            self.provider.fetch_ohlcv,
+            tickers=tickers,
+            start=start,
+            end=end,
+            timeframe=timeframe,
+            **kwargs,
+        )
+        return await loop.run_in_executor(self.executor, call)
+
+
+def as_async_provider(
+    provider: DataProvider | AsyncDataProvider, executor: Executor | None = None
+) -> AsyncDataProvider:
+    """
+    Return `provider` unchanged if already async, else wrap it in an executor.
+    """
+    if isinstance(provider, AsyncDataProvider):
+        return provider
+    return ExecutorAsyncProvider(provider, executor=executor)
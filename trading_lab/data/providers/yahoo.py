@@ -2,7 +2,6 @@ from __future__ import annotations
 
 from typing import Sequence
 import pandas as pd
-import yfinance as yf
 
 from trading_lab.data.providers import DataProvider
 from trading_lab.data.format.ohlcv import normalize_ohlcv
@@ -45,6 +44,8 @@ def _split_download_result(
 class YahooDataProvider(DataProvider):
     """
     Yahoo Finance provider via yfinance.download.
+
+    yfinance is imported on the first fetch, not with this module.
     """
 
     def fetch_ohlcv(
@@ -58,6 +59,8 @@ class YahooDataProvider(DataProvider):
         progress: bool = False,
         group_by: str = "column",
     ) -> dict[str, pd.DataFrame]:
+        import yfinance as yf
+
         tlist = _as_list(tickers)
 
         dl = yf.download(
@@ -0,0 +1,276 @@
+"""
+Vectorized data-quality screening of OHLCV bars.
+
+Every check runs once over float64 (time x assets) arrays, so a single
+frame and a whole panel with (field, ticker) MultiIndex columns both cost
+one O(n) pass:
+
+- BAD_RANGE: High < Low;
+- NONPOSITIVE: a zero or negative Open/High/Low/Close;
+- STALE: the close repeats the previous one, inside a run of at least
+  `stale_bars` identical closes;
+- SPIKE: a bad tick, i.e. a log return beyond `spike_mads` robust
+  deviations (median absolute return / 0.6745, floored at `spike_min`)
+  immediately reversed by an opposite return beyond the same threshold. A
+  genuine gap that does not revert is left alone; the last bar cannot be
+  confirmed yet and is never a spike.
+
+Flags are bit masks, OR-ed per bar into a uint8. NaN prices are not
+flagged.
+
+`DataStack` screens every frame it writes to the cache when built with
+`DataStackBuilder.with_quality_checks`, stores a summary under the
+"quality" key of the cache metadata and applies the rules' action:
+
+- "flag": keep the bars as fetched;
+- "quarantine": drop flagged bars before caching;
+- "repair": swap High/Low on BAD_RANGE bars, and replace NONPOSITIVE and
+  SPIKE bars by the previous close (Open = High = Low = Close, Adj Close
+  carried forward, Volume kept); such bars with no earlier valid close
+  are dropped. STALE bars have no better value and are only flagged.
+
+The flagged bars listed in the metadata are left out of the revision probe
+(`with_revision_probe`): the provider keeps serving them raw, so they
+would otherwise read as a revision of the cached history.
+"""
+
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.data.cache.policy import utcnow
+
+BAD_RANGE = 1
+NONPOSITIVE = 2
+STALE = 4
+SPIKE = 8
+
+FLAG_NAMES = {
+    BAD_RANGE: "bad_range",
+    NONPOSITIVE: "nonpositive",
+    STALE: "stale",
+    SPIKE: "spike",
+}
+
+QUALITY_ACTIONS = ("flag", "quarantine", "repair")
+
+PRICE_COLS = ("Open", "High", "Low", "Close", "Adj Close")
+
+# Flagged bars listed in the cache metadata (most recent kept, the ones the
+# revision probe overlaps)
+MAX_LISTED_BARS = 100
+
+
+@dataclass
+class QualityRules:
+    """
+    Thresholds of the quality checks and the action on flagged bars.
+
+    Parameters
+    ----------
+    action : str
+        "flag", "quarantine" or "repair" (see module docstring).
+    stale_bars : int
+        Minimum run of identical closes reported as stale; 0 disables the
+        check.
+    spike_mads : float
+        Spike threshold in robust deviations of the log returns; 0
+        disables the check.
+    spike_min : float
+        Floor of the spike threshold, in log-return units, for series with
+        (nearly) constant prices.
+    """
+
+    action: str = "flag"
+    stale_bars: int = 5
+    spike_mads: float = 10.0
+    spike_min: float = 0.05
+
+    def __post_init__(self):
+        if self.action not in QUALITY_ACTIONS:
+            raise ValueError(
+                f"Unknown quality action '{self.action}'. Supported: {QUALITY_ACTIONS}"
+            )
+        if self.stale_bars < 0 or self.spike_mads < 0 or self.spike_min < 0:
+            raise ValueError("quality thresholds must be >= 0")
+
+
+# ---------------------------------------------------------------------------
+# Kernels on (T, N) arrays
+# ---------------------------------------------------------------------------
+
+
+def _stale_mask(c: np.ndarray, min_run: int) -> np.ndarray:
+    """
+    Repeated closes inside runs of >= min_run identical values, per column.
+    """
+    same = np.zeros(c.shape, dtype=bool)
+    same[1:] = c[1:] == c[:-1]
+    # Run ids in column-major order: row 0 always starts a run, so runs
+    # never span two columns and one bincount measures them all
+    ids = np.cumsum(~same.ravel(order="F")) - 1
+    lengths = np.bincount(ids)
+    run = lengths[ids].reshape(c.shape, order="F")
+    return same & (run >= min_run)
+
+
+def _spike_mask(c: np.ndarray, n_mads: float, floor: float) -> np.ndarray:
+    """
+    Bars whose log return and the next one are both beyond the threshold
+    and of opposite sign.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lc = np.log(np.where(c > 0, c, np.nan))
+    r = np.full(c.shape, np.nan)
+    r[1:] = lc[1:] - lc[:-1]
+
+    with warnings.catch_warnings():
+        # All-NaN columns have no scale; their mask stays False
+        warnings.simplefilter("ignore", RuntimeWarning)
+        scale = np.nanmedian(np.abs(r), axis=0) / 0.6745
+    thr = np.maximum(n_mads * scale, floor)
+
+    with np.errstate(invalid="ignore"):
+        big = np.abs(r) > thr
+    spike = np.zeros(c.shape, dtype=bool)
+    spike[:-1] = big[:-1] & big[1:] & (r[:-1] * r[1:] < 0)
+    return spike
+
+
+def _flag_arrays(
+    fields: dict[str, np.ndarray], shape: tuple[int, int], rules: QualityRules
+) -> np.ndarray:
+    flags = np.zeros(shape, dtype=np.uint8)
+    with np.errstate(invalid="ignore"):
+        if "High" in fields and "Low" in fields:
+            flags[fields["High"] < fields["Low"]] |= BAD_RANGE
+        for name in ("Open", "High", "Low", "Close"):
+            if name in fields:
+                flags[fields[name] <= 0] |= NONPOSITIVE
+
+    c = fields.get("Close")
+    if c is not None and len(c) > 1:
+        if rules.stale_bars > 0:
+            flags[_stale_mask(c, rules.stale_bars)] |= STALE
+        if rules.spike_mads > 0:
+            flags[_spike_mask(c, rules.spike_mads, rules.spike_min)] |= SPIKE
+    return flags
+
+
+def quality_flags(
+    ohlcv: pd.DataFrame, rules: QualityRules | None = None
+) -> pd.Series | pd.DataFrame:
+    """
+    Per-bar uint8 flags: a Series for one OHLCV frame, or a DataFrame with
+    one column per ticker for a (field, ticker) panel.
+    """
+    rules = rules or QualityRules()
+    present = set(ohlcv.columns.get_level_values(0))
+    names = [n for n in ("Open", "High", "Low", "Close") if n in present]
+    if not names:
+        raise KeyError("OHLCV input has no price columns")
+    fields = {}
+    for name in names:
+        arr = ohlcv[name].to_numpy(dtype=np.float64)
+        fields[name] = arr if arr.ndim == 2 else arr[:, None]
+    flags = _flag_arrays(fields, fields[names[0]].shape, rules)
+
+    if isinstance(ohlcv.columns, pd.MultiIndex):
+        return pd.DataFrame(flags, index=ohlcv.index, columns=ohlcv[names[0]].columns)
+    return pd.Series(flags[:, 0], index=ohlcv.index, name="quality")
+
+
+# ---------------------------------------------------------------------------
+# Actions and reporting (single frames)
+# ---------------------------------------------------------------------------
+
+
+def flag_names(bits: int) -> list[str]:
+    return [name for bit, name in FLAG_NAMES.items() if bits & bit]
+
+
+@dataclass
+class QualityReport:
+    """
+    Outcome of screening one frame: the flags of the bars as fetched and
+    the action taken on them.
+    """
+
+    flags: pd.Series
+    action: str
+
+    @property
+    def counts(self) -> dict[str, int]:
+        bits = self.flags.to_numpy()
+        return {
+            name: int((bits & bit).astype(bool).sum())
+            for bit, name in FLAG_NAMES.items()
+        }
+
+    @property
+    def n_flagged(self) -> int:
+        return int((self.flags.to_numpy() != 0).sum())
+
+    def meta(self) -> dict:
+        """
+        JSON-able record for the cache metadata.
+        """
+        bad = self.flags[self.flags != 0].iloc[-MAX_LISTED_BARS:]
+        return {
+            "checked_at": str(utcnow()),
+            "action": self.action,
+            "rows": len(self.flags),
+            "flagged": self.n_flagged,
+            "counts": self.counts,
+            "bars": [
+                {"ts": ts.isoformat(), "flags": flag_names(int(v))}
+                for ts, v in bad.items()
+            ],
+        }
+
+
+def _repair(df: pd.DataFrame, flags: np.ndarray) -> pd.DataFrame:
+    out = df.copy()
+    swap = (flags & BAD_RANGE).astype(bool)
+    if swap.any():
+        hi, lo = out.loc[swap, "High"].to_numpy(), out.loc[swap, "Low"].to_numpy()
+        out.loc[swap, "High"], out.loc[swap, "Low"] = lo, hi
+
+    bad = (flags & (NONPOSITIVE | SPIKE)).astype(bool)
+    if not bad.any():
+        return out
+    cols = [c for c in PRICE_COLS if c in out.columns]
+    out.loc[bad, cols] = np.nan
+    if "Close" in out.columns:
+        prev = out["Close"].ffill()
+        for col in ("Open", "High", "Low", "Close"):
+            if col in out.columns:
+                out.loc[bad, col] = prev[bad]
+    if "Adj Close" in out.columns:
+        out["Adj Close"] = out["Adj Close"].where(~bad, out["Adj Close"].ffill())
+    # Nothing earlier to carry forward
+    return out[~(bad & out[cols].isna().any(axis=1).to_numpy())]
+
+
+def screen_ohlcv(
+    df: pd.DataFrame, rules: QualityRules | None = None
+) -> tuple[pd.DataFrame, QualityReport]:
+    """
+    Flag the bars of one OHLCV frame and apply `rules.action`.
+
+    Returns the frame to keep and the report (flags of the input bars).
+    """
+    rules = rules or QualityRules()
+    flags = quality_flags(df, rules)
+    report = QualityReport(flags=flags, action=rules.action)
+    if report.n_flagged == 0 or rules.action == "flag":
+        return df, report
+
+    bits = flags.to_numpy()
+    if rules.action == "quarantine":
+        return df[bits == 0], report
+    return _repair(df, bits), report
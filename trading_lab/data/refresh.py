@@ -0,0 +1,289 @@
+"""
+Bulk cache warm/refresh for a ticker universe across timeframes.
+
+The refresh is planned up front (one task per (ticker, timeframe) whose
+cache misses part of the requested range or has a stale tail), then run on
+a thread pool, since providers spend their time waiting on the network.
+Completed tasks are appended to a JSONL journal so an interrupted run can
+be resumed without redoing finished work.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TextIO
+
+from trading_lab.data.datastack import DataStack
+from trading_lab.data.types import validate_timeframe
+
+JOURNAL_NAME = "refresh_journal.jsonl"
+
+# Failures recorded per task instead of stopping the run: network and I/O
+# errors (ConnectionError, TimeoutError, ...), "no data" and malformed
+# provider payloads. Anything else is a bug and propagates.
+TASK_ERRORS = (OSError, RuntimeError, ValueError, KeyError)
+
+
+@dataclass
+class RefreshTask:
+    ticker: str
+    timeframe: str
+    segments: list[tuple[str, str]]
+
+
+@dataclass
+class TaskResult:
+    ticker: str
+    timeframe: str
+    status: str
+    seconds: float
+    rows: int = 0
+    error: str = ""
+
+
+@dataclass
+class RefreshSummary:
+    planned: int = 0
+    up_to_date: int = 0
+    resumed: int = 0
+    elapsed: float = 0.0
+    results: list[TaskResult] = field(default_factory=list)
+
+    @property
+    def failures(self) -> list[TaskResult]:
+        return [r for r in self.results if r.status != "ok"]
+
+    @property
+    def rows(self) -> int:
+        return sum(r.rows for r in self.results)
+
+    def format(self, slowest: int = 5) -> str:
+        ok = len(self.results) - len(self.failures)
+        rate = len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
+        lines = [
+            (
+                f"[REFRESH] planned={self.planned} ok={ok} "
+                f"failed={len(self.failures)} up_to_date={self.up_to_date} "
+                f"resumed={self.resumed}"
+            ),
+            (
+                f"[REFRESH] elapsed={self.elapsed:.1f}s tasks/s={rate:.2f} "
+                f"rows={self.rows}"
+            ),
+        ]
+        timed = sorted(self.results, key=lambda r: r.seconds, reverse=True)
+        for r in timed[:slowest]:
+            lines.append(f"  slow  {r.ticker} {r.timeframe} {r.seconds:.2f}s")
+        for r in self.failures:
+            lines.append(f"  FAIL  {r.ticker} {r.timeframe}: {r.error}")
+        return "\n".join(lines)
+
+
+def read_universe(path: str | Path) -> list[str]:
+    """
+    Tickers from a text file: one per line (or comma-separated), `#` starts
+    a comment. Duplicates are dropped, order kept.
+    """
+    tickers: list[str] = []
+    for line in Path(path).read_text().splitlines():
+        line = line.split("#", 1)[0]
+        tickers.extend(t.strip() for t in line.split(",") if t.strip())
+    return list(dict.fromkeys(tickers))
+
+
+def _journal_done(journal: Path, start: str, end: str) -> set[tuple[str, str]]:
+    """
+    (ticker, timeframe) pairs already refreshed for the same [start, end].
+    """
+    done: set[tuple[str, str]] = set()
+    if not journal.exists():
+        return done
+    for line in journal.read_text().splitlines():
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            # Torn last line from an interrupted run
+            continue
+        if rec.get("status") == "ok" and (rec.get("start"), rec.get("end")) == (
+            start,
+            end,
+        ):
+            done.add((rec["ticker"], rec["timeframe"]))
+    return done
+
+
+def _repair_journal(path: Path) -> None:
+    """
+    Terminate a torn last line so the next record starts cleanly.
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with path.open("rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def plan_refresh(
+    stack: DataStack,
+    tickers: Iterable[str],
+    timeframes: Sequence[str],
+    start: str,
+    end: str,
+) -> tuple[list[RefreshTask], int]:
+    """
+    Plan every (ticker, timeframe) up front from cache bounds/metadata only.
+
+    Returns the tasks with something to fetch, and the count already up to
+    date.
+    """
+    tasks, up_to_date = [], 0
+    for tf in (validate_timeframe(x) for x in timeframes):
+        for t in tickers:
+            needed = stack.plan(t, tf, start, end)
+            if needed:
+                tasks.append(RefreshTask(t, tf, needed))
+            else:
+                up_to_date += 1
+    return tasks, up_to_date
+
+
+def _run_task(
+    stack: DataStack, task: RefreshTask, start: str, end: str, provider_kwargs: dict
+) -> TaskResult:
+    t0 = time.perf_counter()
+    try:
+        df = stack.sync(task.ticker, task.timeframe, start, end, **provider_kwargs)
+    except TASK_ERRORS as exc:
+        return TaskResult(
+            task.ticker,
+            task.timeframe,
+            "error",
+            time.perf_counter() - t0,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    return TaskResult(
+        task.ticker, task.timeframe, "ok", time.perf_counter() - t0, rows=len(df)
+    )
+
+
+def run_refresh(
+    stack: DataStack,
+    tasks: Sequence[RefreshTask],
+    start: str,
+    end: str,
+    workers: int = 4,
+    journal: str | Path | None = None,
+    verbose: bool = True,
+    out: TextIO = sys.stdout,
+    **provider_kwargs,
+) -> list[TaskResult]:
+    """
+    Execute planned tasks on a thread pool, journaling each completion and
+    reporting progress and throughput.
+    """
+    lock = threading.Lock()
+    results: list[TaskResult] = []
+    t0 = time.perf_counter()
+
+    with ExitStack() as files:
+        jfile = None
+        if journal is not None:
+            _repair_journal(Path(journal))
+            jfile = files.enter_context(Path(journal).open("a"))
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            futures = [
+                pool.submit(_run_task, stack, task, start, end, provider_kwargs)
+                for task in tasks
+            ]
+            for fut in as_completed(futures):
+                res = fut.result()
+                with lock:
+                    results.append(res)
+                    if jfile is not None:
+                        rec = {**res.__dict__, "start": start, "end": end}
+                        jfile.write(json.dumps(rec) + "\n")
+                        jfile.flush()
+                if verbose:
+                    el = time.perf_counter() - t0
+                    print(
+                        f"[REFRESH] {len(results)}/{len(tasks)} {res.ticker} "
+                        f"{res.timeframe} {res.status} {res.seconds:.2f}s "
+                        f"({len(results) / el:.2f} tasks/s)",
+                        file=out,
+                    )
+
+    stack.cache.flush()
+    return results
+
+
+def refresh_universe(
+    stack: DataStack,
+    tickers: Iterable[str],
+    timeframes: Sequence[str],
+    start: str,
+    end: str,
+    workers: int = 4,
+    journal: str | Path | None = None,
+    resume: bool = True,
+    verbose: bool = True,
+    out: TextIO = sys.stdout,
+    **provider_kwargs,
+) -> RefreshSummary:
+    """
+    Plan, run and summarize a universe refresh.
+
+    Parameters
+    ----------
+    journal : path, optional
+        JSONL journal; defaults to `refresh_journal.jsonl` in the cache root
+        when the cache has one.
+    resume : bool
+        Skip (ticker, timeframe) pairs the journal records as refreshed for
+        the same [start, end].
+    """
+    if journal is None and hasattr(stack.cache, "root_dir"):
+        journal = Path(stack.cache.root_dir) / JOURNAL_NAME
+
+    t0 = time.perf_counter()
+    tickers = list(tickers)
+    summary = RefreshSummary()
+
+    tasks, summary.up_to_date = plan_refresh(stack, tickers, timeframes, start, end)
+    if resume and journal is not None:
+        done = _journal_done(Path(journal), start, end)
+        summary.resumed = sum((t.ticker, t.timeframe) in done for t in tasks)
+        tasks = [t for t in tasks if (t.ticker, t.timeframe) not in done]
+    summary.planned = len(tasks)
+
+    if verbose:
+        n_seg = sum(len(t.segments) for t in tasks)
+        print(
+            f"[REFRESH] {len(tickers)} tickers x {len(timeframes)} timeframes: "
+            f"{len(tasks)} tasks, {n_seg} segments, {workers} workers",
+            file=out,
+        )
+
+    summary.results = run_refresh(
+        stack,
+        tasks,
+        start,
+        end,
+        workers=workers,
+        journal=journal,
+        verbose=verbose,
+        out=out,
+        **provider_kwargs,
+    )
+    summary.elapsed = time.perf_counter() - t0
+    return summary
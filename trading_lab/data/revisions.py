@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.data.cache.policy import utcnow
+
+UNCHANGED = "unchanged"
+RESCALE = "rescale"
+REFETCH = "refetch"
+
+VOLUME = "Volume"
+
+
+@dataclass
+class RevisionCheck:
+    """
+    Outcome of comparing a freshly fetched probe window with cached bars.
+
+    kind:
+      - "unchanged": overlapping bars match
+      - "rescale": every changed price column differs by one constant
+        factor over the overlap (typical of a new dividend/split adjustment
+        applied to the whole history); `factors` maps column -> new/old
+        ratio, and includes Volume when a split scaled it by the inverse
+        factor
+      - "refetch": price changes are not a uniform rescale; the cached
+        history cannot be repaired locally
+
+    Volume alone never makes a revision: late volume corrections are
+    ignored.
+    """
+
+    kind: str
+    factors: dict[str, float] = field(default_factory=dict)
+    overlap: int = 0
+
+    def event(self, probe_start, probe_end, now: pd.Timestamp | None = None) -> dict:
+        """
+        JSON-able record for the cache metadata, detected at `now` (naive
+        UTC, default `utcnow()`).
+        """
+        return {
+            "type": self.kind,
+            "factors": self.factors,
+            "overlap": self.overlap,
+            "probe": [str(probe_start), str(probe_end)],
+            "detected_at": str(utcnow() if now is None else now),
+        }
+
+
+def _checksum(df: pd.DataFrame) -> int:
+    return int(pd.util.hash_pandas_object(df, index=True).sum())
+
+
+def detect_revision(
+    cached: pd.DataFrame | None,
+    probe: pd.DataFrame | None,
+    rtol: float = 1e-5,
+    ignore: pd.Index | None = None,
+) -> RevisionCheck:
+    """
+    Compare overlapping timestamps of `cached` and `probe` column by column,
+    leaving out the `ignore` timestamps (bars expected to differ, such as a
+    still-forming last bar).
+
+    A checksum of the overlap short-circuits the common no-change case; only
+    otherwise are per-column new/old ratios examined (vectorized). Volume
+    moves against prices on a split, so it is only checked for the inverse
+    of a common price factor (see `RevisionCheck`).
+    """
+    if cached is None or probe is None or cached.empty or probe.empty:
+        return RevisionCheck(UNCHANGED)
+
+    common_idx = cached.index.intersection(probe.index)
+    if ignore is not None and len(ignore):
+        common_idx = common_idx.difference(ignore)
+    cols = [c for c in cached.columns if c in probe.columns]
+    if len(common_idx) == 0 or not cols:
+        return RevisionCheck(UNCHANGED)
+
+    old = cached.loc[common_idx, cols].astype(float)
+    new = probe.loc[common_idx, cols].astype(float)
+
+    if _checksum(old) == _checksum(new):
+        return RevisionCheck(UNCHANGED, overlap=len(common_idx))
+
+    o, n = old.to_numpy(), new.to_numpy()
+    both = ~(np.isnan(o) | np.isnan(n))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(o == n, 1.0, n / o)
+
+    factors: dict[str, float] = {}
+    volume = None
+    for j, col in enumerate(cols):
+        r = ratio[both[:, j], j]
+        if r.size == 0 or np.allclose(r, 1.0, rtol=0.0, atol=rtol):
+            continue
+        f = float(np.median(r))
+        uniform = np.isfinite(f) and f != 0 and np.abs(r / f - 1.0).max() <= rtol
+        if col == VOLUME:
+            volume = f if uniform else None
+        elif not uniform:
+            return RevisionCheck(REFETCH, overlap=len(common_idx))
+        else:
+            factors[col] = f
+
+    # A split: every price column scaled by f and the volume by 1 / f
+    if (
+        volume is not None
+        and factors
+        and all(abs(volume * f - 1.0) <= rtol for f in factors.values())
+    ):
+        factors[VOLUME] = volume
+
+    if not factors:
+        return RevisionCheck(UNCHANGED, overlap=len(common_idx))
+    return RevisionCheck(RESCALE, factors=factors, overlap=len(common_idx))
+
+
+def apply_rescale(
+    df: pd.DataFrame, factors: dict[str, float], rows: pd.Index | None = None
+) -> pd.DataFrame:
+    """
+    Multiply each column in `factors` by its factor, on `rows` only if given
+    (default: the whole history).
+    """
+    out = df.copy()
+    mask = np.ones(len(out), dtype=bool) if rows is None else out.index.isin(rows)
+    for col, f in factors.items():
+        if col in out.columns:
+            values = out[col].to_numpy(dtype=float, copy=True)
+            values[mask] *= f
+            out[col] = values
+    return out
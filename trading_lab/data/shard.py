@@ -0,0 +1,367 @@
+"""
+Sharded universe refresh coordinated through a shared cache directory.
+
+Several processes or hosts refresh one universe into the same cache root
+without a broker:
+
+- each (ticker, timeframe) item has a home shard, `shard_of(ticker, n)`,
+  from a stable hash, so work splits the same way on every host;
+- an item is claimed by creating its lease file with O_CREAT | O_EXCL;
+  the lease expires after `lease_ttl` seconds unless its holder renews
+  it (a heartbeat thread does so every `lease_ttl / 3` seconds while the
+  item is refreshed), and an expired lease is broken by renaming it away
+  (atomic, so only one worker wins);
+- a finished item gets a done marker (a failed one a failed marker, so it
+  is not retried within the run); a worker that has emptied its own
+  shard steals unleased items from the others and keeps polling until
+  every item is done, picking up the leases of crashed workers;
+- each worker logs its results to its own part file, and the parts are
+  merged into `manifest.json` once all items are done.
+
+Layout under {cache_root}/_refresh/{run_id}/:
+    leases/{item}.lease   done/{item}.json   failed/{item}.json
+    parts/{worker}.jsonl  manifest.json
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
+
+from trading_lab.data.datastack import DataStack
+from trading_lab.data.refresh import RefreshSummary, RefreshTask, TaskResult, _run_task
+from trading_lab.data.types import validate_timeframe
+
+RUN_DIR = "_refresh"
+
+
+def shard_of(ticker: str, n_shards: int) -> int:
+    """
+    Home shard of a ticker; stable across processes, hosts and Python
+    versions (unlike the salted built-in hash()).
+    """
+    digest = hashlib.sha1(ticker.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % n_shards
+
+
+def run_id_for(
+    tickers: Sequence[str], timeframes: Sequence[str], start: str, end: str
+) -> str:
+    """
+    Run identifier shared by all workers of the same refresh.
+    """
+    key = json.dumps([sorted(tickers), sorted(timeframes), start, end])
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+def _item_key(ticker: str, timeframe: str) -> str:
+    safe = ticker.replace("^", "").replace("/", "_").replace("=", "_")
+    digest = hashlib.sha1(ticker.encode()).hexdigest()[:6]
+    return f"{safe}-{digest}_{timeframe}"
+
+
+def _write_json_atomic(path: Path, obj) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(obj, sort_keys=True, default=str))
+    os.replace(tmp, path)
+
+
+@dataclass
+class LeaseQueue:
+    """
+    File-based lease/done bookkeeping for one refresh run.
+    """
+
+    root: Path
+    worker: str
+    lease_ttl: float = 600.0
+    clock: Callable[[], float] = time.time
+
+    def __post_init__(self):
+        for sub in ("leases", "done", "failed", "parts"):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+
+    def _lease(self, key: str) -> Path:
+        return self.root / "leases" / f"{key}.lease"
+
+    def _done(self, key: str) -> Path:
+        return self.root / "done" / f"{key}.json"
+
+    def _failed(self, key: str) -> Path:
+        return self.root / "failed" / f"{key}.json"
+
+    def is_done(self, key: str) -> bool:
+        return self._done(key).exists()
+
+    def is_settled(self, key: str) -> bool:
+        """
+        Done, or failed during this run.
+        """
+        return self._done(key).exists() or self._failed(key).exists()
+
+    def is_leased(self, key: str) -> bool:
+        """
+        True if another worker holds a live (unexpired) lease.
+        """
+        path = self._lease(key)
+        return path.exists() and not self._expired(path)
+
+    def _expired(self, lease_path: Path) -> bool:
+        try:
+            lease = json.loads(lease_path.read_text())
+        except FileNotFoundError:
+            return True
+        except ValueError:
+            # Being written right now, or left empty by a worker that died
+            # between creating and writing it: live for one TTL from its mtime
+            try:
+                mtime = lease_path.stat().st_mtime
+            except FileNotFoundError:
+                return True
+            return mtime + self.lease_ttl <= self.clock()
+        return lease.get("expires", 0) <= self.clock()
+
+    def claim(self, key: str) -> bool:
+        """
+        Try to take the item's lease; breaks an expired lease first.
+        """
+        if self.is_settled(key):
+            return False
+        path = self._lease(key)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if self.is_leased(key):
+                    return False
+                # Expired: rename it away; only one contender's rename succeeds
+                stale = path.with_name(f"{path.name}.stale.{self.worker}")
+                try:
+                    os.rename(path, stale)
+                except FileNotFoundError:
+                    return False
+                if not self._expired(stale):
+                    # Lost a race: someone re-leased it after our check
+                    try:
+                        os.link(stale, path)
+                    except FileExistsError:
+                        pass
+                    stale.unlink(missing_ok=True)
+                    return False
+                stale.unlink(missing_ok=True)
+                continue
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {"worker": self.worker, "expires": self.clock() + self.lease_ttl},
+                    f,
+                )
+            # A previous holder may have finished between our checks
+            if self.is_settled(key):
+                self.release(key)
+                return False
+            return True
+        return False
+
+    def renew(self, key: str) -> bool:
+        """
+        Push back the expiry of a lease this worker holds. Returns False if
+        the lease is gone or held by someone else.
+        """
+        path = self._lease(key)
+        try:
+            lease = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return False
+        if lease.get("worker") != self.worker:
+            return False
+        _write_json_atomic(
+            path, {"worker": self.worker, "expires": self.clock() + self.lease_ttl}
+        )
+        return True
+
+    @contextmanager
+    def heartbeat(self, key: str, interval: float | None = None) -> Iterator[None]:
+        """
+        Renew the lease from a background thread while the block runs, so a
+        refresh slower than `lease_ttl` is not stolen and run twice.
+        """
+        interval = self.lease_ttl / 3 if interval is None else interval
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                if not self.renew(key):
+                    return
+
+        thread = threading.Thread(target=beat, name=f"lease-{key}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def release(self, key: str) -> None:
+        self._lease(key).unlink(missing_ok=True)
+
+    def complete(self, key: str, record: dict, failed: bool = False) -> None:
+        """
+        Mark done or failed (atomically), log to this worker's part file,
+        drop the lease.
+        """
+        if failed:
+            _write_json_atomic(self._failed(key), record)
+        else:
+            _write_json_atomic(self._done(key), record)
+            self._failed(key).unlink(missing_ok=True)
+        with open(self.root / "parts" / f"{self.worker}.jsonl", "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+        self.release(key)
+
+    def clear_failed(self) -> int:
+        """
+        Forget failures of earlier attempts so they are retried.
+        """
+        paths = list((self.root / "failed").glob("*.json"))
+        for p in paths:
+            p.unlink(missing_ok=True)
+        return len(paths)
+
+    def merge_manifest(self, keys: Iterable[str], meta: dict) -> dict:
+        """
+        Merge done and failed records into manifest.json (idempotent).
+        """
+        items = {}
+        for key in keys:
+            for path in (self._done(key), self._failed(key)):
+                try:
+                    items[key] = json.loads(path.read_text())
+                    break
+                except (FileNotFoundError, ValueError):
+                    continue
+        workers = sorted(p.stem for p in (self.root / "parts").glob("*.jsonl"))
+        manifest = {**meta, "workers": workers, "items": items}
+        _write_json_atomic(self.root / "manifest.json", manifest)
+        return manifest
+
+
+def _ordered_items(
+    items: list[tuple[str, str]], shard: int, n_shards: int
+) -> list[tuple[str, str]]:
+    """
+    Own shard first, then the other shards starting from the next one, so
+    idle workers spread their stealing instead of piling onto one shard.
+    """
+    by_shard: dict[int, list[tuple[str, str]]] = {i: [] for i in range(n_shards)}
+    for t, tf in items:
+        by_shard[shard_of(t, n_shards)].append((t, tf))
+    return [it for k in range(n_shards) for it in by_shard[(shard + k) % n_shards]]
+
+
+def run_sharded_refresh(
+    stack: DataStack,
+    tickers: Iterable[str],
+    timeframes: Sequence[str],
+    start: str,
+    end: str,
+    shard: int,
+    n_shards: int,
+    worker_id: str | None = None,
+    lease_ttl: float = 600.0,
+    poll: float = 1.0,
+    retry_failed: bool = False,
+    verbose: bool = True,
+    out: TextIO = sys.stdout,
+    **provider_kwargs,
+) -> RefreshSummary:
+    """
+    Refresh this worker's shard of the universe, then steal leftovers, and
+    merge the run manifest once every item is done.
+
+    All workers of a run must get the same tickers, timeframes, start and
+    end (they define the run id), and the same `n_shards`. Items that failed
+    are not retried within a run; start a new invocation with
+    `retry_failed=True` to retry them.
+    """
+    if not 0 <= shard < n_shards:
+        raise ValueError("shard must be in [0, n_shards)")
+    if not hasattr(stack.cache, "root_dir"):
+        raise TypeError("sharded refresh needs a cache with a shared root_dir")
+
+    tickers = list(dict.fromkeys(tickers))
+    tfs = [validate_timeframe(x) for x in timeframes]
+    run_id = run_id_for(tickers, tfs, start, end)
+    worker = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = LeaseQueue(
+        Path(stack.cache.root_dir) / RUN_DIR / run_id, worker, lease_ttl=lease_ttl
+    )
+
+    if retry_failed:
+        queue.clear_failed()
+
+    items = [(t, tf) for tf in tfs for t in tickers]
+    keys = {it: _item_key(*it) for it in items}
+    order = _ordered_items(items, shard, n_shards)
+
+    t0 = time.perf_counter()
+    summary = RefreshSummary()
+    pending = list(order)
+
+    while pending:
+        waiting = []
+        for t, tf in pending:
+            key = keys[(t, tf)]
+            if queue.is_settled(key):
+                continue
+            if not queue.claim(key):
+                waiting.append((t, tf))
+                continue
+
+            needed = stack.plan(t, tf, start, end)
+            if needed:
+                summary.planned += 1
+                with queue.heartbeat(key):
+                    res = _run_task(
+                        stack, RefreshTask(t, tf, needed), start, end, provider_kwargs
+                    )
+                summary.results.append(res)
+            else:
+                summary.up_to_date += 1
+                res = TaskResult(t, tf, "up_to_date", 0.0)
+
+            queue.complete(
+                key, {**res.__dict__, "worker": worker}, failed=res.status == "error"
+            )
+
+            if verbose:
+                owner = "own" if shard_of(t, n_shards) == shard else "stolen"
+                print(
+                    f"[SHARD {shard}/{n_shards}] {t} {tf} {res.status} "
+                    f"{res.seconds:.2f}s ({owner})",
+                    file=out,
+                )
+
+        # Items leased by others: wait for them to finish, or for their
+        # lease to expire if the holder died
+        pending = waiting
+        if pending:
+            time.sleep(poll)
+
+    stack.cache.flush()
+    summary.elapsed = time.perf_counter() - t0
+    if all(queue.is_settled(k) for k in keys.values()):
+        queue.merge_manifest(
+            keys.values(),
+            {"run_id": run_id, "start": start, "end": end, "timeframes": tfs},
+        )
+    return summary
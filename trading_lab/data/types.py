@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pandas as pd
+
 # Yahoo intervals: 1m,2m,5m,15m,30m,60m,90m,1h,1d,5d,1wk,1mo,3mo
 # We'll standardize to a canonical set.
 SUPPORTED_TIMEFRAMES = {
@@ -29,3 +31,24 @@ def validate_timeframe(tf: str) -> str:
     if tf == "60m":
         return "1h"
     return tf
+
+
+# Nominal bar duration per canonical timeframe (months/quarters rounded up).
+TIMEFRAME_DELTAS = {
+    "1m": pd.Timedelta(minutes=1),
+    "2m": pd.Timedelta(minutes=2),
+    "5m": pd.Timedelta(minutes=5),
+    "15m": pd.Timedelta(minutes=15),
+    "30m": pd.Timedelta(minutes=30),
+    "90m": pd.Timedelta(minutes=90),
+    "1h": pd.Timedelta(hours=1),
+    "1d": pd.Timedelta(days=1),
+    "5d": pd.Timedelta(days=5),
+    "1wk": pd.Timedelta(weeks=1),
+    "1mo": pd.Timedelta(days=31),
+    "3mo": pd.Timedelta(days=92),
+}
+
+
+def timeframe_delta(tf: str) -> pd.Timedelta:
+    return TIMEFRAME_DELTAS[validate_timeframe(tf)]
@@ -0,0 +1,460 @@
+"""
+Rolling and EWMA covariance for N-asset return panels, plus risk-parity and
+minimum-variance weights on top.
+
+Windows are updated incrementally: each new bar adds one rank-one term
+x_t x_t^T (and a rolling window removes the one leaving it), instead of
+recomputing X^T X per date. Only the upper triangle is ever stored, packed
+row-major into N(N+1)/2 columns (`PackedCovariance`), which halves memory for
+the (T x N x N) output; `step` further thins the output to rebalance dates.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class PackedCovariance:
+    """
+    A (T x N x N) series of symmetric matrices stored as packed upper
+    triangles.
+
+    Attributes
+    ----------
+    index : pd.Index
+        Dates (length T).
+    columns : pd.Index
+        Asset labels (length N).
+    data : np.ndarray
+        (T, N(N+1)/2) packed upper triangles, row-major; NaN rows mark dates
+        without enough observations.
+    """
+
+    index: pd.Index
+    columns: pd.Index
+    data: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def n_assets(self) -> int:
+        return len(self.columns)
+
+    @property
+    def triu(self) -> tuple[np.ndarray, np.ndarray]:
+        return np.triu_indices(self.n_assets)
+
+    @property
+    def valid(self) -> np.ndarray:
+        """
+        Dates whose matrix is fully defined.
+        """
+        return ~np.isnan(self.data).any(axis=1)
+
+    def dense(self, rows=None) -> np.ndarray:
+        """
+        Unpack to (len(rows), N, N); all dates if `rows` is None.
+        """
+        packed = self.data if rows is None else self.data[rows]
+        squeeze = packed.ndim == 1
+        packed = np.atleast_2d(packed)
+
+        n = self.n_assets
+        iu, ju = self.triu
+        out = np.empty((packed.shape[0], n, n), dtype=packed.dtype)
+        out[:, iu, ju] = packed
+        out[:, ju, iu] = packed
+        return out[0] if squeeze else out
+
+    def at(self, ts) -> pd.DataFrame:
+        """
+        Matrix at one date, as a labeled DataFrame.
+        """
+        i = self.index.get_loc(ts)
+        return pd.DataFrame(self.dense(i), index=self.columns, columns=self.columns)
+
+    def diagonal(self) -> pd.DataFrame:
+        """
+        (T x N) variances (or ones, for a correlation series).
+        """
+        iu, ju = self.triu
+        return pd.DataFrame(
+            self.data[:, iu == ju], index=self.index, columns=self.columns
+        )
+
+    def to_correlation(self) -> "PackedCovariance":
+        iu, ju = self.triu
+        sd = np.sqrt(self.data[:, iu == ju])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = self.data / (sd[:, iu] * sd[:, ju])
+        return PackedCovariance(self.index, self.columns, corr)
+
+
+# ---------------------------------------------------------------------------
+# Estimators
+# ---------------------------------------------------------------------------
+
+
+def _as_panel(returns: pd.DataFrame) -> np.ndarray:
+    x = returns.to_numpy(dtype=float)
+    # Covariance is shift-invariant; centering on the full-sample mean keeps the
+    # running sums small and limits cancellation in S - s s^T / n.
+    return x - np.nan_to_num(np.nanmean(x, axis=0)) if len(x) else x
+
+
+def _ledoit_wolf(cov_b: np.ndarray, sq_norms: np.ndarray, n_obs: int, iu, ju):
+    """
+    Ledoit-Wolf (2004) shrinkage of a biased (1/n) covariance toward mu * I.
+
+    `sq_norms` are the squared norms of the demeaned rows in the window; the
+    4th-moment term sum_t ||x_t||^4 is all the estimator needs from the data.
+    Returns (shrunk packed covariance, shrinkage intensity).
+    """
+    p = len(np.unique(iu))
+    diag = iu == ju
+    off_weight = np.where(diag, 1.0, 2.0)
+
+    mu = cov_b[diag].sum() / p
+    frob2 = (off_weight * cov_b * cov_b).sum()
+
+    beta = ((sq_norms**2).sum() / n_obs - frob2) / (p * n_obs)
+    delta = (frob2 - 2.0 * mu * cov_b[diag].sum() + p * mu * mu) / p
+    beta = min(beta, delta)
+    shrink = 0.0 if beta <= 0 or delta <= 0 else beta / delta
+
+    out = (1.0 - shrink) * cov_b
+    out[diag] += shrink * mu
+    return out, shrink
+
+
+def rolling_covariance(
+    returns: pd.DataFrame,
+    window: int,
+    min_periods: int | None = None,
+    ddof: int = 1,
+    step: int = 1,
+    shrinkage: bool = False,
+    dtype=np.float64,
+) -> PackedCovariance:
+    """
+    Trailing-window covariance matrices via rank-one add/remove updates.
+
+    NaNs are handled pairwise (like pandas): each entry uses the rows where
+    both assets are observed. Running sums are recomputed exactly once per
+    `window` bars so add/remove round-off cannot accumulate.
+
+    Parameters
+    ----------
+    returns : pd.DataFrame
+        (T x N) return panel.
+    window : int
+        Window length in bars.
+    min_periods : int, optional
+        Minimum pairwise observations (default: window).
+    step : int
+        Emit every `step`-th date only (e.g. 21 for monthly rebalances).
+    shrinkage : bool
+        Apply Ledoit-Wolf shrinkage toward a scaled identity (assumes
+        complete rows; missing values count as zero deviations).
+    dtype :
+        Output dtype; float32 halves memory again.
+    """
+    if window < 2:
+        raise ValueError("window must be >= 2")
+    mp = window if min_periods is None else min_periods
+    if not max(ddof + 1, 1) <= mp <= window:
+        raise ValueError("min_periods must be in [ddof + 1, window]")
+
+    x = _as_panel(returns)
+    n_obs, n = x.shape
+    iu, ju = np.triu_indices(n)
+
+    valid = ~np.isnan(x)
+    x0 = np.where(valid, x, 0.0)
+    v = valid.astype(float)
+    has_nan = not valid.all()
+
+    emit = np.arange(step - 1, n_obs, step)
+    out = np.full((len(emit), len(iu)), np.nan, dtype=dtype)
+
+    def exact(lo, hi):
+        xs, vs = x0[lo:hi], v[lo:hi]
+        sxy = (xs.T @ xs)[iu, ju]
+        if not has_nan:
+            return sxy, xs.sum(axis=0)[iu], xs.sum(axis=0)[ju], float(hi - lo)
+        return sxy, (xs.T @ vs)[iu, ju], (vs.T @ xs)[iu, ju], (vs.T @ vs)[iu, ju]
+
+    k = 0
+    for t in range(n_obs):
+        lo = max(0, t - window + 1)
+        if t % window == 0:
+            sxy, sx, sy, cnt = exact(lo, t + 1)
+        else:
+            new = x0[t]
+            sxy += new[iu] * new[ju]
+            if has_nan:
+                vn = v[t]
+                sx += new[iu] * vn[ju]
+                sy += vn[iu] * new[ju]
+                cnt += vn[iu] * vn[ju]
+            else:
+                sx += new[iu]
+                sy += new[ju]
+                cnt += 1.0
+            if t >= window:
+                old = x0[t - window]
+                sxy -= old[iu] * old[ju]
+                if has_nan:
+                    vo = v[t - window]
+                    sx -= old[iu] * vo[ju]
+                    sy -= vo[iu] * old[ju]
+                    cnt -= vo[iu] * vo[ju]
+                else:
+                    sx -= old[iu]
+                    sy -= old[ju]
+                    cnt -= 1.0
+
+        if k >= len(emit) or emit[k] != t:
+            continue
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centered = sxy - sx * sy / cnt
+            cov = centered / (cnt - ddof)
+        cov = np.where(cnt >= mp, cov, np.nan)
+
+        if shrinkage and not np.isnan(cov).any():
+            c = float(np.max(cnt))
+            rows = x0[lo : t + 1]
+            dev = rows - rows.mean(axis=0)
+            shrunk, _ = _ledoit_wolf(
+                centered / c, (dev * dev).sum(axis=1), int(c), iu, ju
+            )
+            cov = shrunk * c / (c - ddof)
+
+        out[k] = cov
+        k += 1
+
+    return PackedCovariance(returns.index[emit], returns.columns, out)
+
+
+def _ewma_alpha(span: float | None, halflife: float | None, alpha: float | None):
+    given = [a is not None for a in (span, halflife, alpha)]
+    if sum(given) != 1:
+        raise ValueError("pass exactly one of span, halflife, alpha")
+    if span is not None:
+        return 2.0 / (span + 1.0)
+    if halflife is not None:
+        return 1.0 - np.exp(np.log(0.5) / halflife)
+    if not 0.0 < alpha <= 1.0:
+        raise ValueError("alpha must be in (0, 1]")
+    return alpha
+
+
+def ewma_covariance(
+    returns: pd.DataFrame,
+    span: float | None = None,
+    halflife: float | None = None,
+    alpha: float | None = None,
+    demean: bool = False,
+    min_periods: int = 20,
+    step: int = 1,
+    dtype=np.float64,
+) -> PackedCovariance:
+    """
+    Exponentially weighted covariance (RiskMetrics-style recursion).
+
+      C_t = (1 - a) C_{t-1} + a x_t x_t^T                   (demean=False)
+      m_t = m_{t-1} + a d_t,  C_t = (1 - a)(C_{t-1} + a d_t d_t^T),
+      d_t = x_t - m_{t-1}                                   (demean=True)
+
+    Each bar is one rank-one update of the packed triangle. Pairs with a
+    missing value on a bar are left unchanged (neither decayed nor updated).
+    Dates before `min_periods` observations of both assets are NaN.
+    """
+    a = _ewma_alpha(span, halflife, alpha)
+
+    x = returns.to_numpy(dtype=float)
+    n_obs, n = x.shape
+    iu, ju = np.triu_indices(n)
+
+    valid = ~np.isnan(x)
+    has_nan = not valid.all()
+
+    emit = np.arange(step - 1, n_obs, step)
+    out = np.full((len(emit), len(iu)), np.nan, dtype=dtype)
+
+    cov = np.zeros(len(iu))
+    mean = np.zeros(n)
+    seen = np.zeros(n)
+    pair_seen = np.zeros(len(iu))
+
+    k = 0
+    for t in range(n_obs):
+        row = x[t]
+        vt = valid[t]
+        if demean:
+            # The first observation of an asset only seeds its mean
+            d = np.where(vt & (seen > 0), row - mean, 0.0)
+            update = (1.0 - a) * (cov + a * d[iu] * d[ju])
+            mean = np.where(vt, np.where(seen > 0, mean + a * d, row), mean)
+        else:
+            # Seeded with the first outer product (pandas adjust=False)
+            d = np.where(vt, row, 0.0)
+            outer = d[iu] * d[ju]
+            update = np.where(pair_seen > 0, (1.0 - a) * cov + a * outer, outer)
+
+        if has_nan:
+            pv = vt[iu] & vt[ju]
+            cov = np.where(pv, update, cov)
+            pair_seen += pv
+            seen += vt
+        else:
+            cov = update
+            pair_seen += 1.0
+            seen += 1.0
+
+        if k < len(emit) and emit[k] == t:
+            out[k] = np.where(pair_seen >= min_periods, cov, np.nan)
+            k += 1
+
+    return PackedCovariance(returns.index[emit], returns.columns, out)
+
+
+# ---------------------------------------------------------------------------
+# Weight solvers
+# ---------------------------------------------------------------------------
+
+
+def _batched(cov: PackedCovariance, chunk: int):
+    """
+    Yield (row positions, dense (k, N, N) matrices) for valid dates, `chunk`
+    dates at a time so the dense working set stays bounded.
+    """
+    rows = np.flatnonzero(cov.valid)
+    for s in range(0, len(rows), chunk):
+        sel = rows[s : s + chunk]
+        yield sel, cov.dense(sel).astype(float)
+
+
+# Variances below this fraction of the date's largest one are rounding
+# noise (e.g. an asset with constant returns): treated as exactly zero
+_ZERO_VAR_RTOL = 1e-12
+
+
+def _zero_variance(var: np.ndarray) -> np.ndarray:
+    return var <= _ZERO_VAR_RTOL * var.max(axis=1, keepdims=True)
+
+
+def _pinv_solve(mat: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    return np.linalg.pinv(mat, rcond=_ZERO_VAR_RTOL, hermitian=True) @ rhs
+
+
+def _solve(mats: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """
+    Batched solve of mats @ x = rhs. Singular matrices (a zero-variance
+    asset, or an exactly collinear set) fall back to the pseudo-inverse,
+    i.e. the minimum-norm solution, one date at a time, instead of aborting
+    the whole run.
+    """
+    out = np.empty(rhs.shape)
+    degenerate = _zero_variance(np.einsum("kii->ki", mats)).any(axis=1)
+    regular = np.flatnonzero(~degenerate)
+    try:
+        out[regular] = np.linalg.solve(mats[regular], rhs[regular])
+    except np.linalg.LinAlgError:
+        for k in regular:
+            try:
+                out[k] = np.linalg.solve(mats[k], rhs[k])
+            except np.linalg.LinAlgError:
+                out[k] = _pinv_solve(mats[k], rhs[k])
+    for k in np.flatnonzero(degenerate):
+        out[k] = _pinv_solve(mats[k], rhs[k])
+    return out
+
+
+def min_variance_weights(cov: PackedCovariance, chunk: int = 256) -> pd.DataFrame:
+    """
+    Fully invested minimum-variance weights w = S^-1 1 / (1' S^-1 1), one
+    batched linear solve per chunk of dates (shorts allowed).
+
+    Dates with a singular matrix (e.g. an asset with constant returns) use
+    the pseudo-inverse: directions without variance get no weight.
+    """
+    w = np.full((len(cov), cov.n_assets), np.nan)
+    for sel, mats in _batched(cov, chunk):
+        ones = np.ones(mats.shape[:2] + (1,))
+        x = _solve(mats, ones)[..., 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            w[sel] = x / x.sum(axis=1, keepdims=True)
+    return pd.DataFrame(w, index=cov.index, columns=cov.columns)
+
+
+def risk_parity_weights(
+    cov: PackedCovariance,
+    budget: np.ndarray | None = None,
+    tol: float = 1e-10,
+    max_iter: int = 50,
+    chunk: int = 256,
+) -> pd.DataFrame:
+    """
+    Long-only risk-budgeting weights: w_i (S w)_i / w'Sw = b_i.
+
+    Solved for all dates of a chunk at once with Newton's method on the
+    convex problem  min_y  y'Sy / 2 - sum_i b_i log y_i  (y > 0), whose
+    optimum normalized to sum(y) = 1 gives the weights. Steps are damped so
+    that y stays positive.
+
+    Dates where an asset has zero variance have no solution (that asset's
+    risk contribution is 0 whatever its weight) and are left NaN.
+    """
+    n = cov.n_assets
+    b = np.full(n, 1.0 / n) if budget is None else np.asarray(budget, dtype=float)
+    b = b / b.sum()
+
+    w = np.full((len(cov), n), np.nan)
+    for sel, mats in _batched(cov, chunk):
+        var = np.einsum("kii->ki", mats)
+        ok = ~_zero_variance(var).any(axis=1)
+        if not ok.all():
+            sel, mats, var = sel[ok], mats[ok], var[ok]
+            if not len(sel):
+                continue
+
+        # Start from inverse-vol weights scaled so that y'Sy = 1
+        y = 1.0 / np.sqrt(var)
+        y /= np.sqrt(np.einsum("ki,kij,kj->k", y, mats, y))[:, None]
+
+        for _ in range(max_iter):
+            sy = np.einsum("kij,kj->ki", mats, y)
+            grad = sy - b / y
+            if np.abs(grad * y).max() < tol:
+                break
+            hess = mats + np.einsum("ki,ij->kij", b / y**2, np.eye(n))
+            dy = np.linalg.solve(hess, grad[..., None])[..., 0]
+
+            # Largest step in (0, 1] keeping y > 0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.where(dy > 0, y / dy, np.inf)
+            step = np.minimum(1.0, 0.95 * ratio.min(axis=1))
+            y = y - step[:, None] * dy
+
+        w[sel] = y / y.sum(axis=1, keepdims=True)
+
+    return pd.DataFrame(w, index=cov.index, columns=cov.columns)
+
+
+def risk_contributions(weights: pd.DataFrame, cov: PackedCovariance) -> pd.DataFrame:
+    """
+    Fractional risk contributions w_i (S w)_i / w'Sw per date of `weights`
+    (a subset of `cov.index`).
+    """
+    w = weights.to_numpy(dtype=float)
+    mats = cov.dense(cov.index.get_indexer(weights.index))
+    sw = np.einsum("kij,kj->ki", mats, w)
+    total = np.einsum("ki,ki->k", w, sw)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rc = w * sw / total[:, None]
+    return pd.DataFrame(rc, index=weights.index, columns=weights.columns)
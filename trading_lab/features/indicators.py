@@ -1,5 +1,35 @@
+"""
+Technical indicators.
+
+Apart from `rsi` (close prices only), indicators take a full OHLCV frame as
+produced by `normalize_ohlcv`, or a multi-asset panel with MultiIndex
+columns (field, ticker), e.g. pd.concat({t: df for ...}, axis=1).swaplevel(
+axis=1). Every field is turned into one float64 (time x assets) array and
+each kernel runs once over all assets.
+
+Outputs follow the feature naming convention:
+- single frame: Series named "{ticker}_{indicator}_{params}", NaN-dropped;
+  multi-output indicators return one column per output. The ticker is the
+  `name` argument, else `df.attrs["ticker"]` (set on the frames returned
+  by `DataStack`), and is omitted if neither is given;
+- panel: DataFrame with one column per ticker (`columns.name` holds the
+  indicator name), or (output, ticker) MultiIndex columns for
+  multi-output indicators; rows are kept aligned (no dropna).
+
+Range-based volatilities are per-period, in log-return units, comparable to
+`realized_volatility_std` on log returns.
+"""
+
+import numpy as np
 import pandas as pd
 
+from trading_lab.features.rolling import (
+    rolling_max,
+    rolling_mean,
+    rolling_min,
+    rolling_moments,
+)
+
 
 def rsi(prices: pd.Series, window: int = 14) -> pd.Series:
     """
@@ -15,7 +45,293 @@ def rsi(prices: pd.Series, window: int = 14) -> pd.Series:
     avg_gain = gain.ewm(alpha=1 / window, adjust=False).mean()
     avg_loss = loss.ewm(alpha=1 / window, adjust=False).mean()
 
-    rs = avg_gain / avg_loss.replace(0.0, pd.NA)
+    # Float NaN (not pd.NA) keeps the result float64
+    rs = avg_gain / avg_loss.replace(0.0, np.nan)
     rsi = 100 - (100 / (1 + rs))
     rsi.name = f"{prices.name}_rsi_{window}"
     return rsi.dropna()
+
+
+# ---------------------------------------------------------------------------
+# OHLCV plumbing
+# ---------------------------------------------------------------------------
+
+
+def _is_panel(ohlcv: pd.DataFrame) -> bool:
+    return isinstance(ohlcv.columns, pd.MultiIndex)
+
+
+def _fields(ohlcv: pd.DataFrame, *names: str) -> list[np.ndarray]:
+    """
+    float64 (T, N) arrays for the requested fields (N = 1 for a frame).
+    """
+    out = []
+    for name in names:
+        if name not in ohlcv.columns.get_level_values(0):
+            raise KeyError(f"OHLCV input has no '{name}' column")
+        col = ohlcv[name]
+        arr = col.to_numpy(dtype=np.float64)
+        out.append(arr if arr.ndim == 2 else arr[:, None])
+    return out
+
+
+def _tickers(ohlcv: pd.DataFrame, field: str = "Close") -> pd.Index:
+    return ohlcv[field].columns
+
+
+def _prefix(ohlcv: pd.DataFrame, name: str | None) -> str:
+    ticker = name if name is not None else ohlcv.attrs.get("ticker")
+    return f"{ticker}_" if ticker else ""
+
+
+def _wrap(
+    ohlcv: pd.DataFrame, values: np.ndarray, suffix: str, name: str | None = None
+):
+    """
+    Single output -> named Series (frame) or ticker-column DataFrame (panel).
+    """
+    if _is_panel(ohlcv):
+        out = pd.DataFrame(values, index=ohlcv.index, columns=_tickers(ohlcv))
+        out.columns.name = suffix
+        return out
+    return pd.Series(
+        values[:, 0], index=ohlcv.index, name=_prefix(ohlcv, name) + suffix
+    ).dropna()
+
+
+def _wrap_many(
+    ohlcv: pd.DataFrame, outputs: dict[str, np.ndarray], name: str | None = None
+):
+    """
+    Several outputs -> DataFrame with one column per output (frame) or
+    (output, ticker) MultiIndex columns (panel).
+    """
+    if _is_panel(ohlcv):
+        return pd.concat(
+            {
+                k: pd.DataFrame(v, index=ohlcv.index, columns=_tickers(ohlcv))
+                for k, v in outputs.items()
+            },
+            axis=1,
+        )
+    prefix = _prefix(ohlcv, name)
+    cols = {prefix + k: v[:, 0] for k, v in outputs.items()}
+    return pd.DataFrame(cols, index=ohlcv.index).dropna()
+
+
+def _ewm(x: np.ndarray, alpha: float) -> np.ndarray:
+    # pandas' Cython EWM over all columns at once, float64 in and out
+    out = pd.DataFrame(x).ewm(alpha=alpha, adjust=False).mean()
+    return out.to_numpy(dtype=np.float64, copy=True)
+
+
+def _shift(x: np.ndarray, n: int = 1) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[n:] = x[:-n]
+    return out
+
+
+def _warm_up(out: np.ndarray, x: np.ndarray, n: int) -> np.ndarray:
+    """
+    NaN the first `n` rows of each column of `out`, counted from that
+    column's first valid value of `x`: assets in a panel may start later.
+    """
+    valid = ~np.isnan(x)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), len(x))
+    out[np.arange(len(x))[:, None] < first + n] = np.nan
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Trend / momentum
+# ---------------------------------------------------------------------------
+
+
+def _true_range(h, l, c) -> np.ndarray:
+    prev = _shift(c)
+    # fmax: the first bar (no previous close) falls back to H - L
+    return np.fmax(h - l, np.fmax(np.abs(h - prev), np.abs(l - prev)))
+
+
+def true_range(ohlcv: pd.DataFrame, name: str | None = None):
+    """
+    True range: max(H - L, |H - C_prev|, |L - C_prev|).
+    """
+    return _wrap(
+        ohlcv, _true_range(*_fields(ohlcv, "High", "Low", "Close")), "tr", name
+    )
+
+
+def atr(ohlcv: pd.DataFrame, window: int = 14, name: str | None = None):
+    """
+    Average True Range with Wilder smoothing (EWM, alpha = 1 / window).
+    """
+    tr = _true_range(*_fields(ohlcv, "High", "Low", "Close"))
+    out = _warm_up(_ewm(tr, 1 / window), tr, window - 1)
+    return _wrap(ohlcv, out, f"atr_{window}", name)
+
+
+def bollinger_bands(
+    ohlcv: pd.DataFrame, window: int = 20, n_std: float = 2.0, name: str | None = None
+):
+    """
+    Bollinger bands on Close: SMA +/- n_std * population std over `window`,
+    plus %B and bandwidth ((upper - lower) / mid).
+    """
+    (c,) = _fields(ohlcv, "Close")
+    m = rolling_moments(c, window, ddof=0)[window]
+    mid, sd = m["mean"], m["std"]
+    upper, lower = mid + n_std * sd, mid - n_std * sd
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pctb = (c - lower) / (upper - lower)
+        width = (upper - lower) / mid
+    sfx = f"{window}_{n_std:g}"
+    return _wrap_many(
+        ohlcv,
+        {
+            f"bb_mid_{sfx}": mid,
+            f"bb_upper_{sfx}": upper,
+            f"bb_lower_{sfx}": lower,
+            f"bb_pctb_{sfx}": pctb,
+            f"bb_width_{sfx}": width,
+        },
+        name,
+    )
+
+
+def macd(
+    ohlcv: pd.DataFrame,
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9,
+    name: str | None = None,
+):
+    """
+    MACD on Close: EMA(fast) - EMA(slow), its EMA(signal), and the histogram.
+    EMAs match `ema` (span-based, adjust=False).
+    """
+    (c,) = _fields(ohlcv, "Close")
+    line = _ewm(c, 2 / (fast + 1)) - _ewm(c, 2 / (slow + 1))
+    sig = _ewm(line, 2 / (signal + 1))
+    _warm_up(line, c, slow - 1)
+    _warm_up(sig, c, slow + signal - 2)
+    sfx = f"{fast}_{slow}_{signal}"
+    return _wrap_many(
+        ohlcv,
+        {
+            f"macd_{sfx}": line,
+            f"macd_signal_{sfx}": sig,
+            f"macd_hist_{sfx}": line - sig,
+        },
+        name,
+    )
+
+
+def stochastic(
+    ohlcv: pd.DataFrame, window: int = 14, smooth: int = 3, name: str | None = None
+):
+    """
+    Stochastic oscillator: %K = 100 (C - LL) / (HH - LL) over `window`,
+    %D = SMA(%K, smooth). A flat window (HH == LL) gives NaN.
+    """
+    h, l, c = _fields(ohlcv, "High", "Low", "Close")
+    hh, ll = rolling_max(h, window), rolling_min(l, window)
+    rng = hh - ll
+    with np.errstate(invalid="ignore", divide="ignore"):
+        k = 100.0 * (c - ll) / np.where(rng > 0, rng, np.nan)
+    d = rolling_mean(k, smooth)
+    sfx = f"{window}_{smooth}"
+    return _wrap_many(ohlcv, {f"stoch_k_{sfx}": k, f"stoch_d_{sfx}": d}, name)
+
+
+# ---------------------------------------------------------------------------
+# Volume
+# ---------------------------------------------------------------------------
+
+
+def obv(ohlcv: pd.DataFrame, name: str | None = None):
+    """
+    On-Balance Volume: cumulative volume signed by the close-to-close move.
+    """
+    c, v = _fields(ohlcv, "Close", "Volume")
+    step = np.sign(c - _shift(c)) * v
+    out = np.cumsum(np.nan_to_num(step), axis=0)
+    out[np.isnan(c)] = np.nan
+    return _wrap(ohlcv, out, "obv", name)
+
+
+def vwap(ohlcv: pd.DataFrame, window: int | None = 20, name: str | None = None):
+    """
+    Volume-weighted average of the typical price (H + L + C) / 3 over a
+    rolling `window`, or anchored at the first bar when `window` is None.
+    """
+    h, l, c, v = _fields(ohlcv, "High", "Low", "Close", "Volume")
+    tp = (h + l + c) / 3.0
+    pv = tp * v
+    if window is None:
+        num = np.nancumsum(pv, axis=0)
+        den = np.nancumsum(np.where(np.isnan(pv), np.nan, v), axis=0)
+        sfx = "vwap"
+    else:
+        num = rolling_moments(pv, window)[window]["sum"]
+        den = rolling_moments(np.where(np.isnan(pv), np.nan, v), window)[window]["sum"]
+        sfx = f"vwap_{window}"
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = num / np.where(den > 0, den, np.nan)
+    return _wrap(ohlcv, out, sfx, name)
+
+
+# ---------------------------------------------------------------------------
+# Range-based volatility
+# ---------------------------------------------------------------------------
+
+
+def parkinson_volatility(
+    ohlcv: pd.DataFrame, window: int = 20, name: str | None = None
+):
+    """
+    Parkinson (1980) high-low estimator:
+    sigma^2 = mean(ln(H/L)^2) / (4 ln 2).
+    """
+    h, l = _fields(ohlcv, "High", "Low")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hl2 = np.log(h / l) ** 2
+    var = rolling_mean(hl2, window) / (4.0 * np.log(2.0))
+    return _wrap(ohlcv, np.sqrt(var), f"parkinson_vol_{window}", name)
+
+
+def garman_klass_volatility(
+    ohlcv: pd.DataFrame, window: int = 20, name: str | None = None
+):
+    """
+    Garman-Klass (1980) OHLC estimator:
+    sigma^2 = mean(0.5 ln(H/L)^2 - (2 ln 2 - 1) ln(C/O)^2).
+    """
+    o, h, l, c = _fields(ohlcv, "Open", "High", "Low", "Close")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        term = 0.5 * np.log(h / l) ** 2 - (2.0 * np.log(2.0) - 1.0) * np.log(c / o) ** 2
+    var = np.maximum(rolling_mean(term, window), 0.0)
+    return _wrap(ohlcv, np.sqrt(var), f"gk_vol_{window}", name)
+
+
+def yang_zhang_volatility(
+    ohlcv: pd.DataFrame, window: int = 20, name: str | None = None
+):
+    """
+    Yang-Zhang (2000) estimator, robust to opening jumps and drift:
+    sigma^2 = var(overnight) + k var(open-to-close) + (1 - k) RS,
+    with RS the Rogers-Satchell mean and k = 0.34 / (1.34 + (n+1)/(n-1)).
+    """
+    if window < 2:
+        raise ValueError("window must be >= 2")
+    o, h, l, c = _fields(ohlcv, "Open", "High", "Low", "Close")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        overnight = np.log(o / _shift(c))
+        open_close = np.log(c / o)
+        rs = np.log(h / c) * np.log(h / o) + np.log(l / c) * np.log(l / o)
+
+    k = 0.34 / (1.34 + (window + 1) / (window - 1))
+    var_o = rolling_moments(overnight, window)[window]["var"]
+    var_c = rolling_moments(open_close, window)[window]["var"]
+    var = var_o + k * var_c + (1.0 - k) * rolling_mean(rs, window)
+    return _wrap(ohlcv, np.sqrt(np.maximum(var, 0.0)), f"yz_vol_{window}", name)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -22,3 +23,168 @@ def clip_series(
     out = series.clip(lower=lower, upper=upper)
     out.name = series.name
     return out
+
+
+# ---------------------------------------------------------------------------
+# Cross-sectional operators on wide panels (index = dates, columns = assets)
+# ---------------------------------------------------------------------------
+
+
+def _group_matrix(
+    columns: pd.Index, groups: pd.Series | None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Group code per asset (-1 for assets without a group) and the one-hot
+    (n_assets, n_groups) matrix used to sum values by group.
+    """
+    if groups is None:
+        return np.zeros(len(columns), dtype=int), np.ones((len(columns), 1))
+
+    labels = groups.reindex(columns)
+    codes, _ = pd.factorize(labels, use_na_sentinel=True)
+    n_groups = max(codes.max() + 1, 1)
+
+    onehot = np.zeros((len(columns), n_groups))
+    valid = codes >= 0
+    onehot[np.flatnonzero(valid), codes[valid]] = 1.0
+    return codes, onehot
+
+
+def _by_asset(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """
+    Broadcast per-group values (n_dates, n_groups) to each asset's own group.
+
+    A lookup rather than `values @ onehot.T`: a NaN group (empty, or too
+    small for a dispersion) must not leak into the other groups through
+    NaN * 0. Assets without a group map to NaN.
+    """
+    out = values[:, np.maximum(codes, 0)]
+    out[:, codes < 0] = np.nan
+    return out
+
+
+def _group_sums(
+    values: np.ndarray, onehot: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-date group sums and counts of non-NaN values, shape (n_dates, n_groups).
+    """
+    mask = ~np.isnan(values)
+    sums = np.where(mask, values, 0.0) @ onehot
+    counts = mask.astype(float) @ onehot
+    return sums, counts
+
+
+def cross_sectional_demean(
+    panel: pd.DataFrame, groups: pd.Series | None = None
+) -> pd.DataFrame:
+    """
+    Subtract the per-date cross-sectional mean, optionally within groups.
+
+    Parameters
+    ----------
+    panel : pd.DataFrame
+        Wide panel (dates x assets).
+    groups : pd.Series, optional
+        Group label per asset (e.g. sector), indexed by the panel's columns.
+        If None, the whole cross-section is one group.
+
+    Returns
+    -------
+    pd.DataFrame
+        Demeaned panel. NaNs are ignored in the means and preserved.
+    """
+    x = panel.to_numpy(dtype=float)
+    codes, onehot = _group_matrix(panel.columns, groups)
+    sums, counts = _group_sums(x, onehot)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+
+    return pd.DataFrame(
+        x - _by_asset(means, codes), index=panel.index, columns=panel.columns
+    )
+
+
+def cross_sectional_zscore(
+    panel: pd.DataFrame, groups: pd.Series | None = None, ddof: int = 1
+) -> pd.DataFrame:
+    """
+    Per-date cross-sectional z-score:
+    z_{t,i} = (x_{t,i} - mean_t) / std_t
+
+    Computed within `groups` (e.g. sectors) when given. Dates/groups with
+    fewer than ddof + 1 observations or zero dispersion yield NaN.
+    """
+    codes, onehot = _group_matrix(panel.columns, groups)
+    d = cross_sectional_demean(panel, groups).to_numpy()
+
+    sq_sums, counts = _group_sums(d * d, onehot)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = sq_sums / (counts - ddof)
+        var[counts <= ddof] = np.nan
+        z = d / _by_asset(np.sqrt(var), codes)
+    z[~np.isfinite(z)] = np.nan
+
+    return pd.DataFrame(z, index=panel.index, columns=panel.columns)
+
+
+def cross_sectional_rank(
+    panel: pd.DataFrame, pct: bool = True, method: str = "average"
+) -> pd.DataFrame:
+    """
+    Per-date cross-sectional rank (NaNs stay NaN and are not counted).
+
+    With `pct=True`, ranks are scaled to (0, 1].
+    """
+    return panel.rank(axis=1, method=method, pct=pct, na_option="keep")
+
+
+def cross_sectional_quantiles(panel: pd.DataFrame, qs: tuple[float, ...]) -> np.ndarray:
+    """
+    Per-date NaN-aware quantiles (linear interpolation, as `np.nanquantile`).
+
+    Uses a single `np.partition` over the panel with the union of the order
+    statistics needed by every row, instead of a full sort or a per-date loop.
+
+    Returns
+    -------
+    np.ndarray
+        Shape (n_dates, len(qs)).
+    """
+    x = panel.to_numpy(dtype=float)
+    n_valid = (~np.isnan(x)).sum(axis=1)
+    qs_arr = np.asarray(qs, dtype=float)
+    if ((qs_arr < 0) | (qs_arr > 1)).any():
+        raise ValueError("quantiles must be in [0, 1]")
+
+    # Fractional positions in each row's sorted valid values
+    pos = qs_arr[None, :] * np.maximum(n_valid - 1, 0)[:, None]
+    lo = np.floor(pos).astype(int)
+    hi = np.ceil(pos).astype(int)
+
+    # NaNs are partitioned to the end, so valid values occupy [0, n_valid)
+    kth = np.unique(np.concatenate([lo.ravel(), hi.ravel()]))
+    part = np.partition(x, kth, axis=1) if x.shape[1] else x
+
+    v_lo = np.take_along_axis(part, lo, axis=1)
+    v_hi = np.take_along_axis(part, hi, axis=1)
+    out = v_lo + (pos - lo) * (v_hi - v_lo)
+    out[n_valid == 0] = np.nan
+    return out
+
+
+def cross_sectional_winsorize(
+    panel: pd.DataFrame, lower: float = 0.01, upper: float = 0.99
+) -> pd.DataFrame:
+    """
+    Clip each date's cross-section to its [lower, upper] quantiles.
+    """
+    if not 0.0 <= lower <= upper <= 1.0:
+        raise ValueError("expected 0 <= lower <= upper <= 1")
+
+    bounds = cross_sectional_quantiles(panel, (lower, upper))
+    x = panel.to_numpy(dtype=float)
+    out = np.clip(x, bounds[:, [0]], bounds[:, [1]])
+
+    return pd.DataFrame(out, index=panel.index, columns=panel.columns)
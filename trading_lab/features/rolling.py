@@ -0,0 +1,366 @@
+"""
+Rolling-window statistics kernels on NumPy arrays.
+
+All window reductions use blocked prefix/suffix scans (van Herk / Gil-Werman):
+the series is cut into blocks of one window length, each block is scanned
+forwards and backwards once, and every window is the combination of one
+suffix and one prefix. This is O(n) per window regardless of its length,
+fully vectorized, and keeps every partial sum within two windows of data,
+so there is no long-range accumulation error as with a global cumsum.
+
+Arrays are reduced along axis 0; 2D inputs (time x assets) are handled
+column-wise in the same pass. NaNs are skipped and a window is valid once it
+holds at least `min_periods` observations (default: the full window, as in
+pandas).
+"""
+
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+# Longest series `rolling_moments` hands to its NumPy kernel by default
+KERNEL_MAX_ROWS = 1024
+
+
+def _window_reduce(
+    a: np.ndarray, window: int, op: np.ufunc, identity: float
+) -> np.ndarray:
+    """
+    Reduce trailing windows of `window` rows with an associative ufunc.
+
+    Rows before `window - 1` reduce over the available prefix.
+    """
+    n = a.shape[0]
+    if n == 0:
+        return a.copy()
+
+    n_blocks = -(-n // window)
+    pad = n_blocks * window - n
+    if pad:
+        fill = np.full((pad,) + a.shape[1:], identity, dtype=a.dtype)
+        a = np.concatenate([a, fill], axis=0)
+
+    blocks = a.reshape((n_blocks, window) + a.shape[1:])
+    prefix = op.accumulate(blocks, axis=1).reshape(a.shape)
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(a.shape)
+
+    out = np.empty((n,) + a.shape[1:], dtype=a.dtype)
+    head = min(window - 1, n)
+    out[:head] = prefix[:head]
+
+    # Window ending at i = suffix from its start (i - window + 1) + prefix to i;
+    # windows aligned on a block boundary are just the block's full prefix.
+    if window <= n:
+        op(suffix[: n - window + 1], prefix[window - 1 : n], out=out[window - 1 :])
+        out[window - 1 :: window] = prefix[window - 1 : n : window]
+    return out
+
+
+def window_sum(a: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing sums over `window` rows along axis 0, for arrays of any rank.
+
+    The raw kernel behind `rolling_moments`: no NaN handling (zero-fill
+    missing values first), and the first `window - 1` rows sum the
+    available prefix.
+    """
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    return _window_reduce(np.asarray(a, dtype=float), window, np.add, 0.0)
+
+
+def _window_counts(
+    valid: np.ndarray | None, window: int, shape: tuple[int, ...]
+) -> np.ndarray:
+    """
+    Number of valid observations per trailing window (`valid=None`: no NaNs).
+    """
+    if valid is not None:
+        return _window_reduce(valid, window, np.add, 0.0)
+    ramp = np.minimum(np.arange(1, shape[0] + 1), window).astype(float)
+    return np.broadcast_to(ramp.reshape((-1,) + (1,) * (len(shape) - 1)), shape).copy()
+
+
+def _as_float(values) -> np.ndarray:
+    x = np.asarray(values, dtype=float)
+    if x.ndim not in (1, 2):
+        raise ValueError("expected a 1D or 2D array")
+    return x
+
+
+def _check_window(window: int, min_periods: int | None) -> int:
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    mp = window if min_periods is None else min_periods
+    if not 1 <= mp <= window:
+        raise ValueError("min_periods must be in [1, window]")
+    return mp
+
+
+def _block_scan(blocks: np.ndarray, reverse: bool = False) -> np.ndarray:
+    """
+    Prefix (or suffix) sums within each block of `blocks`, shaped
+    (n_blocks, window, ...).
+    """
+    window = blocks.shape[1]
+    if blocks[:, 0].size < 4096 or (blocks.ndim == 2 and window > 64):
+        # Few blocks or long contiguous ones: accumulate along each block
+        if reverse:
+            return np.cumsum(blocks[:, ::-1], axis=1)[:, ::-1]
+        return np.cumsum(blocks, axis=1)
+    # Many blocks: step through their rows, each step vectorized across blocks
+    out = blocks.copy()
+    rows = range(window - 2, -1, -1) if reverse else range(1, window)
+    step = 1 if reverse else -1
+    for r in rows:
+        out[:, r] += out[:, r + step]
+    return out
+
+
+def _shifted_sums(
+    x: np.ndarray, finite: np.ndarray, window: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per trailing window: the number of finite values, their first and
+    second moments about a local center, and that center.
+
+    Each block is centered on its own first finite value, so its prefix and
+    suffix sums only see the spread within one window; the suffix part of a
+    window is moved to the center of the prefix block before the two are
+    added. No sum ever carries the level of the series. Without NaNs the
+    counts are a broadcast (n, 1, ...) ramp.
+    """
+    n = x.shape[0]
+    rest = x.shape[1:]
+    n_blocks = -(-n // window)
+    pad = n_blocks * window - n
+    if pad:
+        x = np.concatenate([x, np.zeros((pad,) + rest)])
+        finite = np.concatenate([finite, np.ones((pad,) + rest, dtype=bool)])
+    xb = x.reshape((n_blocks, window) + rest)
+    fb = finite.reshape(xb.shape)
+    all_finite = bool(finite.all())
+
+    if all_finite:
+        center = xb[:, 0]
+        y = xb - center[:, None]
+    else:
+        first = np.take_along_axis(xb, fb.argmax(axis=1)[:, None], axis=1)[:, 0]
+        center = np.where(fb.any(axis=1), first, 0.0)
+        with np.errstate(invalid="ignore"):
+            y = np.where(fb, xb - center[:, None], 0.0)
+    y2 = y * y
+
+    def flat(a):
+        return a.reshape((n_blocks * window,) + rest)[:n]
+
+    s1, s2 = flat(_block_scan(y)), flat(_block_scan(y2))
+    s1_a = flat(_block_scan(y, reverse=True))
+    s2_a = flat(_block_scan(y2, reverse=True))
+    if all_finite:
+        pos = (np.arange(n) % window).astype(float).reshape((-1,) + (1,) * len(rest))
+        cnt, cnt_a = pos + 1.0, window - pos
+    else:
+        f = fb.astype(float)
+        cnt, cnt_a = flat(_block_scan(f)), flat(_block_scan(f, reverse=True))
+    center = np.repeat(center, window, axis=0)[:n]
+
+    if 1 < window <= n:
+        # Window ending at i = suffix from j = i - window + 1 (previous
+        # block) + prefix to i; block-aligned windows are the block's prefix
+        aligned = slice(window - 1, n, window)
+        keep = (cnt[aligned].copy(), s1[aligned].copy(), s2[aligned].copy())
+        i, j = slice(window - 1, n), slice(0, n - window + 1)
+        c_a, s1_a, s2_a = cnt_a[j], s1_a[j], s2_a[j]
+        d = center[j] - center[i]
+        # s2 += s2_a + (2 s1_a + c_a d) d, then s1 += s1_a + c_a d
+        t = c_a * d
+        s2[i] += s2_a
+        s2[i] += (2.0 * s1_a + t) * d
+        s1[i] += s1_a
+        s1[i] += t
+        cnt = np.broadcast_to(cnt, s1.shape).copy() if all_finite else cnt
+        cnt[i] += c_a
+        cnt[aligned], s1[aligned], s2[aligned] = keep
+    return cnt, s1, s2, center
+
+
+def _kernel_moments(
+    x: np.ndarray, mask: np.ndarray, finite: np.ndarray, window: int, ddof: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Finite count, mean and variance per window from `_shifted_sums`.
+    """
+    nf, s1, s2, center = _shifted_sums(x, finite, window)
+    nf = np.broadcast_to(nf, x.shape)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s1 / nf
+        var = s2 - s1 * mean
+        # Only rounding can make the centered sum of squares negative
+        np.maximum(var, 0.0, out=var)
+        var /= nf - ddof
+    var[nf <= ddof] = np.nan
+    mean += center
+    return nf, mean, var
+
+
+def _pandas_moments(
+    x: np.ndarray, mask: np.ndarray, finite: np.ndarray, window: int, ddof: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Same as `_kernel_moments`, from pandas' rolling aggregations.
+
+    pandas updates its sums online over the whole series, so the data are
+    shifted by each column's first finite value to keep a constant level
+    out of them.
+    """
+    cols = x.reshape(len(x), -1)
+    fin = finite.reshape(cols.shape)
+    first = cols[fin.argmax(axis=0), np.arange(cols.shape[1])]
+    center = np.where(fin.any(axis=0), first, 0.0)
+    if fin.all():
+        data = cols - center
+    else:
+        with np.errstate(invalid="ignore"):
+            data = np.where(fin, cols - center, np.nan)
+    roll = pd.DataFrame(data).rolling(window, min_periods=1)
+    mean = (roll.mean().to_numpy() + center).reshape(x.shape)
+    var = roll.var(ddof=ddof).to_numpy(copy=True).reshape(x.shape)
+    valid = None if finite.all() else finite.astype(float)
+    return _window_counts(valid, window, x.shape), mean, var
+
+
+def rolling_moments(
+    values,
+    windows: int | Iterable[int],
+    min_periods: int | None = None,
+    ddof: int = 1,
+    engine: str = "auto",
+) -> dict[int, dict[str, np.ndarray]]:
+    """
+    Rolling count, sum, mean, variance and standard deviation for one or
+    several windows, on 1D series or 2D (time x assets) panels.
+
+    The "numpy" engine accumulates moments about local centers (see
+    `_shifted_sums`), so the variance keeps full relative precision on
+    series whose level is large or drifting relative to their dispersion
+    (e.g. prices), and a constant window has exactly zero variance. It is
+    vectorized across columns but makes several passes over the data, so it
+    beats pandas on short histories (where pandas' per-call overhead
+    dominates) and loses to its single-pass Cython aggregations on long
+    ones. "auto" picks the numpy engine up to `KERNEL_MAX_ROWS` rows and
+    pandas above (see benchmarks/bench_rolling.py).
+
+    Infinite values (e.g. log returns of a zero price) count as observations
+    but make the sum, mean and variance of every window holding them NaN,
+    leaving the other windows untouched.
+
+    Parameters
+    ----------
+    values : array-like
+        1D series or 2D (time x assets) panel.
+    windows : int or iterable of int
+        Window length(s).
+    min_periods : int, optional
+        Minimum non-NaN observations per window. Defaults to each window.
+    ddof : int
+        Delta degrees of freedom for the variance.
+    engine : str
+        "auto", "numpy" or "pandas".
+
+    Returns
+    -------
+    dict
+        {window: {"count", "sum", "mean", "var", "std"}} with arrays shaped
+        like `values`. Windows below `min_periods` are NaN.
+    """
+    if engine not in ("auto", "numpy", "pandas"):
+        raise ValueError(f"Unknown engine: {engine!r}")
+    x = _as_float(values)
+    wins = [windows] if isinstance(windows, int) else list(windows)
+    if engine == "auto":
+        engine = "numpy" if len(x) <= KERNEL_MAX_ROWS else "pandas"
+    moments = _kernel_moments if engine == "numpy" else _pandas_moments
+
+    mask = ~np.isnan(x)
+    finite = np.isfinite(x)
+    has_inf = not (finite == mask).all()
+    if not has_inf:
+        finite = mask
+
+    out: dict[int, dict[str, np.ndarray]] = {}
+    for w in wins:
+        mp = _check_window(w, min_periods)
+
+        nf, mean, var = moments(x, mask, finite, w, ddof)
+        cnt = nf
+        invalid = nf < mp
+        if has_inf:
+            # +-inf count as observations but poison only their windows
+            cnt = _window_counts(mask.astype(float), w, x.shape)
+            invalid = (cnt < mp) | (cnt > nf)
+        total = mean * nf
+        for arr in (mean, var, total):
+            arr[invalid] = np.nan
+
+        out[w] = {
+            "count": np.array(cnt, dtype=float),
+            "sum": total,
+            "mean": mean,
+            "var": var,
+            "std": np.sqrt(var),
+        }
+
+    return out
+
+
+def rolling_mean(
+    values, window: int, min_periods: int | None = None, engine: str = "auto"
+) -> np.ndarray:
+    """
+    Rolling mean (NaN-aware).
+    """
+    m = rolling_moments(values, window, min_periods=min_periods, engine=engine)
+    return m[window]["mean"]
+
+
+def rolling_std(
+    values,
+    window: int,
+    min_periods: int | None = None,
+    ddof: int = 1,
+    engine: str = "auto",
+) -> np.ndarray:
+    """
+    Rolling standard deviation (NaN-aware).
+    """
+    m = rolling_moments(values, window, min_periods, ddof=ddof, engine=engine)
+    return m[window]["std"]
+
+
+def _rolling_extreme(
+    values, window: int, min_periods: int | None, op: np.ufunc, identity: float
+) -> np.ndarray:
+    x = _as_float(values)
+    mp = _check_window(window, min_periods)
+
+    mask = ~np.isnan(x)
+    cnt = _window_counts(mask.astype(float), window, x.shape)
+    ext = _window_reduce(np.where(mask, x, identity), window, op, identity)
+    ext[cnt < mp] = np.nan
+    return ext
+
+
+def rolling_min(values, window: int, min_periods: int | None = None) -> np.ndarray:
+    """
+    Rolling minimum (NaN-aware), O(n) independent of the window length.
+    """
+    return _rolling_extreme(values, window, min_periods, np.minimum, np.inf)
+
+
+def rolling_max(values, window: int, min_periods: int | None = None) -> np.ndarray:
+    """
+    Rolling maximum (NaN-aware), O(n) independent of the window length.
+    """
+    return _rolling_extreme(values, window, min_periods, np.maximum, -np.inf)
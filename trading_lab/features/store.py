@@ -0,0 +1,298 @@
+"""
+Persistent feature store on top of the OHLCV cache.
+
+Features are stored as Parquet, one file per
+(ticker, timeframe, feature, params, version):
+
+    {root}/{TICKER}_{TF}/{feature}-{key}.parquet
+    {root}/{TICKER}_{TF}/{feature}-{key}.meta.json
+
+The metadata sidecar records a fingerprint of the source OHLCV column the
+feature was computed from (row count, last timestamp, content hash). On
+read, the cached OHLCV is checked against it:
+
+- unchanged history, no new bars: the stored feature is returned;
+- unchanged history, new bars: only the tail is recomputed, starting
+  `lookback` bars before the first new bar, and appended;
+- revised history (e.g. a dividend rescale), or a path-dependent feature
+  (EWM-based, `lookback=None`): the feature is recomputed in full.
+
+Series keep the names the feature functions give them.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from trading_lab.features.indicators import rsi
+from trading_lab.features.momentum import momentum, rate_of_change
+from trading_lab.features.normalization import zscore
+from trading_lab.features.returns import log_returns, realized_volatility
+from trading_lab.features.trend import ema, sma, sma_crossover_signal
+from trading_lab.features.volatility import realized_volatility_std
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """
+    How to compute and incrementally extend one feature.
+
+    Attributes
+    ----------
+    name : str
+        Registry key.
+    fn : callable
+        fn(series, **params) -> pd.Series.
+    lookback : callable or None
+        lookback(params) -> number of input bars before a new bar that its
+        output depends on. None marks a path-dependent feature (EWM, ...)
+        that is always recomputed in full.
+    source : str
+        OHLCV column, or the name of another registered feature (computed
+        with its default parameters) to chain on.
+    version : int
+        Bump when `fn` changes; part of the storage key.
+    """
+
+    name: str
+    fn: Callable[..., pd.Series]
+    lookback: Callable[[dict], int] | None
+    source: str = "Close"
+    version: int = 1
+
+
+FEATURES: dict[str, FeatureSpec] = {}
+
+
+def register_feature(spec: FeatureSpec) -> FeatureSpec:
+    FEATURES[spec.name] = spec
+    return spec
+
+
+for _spec in (
+    FeatureSpec("log_returns", log_returns, lambda p: 1),
+    FeatureSpec("sma", sma, lambda p: p["window"]),
+    FeatureSpec("ema", ema, None),
+    FeatureSpec("sma_crossover_signal", sma_crossover_signal, lambda p: p["slow"]),
+    FeatureSpec("rate_of_change", rate_of_change, lambda p: p["window"]),
+    FeatureSpec("momentum", momentum, lambda p: p["window"]),
+    FeatureSpec("rsi", rsi, None),
+    FeatureSpec("zscore", zscore, lambda p: p["window"], source="log_returns"),
+    FeatureSpec(
+        "realized_volatility",
+        realized_volatility,
+        lambda p: p["window"],
+        source="log_returns",
+    ),
+    FeatureSpec(
+        "realized_volatility_std",
+        realized_volatility_std,
+        lambda p: p["window"],
+        source="log_returns",
+    ),
+):
+    register_feature(_spec)
+
+
+@dataclass
+class FeatureStoreStats:
+    hits: int = 0
+    extends: int = 0
+    rebuilds: int = 0
+
+
+def _bound_params(spec: FeatureSpec, params: dict) -> dict:
+    """
+    Params with the function's defaults filled in (stable storage keys).
+    """
+    sig = inspect.signature(spec.fn)
+    bound = sig.bind_partial(None, **params)
+    bound.apply_defaults()
+    out = dict(bound.arguments)
+    out.pop(next(iter(sig.parameters)))
+    return out
+
+
+def _chain(spec: FeatureSpec) -> list[FeatureSpec]:
+    """
+    Source chain from the OHLCV column up to `spec` (inclusive).
+    """
+    chain = [spec]
+    while chain[-1].source in FEATURES:
+        chain.append(FEATURES[chain[-1].source])
+        if len(chain) > 16:
+            raise ValueError(f"Feature source cycle at '{spec.name}'")
+    return chain[::-1]
+
+
+def _folder(ticker: str, timeframe: str) -> str:
+    safe = ticker.replace("^", "").replace("/", "_").replace("=", "_")
+    return f"{safe}_{timeframe}"
+
+
+def _fingerprint(col: pd.Series) -> str:
+    return str(int(pd.util.hash_pandas_object(col, index=True).sum()))
+
+
+class FeatureStore:
+    """
+    Feature cache keyed by (ticker, timeframe, feature, params, version),
+    validated against the OHLCV cache it reads from.
+
+    Parameters
+    ----------
+    cache : CacheProvider
+        Source OHLCV cache (e.g. `DataStack.cache`).
+    root_dir : path
+        Feature storage directory.
+    """
+
+    def __init__(self, cache, root_dir: str | Path):
+        self.cache = cache
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.stats = FeatureStoreStats()
+
+    def path_for(self, ticker: str, timeframe: str, feature: str, **params) -> Path:
+        spec = FEATURES[feature]
+        params = _bound_params(spec, params)
+        key_src = json.dumps(
+            [[s.name, s.version, s.source] for s in _chain(spec)] + [params],
+            sort_keys=True,
+            default=str,
+        )
+        key = hashlib.sha1(key_src.encode()).hexdigest()[:12]
+        return self.root_dir / _folder(ticker, timeframe) / f"{feature}-{key}.parquet"
+
+    def get(
+        self,
+        ticker: str,
+        feature: str,
+        timeframe: str = "1d",
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        verbose: bool = False,
+        **params,
+    ) -> pd.Series:
+        """
+        Feature series for `ticker` over the cached OHLCV history, sliced to
+        [start, end]. Computed, extended or read back as needed.
+        """
+        if feature not in FEATURES:
+            raise KeyError(f"Unknown feature '{feature}'. Known: {sorted(FEATURES)}")
+        spec = FEATURES[feature]
+        params = _bound_params(spec, params)
+        chain = _chain(spec)
+
+        raw = self.cache.read(ticker, timeframe)
+        if raw is None or raw.empty:
+            raise ValueError(f"No cached OHLCV for {ticker} {timeframe}")
+        raw = raw.sort_index()
+        col = raw[chain[0].source]
+
+        path = self.path_for(ticker, timeframe, feature, **params)
+        meta = self._load_meta(path) if path.exists() else {}
+
+        action = "rebuild"
+        if meta:
+            last = pd.Timestamp(meta["source_last"])
+            prefix = col.loc[:last]
+            if (
+                len(prefix) == meta["source_rows"]
+                and _fingerprint(prefix) == meta["source_hash"]
+            ):
+                if len(col) == len(prefix):
+                    action = "hit"
+                elif all(s.lookback is not None for s in chain):
+                    action = "extend"
+
+        if action == "hit":
+            self.stats.hits += 1
+            out = pd.read_parquet(path).iloc[:, 0]
+        elif action == "extend":
+            self.stats.extends += 1
+            stored = pd.read_parquet(path).iloc[:, 0]
+            lookback = sum(
+                s.lookback(params if s is spec else _bound_params(s, {})) for s in chain
+            )
+            first_new = len(prefix)
+            tail = col.iloc[max(0, first_new - lookback) :]
+            new = self._compute(chain, spec, params, tail)
+            new = new[new.index > prefix.index[-1]]
+            out = pd.concat([stored, new])
+            out.name = stored.name
+            self._write(path, out, col, spec, params)
+        else:
+            self.stats.rebuilds += 1
+            out = self._compute(chain, spec, params, col)
+            self._write(path, out, col, spec, params)
+
+        if verbose:
+            print(f"[FEATURE] {action.upper():7s} {ticker} {timeframe} {feature}")
+
+        if start is not None or end is not None:
+            out = out.loc[start:end]
+        return out
+
+    def invalidate(
+        self, ticker: str, timeframe: str, feature: str | None = None
+    ) -> int:
+        """
+        Delete stored features of (ticker, timeframe), or only one feature
+        (all parameter sets). Returns the number of files removed.
+        """
+        folder = self.root_dir / _folder(ticker, timeframe)
+        pattern = f"{feature}-*" if feature else "*"
+        removed = 0
+        for p in folder.glob(pattern):
+            p.unlink()
+            removed += p.suffix == ".parquet"
+        return removed
+
+    @staticmethod
+    def _compute(chain, spec, params, col: pd.Series) -> pd.Series:
+        s = col
+        for link in chain:
+            s = link.fn(s, **(params if link is spec else {}))
+        return s
+
+    def _write(self, path: Path, out: pd.Series, col: pd.Series, spec, params):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        name = out.name if out.name is not None else spec.name
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        out.to_frame(name=name).to_parquet(tmp)
+        os.replace(tmp, path)
+        self._save_meta(
+            path,
+            {
+                "feature": spec.name,
+                "version": spec.version,
+                "params": params,
+                "source": spec.source,
+                "source_rows": len(col),
+                "source_last": str(col.index[-1]),
+                "source_hash": _fingerprint(col),
+                "updated_at": str(pd.Timestamp.now(tz="UTC")),
+            },
+        )
+
+    @staticmethod
+    def _load_meta(path: Path) -> dict:
+        try:
+            return json.loads(path.with_suffix(".meta.json").read_text())
+        except (OSError, ValueError):
+            # Missing/torn sidecar: treat the stored feature as unvalidated
+            return {}
+
+    @staticmethod
+    def _save_meta(path: Path, meta: dict) -> None:
+        mpath = path.with_suffix(".meta.json")
+        tmp = mpath.with_name(f"{mpath.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(meta, sort_keys=True, default=str))
+        os.replace(tmp, mpath)
@@ -0,0 +1,371 @@
+"""
+Block bootstrap of strategy and forecast statistics.
+
+Resample indices for a whole batch of bootstrap replications are drawn at
+once as an (n_boot, n_obs) integer array, the data are gathered with one
+fancy-indexing call, and statistics reduce along the time axis, so a
+statistic is evaluated for every replication in a single NumPy call.
+
+- stationary bootstrap (Politis & Romano, 1994): blocks of geometric
+  length with mean `block`, wrapping around the end of the sample;
+- circular block bootstrap: fixed blocks of length `block`, wrapping.
+
+Replications are split into chunks, each with its own child of one
+`SeedSequence`, and chunks can be spread over a process pool: results
+depend on (seed, chunk) only, not on the number of workers.
+
+Statistics take the resampled data, shape (B, n) or (B, n, k) for k
+jointly resampled columns, and return (B,) or (B, m). They must be
+module-level functions (or `functools.partial` of one) to run in workers.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+# Upper bound on the float64 working set of one chunk of replications.
+DEFAULT_CHUNK_BYTES = 256 * 2**20
+
+
+# ---------------------------------------------------------------------------
+# Resample indices
+# ---------------------------------------------------------------------------
+
+
+def default_block(n_obs: int) -> int:
+    """
+    Rule-of-thumb block length n^(1/3).
+    """
+    return max(1, round(n_obs ** (1 / 3)))
+
+
+def stationary_indices(
+    n_obs: int, n_boot: int, block: float, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    (n_boot, n_obs) stationary bootstrap indices, mean block length `block`.
+
+    A new block starts at each position with probability 1 / block; inside
+    a block the index advances by one (mod n_obs) from a uniform start.
+    """
+    new = rng.random((n_boot, n_obs)) < 1.0 / block
+    new[:, 0] = True
+    starts = rng.integers(0, n_obs, size=(n_boot, n_obs))
+
+    pos = np.arange(n_obs)
+    # Position of the current block's start, for every position
+    block_start = np.maximum.accumulate(np.where(new, pos, 0), axis=1)
+    idx = np.take_along_axis(starts, block_start, axis=1)
+    idx += pos
+    idx -= block_start
+    # Wrap around; cheaper than % since idx < 2 * n_obs
+    np.subtract(idx, n_obs, out=idx, where=idx >= n_obs)
+    return idx
+
+
+def circular_indices(
+    n_obs: int, n_boot: int, block: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    (n_boot, n_obs) circular block bootstrap indices, blocks of `block`.
+    """
+    block = int(block)
+    n_blocks = -(-n_obs // block)
+    starts = rng.integers(0, n_obs, size=(n_boot, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)) % n_obs
+    return idx.reshape(n_boot, n_blocks * block)[:, :n_obs]
+
+
+_INDICES = {"stationary": stationary_indices, "circular": circular_indices}
+
+
+# ---------------------------------------------------------------------------
+# Batched statistics (reduce over axis 1)
+# ---------------------------------------------------------------------------
+
+
+def sample_mean(x: np.ndarray) -> np.ndarray:
+    return x.mean(axis=1)
+
+
+def sharpe_ratio(x: np.ndarray, periods_per_year: int = 252) -> np.ndarray:
+    """
+    Annualized Sharpe ratio of per-period (excess) returns.
+    """
+    return x.mean(axis=1) / x.std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+
+
+def max_drawdown(x: np.ndarray, log: bool = True) -> np.ndarray:
+    """
+    Maximum drawdown (a positive fraction) of the compounded returns.
+
+    `log=True` for log returns (see `log_returns`), False for simple ones.
+    """
+    wealth = np.cumsum(x, axis=1) if log else np.cumsum(np.log1p(x), axis=1)
+    peak = np.maximum(np.maximum.accumulate(wealth, axis=1), 0.0)
+    return 1.0 - np.exp((wealth - peak).min(axis=1))
+
+
+def qlike_loss(forecast_vol, realized_vol):
+    """
+    QLIKE loss on variances in Patton's form, RV^2 / F^2 + log F^2
+    (minimized by F = RV; robust to noise in the realized proxy). It differs
+    from the normalized RV^2 / F^2 - log(RV^2 / F^2) - 1 by a term in RV
+    only, so loss differences are the same, and stays finite when the
+    proxy is 0.
+    """
+    f2 = np.asarray(forecast_vol) ** 2
+    return np.asarray(realized_vol) ** 2 / f2 + np.log(f2)
+
+
+def mse_loss(forecast_vol, realized_vol):
+    """
+    Squared error on variances, (F^2 - RV^2)^2.
+    """
+    return (np.asarray(forecast_vol) ** 2 - np.asarray(realized_vol) ** 2) ** 2
+
+
+LOSSES = {"qlike": qlike_loss, "mse": mse_loss}
+
+
+# ---------------------------------------------------------------------------
+# Bootstrap driver
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class BootstrapResult:
+    """
+    Point estimates and bootstrap replications of one or more statistics.
+
+    Attributes
+    ----------
+    estimate : (m,) statistics on the original sample
+    samples : (n_boot, m) statistics on the resamples
+    names : statistic labels
+    block : block length used
+    method : "stationary" or "circular"
+    """
+
+    estimate: np.ndarray
+    samples: np.ndarray
+    names: list[str]
+    block: float
+    method: str
+
+    @property
+    def std_error(self) -> np.ndarray:
+        return self.samples.std(axis=0, ddof=1)
+
+    def confidence_interval(self, level: float = 0.95) -> np.ndarray:
+        """
+        (m, 2) percentile intervals.
+        """
+        a = (1.0 - level) / 2.0
+        return np.quantile(self.samples, [a, 1.0 - a], axis=0).T
+
+    def p_value(
+        self, null: float | np.ndarray = 0.0, alternative: str = "two-sided"
+    ) -> np.ndarray:
+        """
+        Bootstrap p-value of H0: statistic == null.
+
+        The replications are centered on the estimate to mimic the null
+        distribution; `alternative` is "two-sided", "greater" or "less".
+        """
+        centered = self.samples - self.estimate
+        diff = self.estimate - np.asarray(null, dtype=float)
+        if alternative == "two-sided":
+            extreme = np.abs(centered) >= np.abs(diff)
+        elif alternative == "greater":
+            extreme = centered >= diff
+        elif alternative == "less":
+            extreme = centered <= diff
+        else:
+            raise ValueError(f"Unknown alternative: {alternative!r}")
+        return (1.0 + extreme.sum(axis=0)) / (len(self.samples) + 1.0)
+
+    def summary(
+        self,
+        level: float = 0.95,
+        null: float | np.ndarray = 0.0,
+        alternative: str = "two-sided",
+    ) -> pd.DataFrame:
+        ci = self.confidence_interval(level)
+        return pd.DataFrame(
+            {
+                "estimate": self.estimate,
+                "std_error": self.std_error,
+                "ci_low": ci[:, 0],
+                "ci_high": ci[:, 1],
+                "p_value": self.p_value(null, alternative),
+            },
+            index=self.names,
+        )
+
+
+def _as_2d(out) -> np.ndarray:
+    out = np.asarray(out, dtype=float)
+    return out[:, None] if out.ndim == 1 else out
+
+
+def _boot_chunk(
+    data: np.ndarray,
+    statistic: Callable[[np.ndarray], np.ndarray],
+    n_boot: int,
+    block: float,
+    method: str,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    idx = _INDICES[method](len(data), n_boot, block, rng)
+    return _as_2d(statistic(data[idx]))
+
+
+def _chunk_sizes(n_boot: int, chunk: int) -> list[int]:
+    full, rest = divmod(n_boot, chunk)
+    return [chunk] * full + ([rest] if rest else [])
+
+
+def block_bootstrap(
+    data: pd.Series | pd.DataFrame | np.ndarray,
+    statistic: Callable[[np.ndarray], np.ndarray],
+    n_boot: int = 10_000,
+    block: float | None = None,
+    method: str = "stationary",
+    seed: int | None = None,
+    workers: int = 1,
+    chunk: int | None = None,
+    names: Sequence[str] | None = None,
+) -> BootstrapResult:
+    """
+    Block-bootstrap a batched statistic of a time series.
+
+    Parameters
+    ----------
+    data : (n,) or (n, k)
+        Rows are resampled jointly (columns keep their cross-dependence).
+        Must not contain NaN.
+    statistic : callable
+        Maps (B, n[, k]) resamples to (B,) or (B, m) values.
+    block : float, optional
+        Mean (stationary) or fixed (circular) block length; n^(1/3) if None.
+    seed : int, optional
+        Root of the SeedSequence; one child stream per chunk.
+    workers : int
+        Processes; >1 needs a picklable statistic.
+    chunk : int, optional
+        Replications per chunk (bounded by DEFAULT_CHUNK_BYTES if None).
+    """
+    if method not in _INDICES:
+        raise ValueError(f"Unknown method: {method!r}")
+    labels = None
+    if isinstance(data, pd.DataFrame):
+        labels = list(data.columns)
+    elif isinstance(data, pd.Series) and data.name is not None:
+        labels = [data.name]
+    values = np.asarray(data, dtype=float)
+    if np.isnan(values).any():
+        raise ValueError("data contains NaN; align and drop missing rows first")
+
+    n_obs = len(values)
+    block = default_block(n_obs) if block is None else block
+    if block < 1:
+        raise ValueError("block must be >= 1")
+
+    estimate = _as_2d(statistic(values[None]))[0]
+
+    width = values[0].size
+    # Index generation holds ~4 (B, n) temporaries next to the gathered data
+    chunk = chunk or max(1, DEFAULT_CHUNK_BYTES // (8 * n_obs * (width + 4)))
+    sizes = _chunk_sizes(n_boot, chunk)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(values, statistic, m, block, method, s) for m, s in zip(sizes, seeds)]
+
+    if workers <= 1 or len(args) == 1:
+        parts = [_boot_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_boot_chunk, *zip(*args)))
+
+    if names is None:
+        if labels is not None and len(labels) == len(estimate):
+            names = [str(x) for x in labels]
+        else:
+            names = [f"stat_{i}" for i in range(len(estimate))]
+
+    return BootstrapResult(
+        estimate=estimate,
+        samples=np.concatenate(parts, axis=0),
+        names=list(names),
+        block=block,
+        method=method,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Common tests
+# ---------------------------------------------------------------------------
+
+
+def bootstrap_sharpe(
+    returns: pd.Series | pd.DataFrame,
+    periods_per_year: int = 252,
+    **kwargs,
+) -> BootstrapResult:
+    """
+    Sharpe ratio(s) with block-bootstrap CIs; p-values test Sharpe == 0.
+
+    Several strategies (DataFrame columns) are resampled jointly, over the
+    rows where all are observed.
+    """
+    returns = returns.dropna()
+    stat = partial(sharpe_ratio, periods_per_year=periods_per_year)
+    return block_bootstrap(returns, stat, **kwargs)
+
+
+def bootstrap_drawdown(
+    returns: pd.Series | pd.DataFrame, log: bool = True, **kwargs
+) -> BootstrapResult:
+    """
+    Maximum drawdown(s) with block-bootstrap CIs.
+    """
+    returns = returns.dropna()
+    return block_bootstrap(returns, partial(max_drawdown, log=log), **kwargs)
+
+
+def bootstrap_loss_difference(
+    forecast_a: pd.Series,
+    forecast_b: pd.Series,
+    realized: pd.Series,
+    loss: str | Sequence[str] = ("qlike", "mse"),
+    **kwargs,
+) -> BootstrapResult:
+    """
+    Mean loss difference L(a) - L(b) of two volatility forecasts against a
+    realized-volatility proxy (e.g. `realized_volatility_std`), a block-
+    bootstrap Diebold-Mariano test. Negative means `a` is better; the
+    p-values test equal predictive accuracy.
+
+    Forecasts and the proxy must be in the same units (note that
+    `rolling_garch_forecast` is in percent).
+    """
+    losses = [loss] if isinstance(loss, str) else list(loss)
+    for name in losses:
+        if name not in LOSSES:
+            raise ValueError(f"Unknown loss: {name!r}")
+
+    df = pd.concat([forecast_a, forecast_b, realized], axis=1, join="inner")
+    df = df.dropna()
+    fa, fb, rv = (df.iloc[:, i].to_numpy(dtype=float) for i in range(3))
+    diffs = pd.DataFrame(
+        {name: LOSSES[name](fa, rv) - LOSSES[name](fb, rv) for name in losses},
+        index=df.index,
+    )
+    return block_bootstrap(diffs, sample_mean, **kwargs)
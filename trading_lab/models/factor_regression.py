@@ -0,0 +1,236 @@
+"""
+Rolling and expanding multi-factor OLS for a whole asset panel at once.
+
+For every asset i and date t the regression
+
+    r_{i,s} = alpha_{i,t} + beta_{i,t}' f_s + e_{i,s},   s in window(t)
+
+is solved from windowed cross-product sums (X'X, X'y, y'y), which are built
+in one vectorized pass per chunk of assets:
+
+- rolling windows use the blocked prefix/suffix sums of
+  `trading_lab.features.rolling` (no long-range accumulation error),
+- expanding windows use plain cumulative sums.
+
+A bar enters asset i's sums only if r_i and every factor are observed there,
+so each asset gets its own NaN-aware window. Inputs are centered on their
+sample means first; the slope is shift-invariant and the intercept is
+restored afterwards.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.features.normalization import zscore
+from trading_lab.features.rolling import window_sum
+from trading_lab.features.volatility import realized_volatility_std
+
+# Upper bound on the float64 working set of one chunk of assets.
+DEFAULT_CHUNK_BYTES = 256 * 2**20
+
+
+@dataclass
+class FactorRegression:
+    """
+    Per-date regression output, each frame shaped like the return panel.
+
+    Attributes
+    ----------
+    alpha : pd.DataFrame
+    betas : dict[str, pd.DataFrame]
+        One frame per factor.
+    r2 : pd.DataFrame
+    resid : pd.DataFrame
+        r_t - alpha - beta' f_t. In-sample (fit including t) by default,
+        or with coefficients from `lag` bars earlier.
+    nobs : pd.DataFrame
+        Observations used per window.
+    """
+
+    alpha: pd.DataFrame
+    betas: dict[str, pd.DataFrame]
+    r2: pd.DataFrame
+    resid: pd.DataFrame
+    nobs: pd.DataFrame
+
+
+def _window_sum(a: np.ndarray, window: int | None) -> np.ndarray:
+    if window is None:
+        return np.cumsum(a, axis=0)
+    return window_sum(a, window)
+
+
+def _solve(xtx: np.ndarray, xty: np.ndarray, ok: np.ndarray) -> np.ndarray:
+    """
+    Batched solve of xtx @ b = xty; windows not `ok` get NaN.
+    """
+    p = xtx.shape[-1]
+    a = np.where(ok[..., None, None], xtx, np.eye(p))
+    b = np.where(ok[..., None], xty, 0.0)
+    try:
+        out = np.linalg.solve(a, b[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        # Some valid window is exactly collinear: least-norm solution
+        out = (np.linalg.pinv(a) @ b[..., None])[..., 0]
+    out[~ok] = np.nan
+    return out
+
+
+def _regress_chunk(
+    y: np.ndarray,
+    x: np.ndarray,
+    x_ok: np.ndarray,
+    window: int | None,
+    min_periods: int,
+    lag: int,
+) -> dict[str, np.ndarray]:
+    """
+    y: (T, n) centered returns, x: (T, P) design [1, centered factors].
+    """
+    p = x.shape[1]
+    m = (~np.isnan(y) & x_ok[:, None]).astype(float)
+    y0 = np.where(m > 0, y, 0.0)
+    x0 = np.where(x_ok[:, None], x, 0.0)
+
+    iu, ju = np.triu_indices(p)
+    xx = x0[:, iu] * x0[:, ju]
+
+    # Windowed sums per asset: (T, n, P(P+1)/2), (T, n, P), (T, n)
+    sxx = _window_sum(m[:, :, None] * xx[:, None, :], window)
+    sxy = _window_sum(y0[:, :, None] * x0[:, None, :], window)
+    syy = _window_sum(y0 * y0, window)
+
+    xtx = np.empty(sxx.shape[:2] + (p, p))
+    xtx[..., iu, ju] = sxx
+    xtx[..., ju, iu] = sxx
+    nobs = xtx[..., 0, 0]
+
+    ok = (nobs >= min_periods) & (nobs > p)
+    coef = _solve(xtx, sxy, ok)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ssr = syy - np.einsum("tnp,tnp->tn", coef, sxy)
+        sst = syy - sxy[..., 0] ** 2 / nobs
+        r2 = 1.0 - ssr / sst
+
+    fit_coef = coef
+    if lag:
+        fit_coef = np.full_like(coef, np.nan)
+        fit_coef[lag:] = coef[:-lag]
+    resid = y - np.einsum("tnp,tp->tn", fit_coef, x)
+    resid[m == 0] = np.nan
+
+    return {"coef": coef, "r2": r2, "resid": resid, "nobs": nobs}
+
+
+def _default_chunk(t_len: int, p: int) -> int:
+    per_asset = 8 * t_len * (p * (p + 1) // 2 + p + 1) * 4
+    return max(1, DEFAULT_CHUNK_BYTES // per_asset)
+
+
+def rolling_factor_regression(
+    returns: pd.DataFrame,
+    factors: pd.DataFrame,
+    window: int | None = 252,
+    min_periods: int | None = None,
+    lag: int = 0,
+    chunk_assets: int | None = None,
+) -> FactorRegression:
+    """
+    Rolling (or expanding, `window=None`) OLS of every asset on the factors.
+
+    Parameters
+    ----------
+    returns : pd.DataFrame
+        (T x N) asset returns.
+    factors : pd.DataFrame
+        (T x K) factor returns; aligned to `returns.index`.
+    window : int or None
+        Window length in bars; None for expanding windows.
+    min_periods : int, optional
+        Minimum usable bars per window (default: window, or K + 2 when
+        expanding). Windows need more bars than coefficients regardless.
+    lag : int
+        0 for in-sample residuals; 1 to use coefficients fitted through t-1
+        (out-of-sample residuals, no look-ahead).
+    chunk_assets : int, optional
+        Assets per vectorized pass; defaults to a ~256 MB working set.
+
+    Returns
+    -------
+    FactorRegression
+    """
+    factors = factors.reindex(returns.index)
+    k = factors.shape[1]
+    p = k + 1
+    if window is not None and window <= p:
+        raise ValueError(f"window must exceed the number of coefficients ({p})")
+    mp = min_periods or (window if window is not None else p + 1)
+
+    f = factors.to_numpy(dtype=float)
+    f_ok = ~np.isnan(f).any(axis=1)
+    f_center = f[f_ok].mean(axis=0) if f_ok.any() else np.zeros(k)
+    x = np.column_stack([np.ones(len(f)), f - f_center])
+
+    r = returns.to_numpy(dtype=float)
+    r_center = np.nan_to_num(np.nanmean(r, axis=0)) if len(r) else np.zeros(0)
+    y = r - r_center
+
+    chunk = chunk_assets or _default_chunk(len(r), p)
+    n = r.shape[1]
+    coef = np.empty((len(r), n, p))
+    r2, resid, nobs = (np.empty(r.shape) for _ in range(3))
+
+    for s in range(0, n, chunk):
+        part = _regress_chunk(y[:, s : s + chunk], x, f_ok, window, mp, lag)
+        coef[:, s : s + chunk] = part["coef"]
+        r2[:, s : s + chunk] = part["r2"]
+        resid[:, s : s + chunk] = part["resid"]
+        nobs[:, s : s + chunk] = part["nobs"]
+
+    # Undo centering: r = a + b'f  <=>  r - rc = (a - rc + b'fc) + b'(f - fc)
+    betas = coef[..., 1:]
+    alpha = coef[..., 0] + r_center - betas @ f_center
+
+    def frame(a):
+        return pd.DataFrame(a, index=returns.index, columns=returns.columns)
+
+    return FactorRegression(
+        alpha=frame(alpha),
+        betas={str(c): frame(betas[..., j]) for j, c in enumerate(factors.columns)},
+        r2=frame(r2),
+        resid=frame(resid),
+        nobs=frame(nobs),
+    )
+
+
+def residual_features(
+    resid: pd.DataFrame,
+    z_window: int = 252,
+    vol_window: int = 20,
+) -> dict[str, pd.DataFrame]:
+    """
+    Residual z-scores and realized volatility per asset, via the existing
+    `zscore` and `realized_volatility_std` features.
+
+    Returns
+    -------
+    dict
+        {"zscore": DataFrame, "vol": DataFrame}, aligned to `resid`.
+    """
+
+    def per_asset(fn, window):
+        cols = {c: fn(resid[c].dropna(), window) for c in resid.columns}
+        return pd.DataFrame(
+            {c: s.reindex(resid.index) for c, s in cols.items()},
+            index=resid.index,
+        )
+
+    return {
+        "zscore": per_asset(zscore, z_window),
+        "vol": per_asset(realized_volatility_std, vol_window),
+    }
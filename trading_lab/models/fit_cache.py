@@ -0,0 +1,233 @@
+"""
+Disk-backed memoization of GARCH fits.
+
+A fit is keyed by a BLAKE2 hash of the (percent) return values, their
+index and the model spec, and stored as one compressed .npz file holding
+the parameters, their covariance, the log-likelihood and the residual and
+conditional-volatility arrays. The index is not stored: a hit implies the
+caller passed the same index, so the series are rebuilt on it.
+
+Entries are immutable. With `max_bytes`, the least recently used entries
+(file mtime, refreshed on every hit) are evicted after each write. Sizes
+and mtimes live in an in-memory table scanned from disk once (on the first
+write), so a write does not stat the whole directory; entries written by
+other processes afterwards are only seen by the next instance.
+
+Layout: {root}/{key[:2]}/{key}.npz
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.data.cache.policy import CacheStats
+
+# Bump when the stored layout or the fitting procedure changes
+FIT_CACHE_VERSION = 2
+
+
+def fit_key(r: pd.Series, spec: dict) -> str:
+    """
+    Hash of the return values, index and model spec.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([FIT_CACHE_VERSION, spec], sort_keys=True).encode())
+    h.update(np.ascontiguousarray(r.to_numpy(dtype=np.float64)).tobytes())
+    index = r.index
+    if isinstance(index, pd.DatetimeIndex):
+        h.update(str(index.dtype).encode())
+        h.update(np.ascontiguousarray(index.asi8).tobytes())
+    else:
+        h.update(pd.util.hash_pandas_object(index).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+@dataclass
+class GarchForecast:
+    """
+    Analytic variance forecast, laid out like arch's `.variance` (one row
+    at the last observation, columns h.1 ... h.H).
+    """
+
+    variance: pd.DataFrame
+
+
+@dataclass
+class GarchFit:
+    """
+    Zero-mean GARCH(p,q) fit with the attributes of an arch result that
+    the library uses. `distribution` is the name of the innovation
+    distribution (`model.distribution.name` of the arch result).
+    """
+
+    params: pd.Series
+    param_cov: pd.DataFrame
+    loglikelihood: float
+    resid: pd.Series
+    conditional_volatility: pd.Series
+    distribution: str
+
+    @classmethod
+    def from_result(cls, res) -> GarchFit:
+        return cls(
+            params=res.params.copy(),
+            param_cov=res.param_cov.copy(),
+            loglikelihood=float(res.loglikelihood),
+            resid=res.resid.copy(),
+            conditional_volatility=res.conditional_volatility.copy(),
+            distribution=res.model.distribution.name,
+        )
+
+    def _lags(self, prefix: str) -> np.ndarray:
+        return np.array(
+            [v for k, v in self.params.items() if k.startswith(prefix)], dtype=float
+        )
+
+    def forecast(self, horizon: int = 1) -> GarchForecast:
+        """
+        h-step variance forecasts from the end of the sample:
+        sigma2[T+h] = omega + sum_i alpha_i e2[T+h-i] + sum_j beta_j sigma2[T+h-j],
+        with future e2 replaced by their forecast sigma2.
+        """
+        omega = float(self.params["omega"])
+        alpha, beta = self._lags("alpha["), self._lags("beta[")
+        p, q = len(alpha), len(beta)
+        e2 = list(self.resid.to_numpy(dtype=float)[-p:] ** 2) if p else []
+        s2 = list(self.conditional_volatility.to_numpy(dtype=float)[-q:] ** 2)
+        s2 = s2 if q else []
+
+        out = []
+        for _ in range(horizon):
+            var = omega
+            var += sum(a * e2[-1 - i] for i, a in enumerate(alpha))
+            var += sum(b * s2[-1 - j] for j, b in enumerate(beta))
+            out.append(var)
+            e2.append(var)
+            s2.append(var)
+
+        cols = [f"h.{h}" for h in range(1, horizon + 1)]
+        return GarchForecast(
+            pd.DataFrame([out], index=self.resid.index[-1:], columns=cols)
+        )
+
+
+class FitCache:
+    """
+    Directory of memoized fits, optionally bounded to `max_bytes`.
+    """
+
+    def __init__(self, root_dir: str | Path, max_bytes: int | None = None):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._stats = CacheStats()
+        # path -> [size, mtime], for the budget
+        self._usage: dict[Path, list] | None = None
+
+    def path_for(self, key: str) -> Path:
+        return self.root_dir / key[:2] / f"{key}.npz"
+
+    def get(self, key: str, index: pd.Index) -> GarchFit | None:
+        path = self.path_for(key)
+        try:
+            with np.load(path) as z:
+                data = {k: z[k] for k in z.files}
+        except (OSError, ValueError, KeyError):
+            # Missing, or torn by a crash mid-write: treat as a miss
+            self._stats.misses += 1
+            return None
+        self._stats.hits += 1
+        os.utime(path)
+        if self._usage is not None and path in self._usage:
+            self._usage[path][1] = path.stat().st_mtime
+
+        names = [str(x) for x in data["param_names"]]
+        return GarchFit(
+            params=pd.Series(data["params"], index=names, name="params"),
+            param_cov=pd.DataFrame(data["param_cov"], index=names, columns=names),
+            loglikelihood=float(data["loglikelihood"]),
+            resid=pd.Series(data["resid"], index=index, name="resid"),
+            conditional_volatility=pd.Series(
+                data["cond_vol"], index=index, name="cond_vol"
+            ),
+            distribution=str(data["distribution"]),
+        )
+
+    def put(self, key: str, fit: GarchFit) -> None:
+        path = self.path_for(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(
+                f,
+                param_names=np.array(fit.params.index, dtype=str),
+                params=fit.params.to_numpy(dtype=float),
+                param_cov=fit.param_cov.to_numpy(dtype=float),
+                loglikelihood=np.float64(fit.loglikelihood),
+                resid=fit.resid.to_numpy(dtype=float),
+                cond_vol=fit.conditional_volatility.to_numpy(dtype=float),
+                distribution=np.array(fit.distribution),
+            )
+        os.replace(tmp, path)
+        self._stats.writes += 1
+        if self.max_bytes is not None:
+            st = path.stat()
+            self._usage_table()[path] = [st.st_size, st.st_mtime]
+            self._enforce_budget(keep=path)
+
+    def _files(self) -> list[Path]:
+        return list(self.root_dir.glob("*/*.npz"))
+
+    def _usage_table(self) -> dict[Path, list]:
+        """
+        Size and mtime of every stored fit, scanned once.
+        """
+        if self._usage is None:
+            self._usage = {}
+            for p in self._files():
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                self._usage[p] = [st.st_size, st.st_mtime]
+        return self._usage
+
+    def _enforce_budget(self, keep: Path) -> None:
+        table = self._usage_table()
+        total = sum(size for size, _ in table.values())
+        if total <= self.max_bytes:
+            return
+        entries = sorted(
+            (mtime, size, p) for p, (size, mtime) in table.items() if p != keep
+        )
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            del table[p]
+            total -= size
+            self._stats.evictions += 1
+            self._stats.bytes_evicted += size
+
+    def stats(self) -> CacheStats:
+        """
+        Hit/miss/eviction counters of this instance and current disk usage.
+        """
+        files = self._files()
+        return replace(
+            self._stats,
+            files=len(files),
+            total_bytes=sum(p.stat().st_size for p in files),
+        )
+
+    def clear(self) -> None:
+        for p in self._files():
+            p.unlink(missing_ok=True)
+        self._usage = None
@@ -1,6 +1,40 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy as np
 import pandas as pd
-from arch import arch_model
+
+from trading_lab.models.fit_cache import FitCache, GarchFit, fit_key
+
+if TYPE_CHECKING:
+    from arch.univariate.base import ARCHModelResult
+
+# `arch` (and the scipy/statsmodels stack behind it) is imported inside the
+# functions that fit models, so importing this module stays cheap.
+
+
+def _fit(
+    r: pd.Series, p: int, q: int, dist: str, cache: FitCache | None
+) -> ARCHModelResult | GarchFit:
+    """
+    Zero-mean GARCH(p,q) on percent returns, memoized in `cache` if given.
+    A cache hit does not import arch. Returns the arch result without a
+    cache, a `GarchFit` with one.
+    """
+    if cache is not None:
+        spec = {"mean": "Zero", "vol": "GARCH", "p": p, "q": q, "dist": dist}
+        key = fit_key(r, spec)
+        fit = cache.get(key, r.index)
+        if fit is None:
+            fit = GarchFit.from_result(_fit(r, p, q, dist, None))
+            cache.put(key, fit)
+        return fit
+
+    from arch import arch_model
+
+    model = arch_model(r, mean="Zero", vol="GARCH", p=p, q=q, dist=dist)
+    return model.fit(disp="off")
 
 
 def fit_garch(
@@ -8,14 +42,18 @@ def fit_garch(
     p: int = 1,
     q: int = 1,
     dist: str = "t",
-):
+    cache: FitCache | None = None,
+) -> ARCHModelResult | GarchFit:
     """
     Fit a GARCH(p,q) model on return series (in percent).
+
+    Returns the arch result. With a `FitCache`, identical (returns, index,
+    spec) fits are loaded from disk, and the result is narrowed to a
+    `GarchFit` (params, param_cov, loglikelihood, resid,
+    conditional_volatility, forecast) whether it was a hit or not; code
+    that must work either way should use only those attributes.
     """
-    r = returns * 100
-    model = arch_model(r, mean="Zero", vol="GARCH", p=p, q=q, dist=dist)
-    res = model.fit(disp="off")
-    return res
+    return _fit(returns * 100, p, q, dist, cache)
 
 
 def rolling_garch_forecast(
@@ -24,9 +62,13 @@ def rolling_garch_forecast(
     q: int,
     horizon: int = 1,
     test_size: int = 365 * 2,
+    cache: FitCache | None = None,
 ):
     """
     Rolling one-step-ahead GARCH volatility forecast.
+
+    With a `FitCache`, each date's fit is memoized, so rerunning over an
+    extended sample only fits the new dates.
     """
     r = returns * 100
     forecasts = []
@@ -34,9 +76,7 @@ def rolling_garch_forecast(
 
     for t in index:
         train = r.loc[:t].iloc[:-1]
-        res = arch_model(train, mean="Zero", vol="GARCH", p=p, q=q, dist="t").fit(
-            disp="off"
-        )
+        res = _fit(train, p, q, "t", cache)
         fc = res.forecast(horizon=horizon)
         sigma = np.sqrt(fc.variance.iloc[-1, horizon - 1])
         forecasts.append(sigma)
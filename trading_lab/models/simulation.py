@@ -0,0 +1,307 @@
+"""
+Batched Monte Carlo simulation from fitted GARCH(p,q) models.
+
+Paths for many assets are generated together: the recursion loops over the
+horizon only, and each step updates a (paths x assets) block in NumPy.
+Units follow `fit_garch` (returns in percent).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Upper bound on the float64 working set of one simulated chunk.
+DEFAULT_CHUNK_BYTES = 256 * 2**20
+
+
+# Innovation distributions `_standardized_t` can draw, by arch name
+_NORMAL = "Normal"
+_STUDENTS_T = "Standardized Student's t"
+
+
+def _distribution(res) -> str:
+    """
+    Innovation distribution of an arch result or a `GarchFit`.
+    """
+    model = getattr(res, "model", None)
+    return model.distribution.name if model is not None else res.distribution
+
+
+def _check_simulable(name: str, res) -> None:
+    """
+    Raise ValueError unless `res` is a zero-mean GARCH(p,q) with normal or
+    Student-t innovations, the only model `_simulate_chunk` reproduces.
+    """
+    model = getattr(res, "model", None)
+    vol = model.volatility.name if model is not None else "GARCH"
+    extra = [
+        k
+        for k in res.params.index
+        if k not in ("omega", "nu") and not k.startswith(("alpha[", "beta["))
+    ]
+    if vol != "GARCH" or extra:
+        raise ValueError(
+            f"{name}: only zero-mean GARCH(p,q) fits can be simulated, got "
+            f"{vol} with parameters {extra}"
+        )
+    dist = _distribution(res)
+    if dist not in (_NORMAL, _STUDENTS_T):
+        raise ValueError(
+            f"{name}: only normal and Student-t innovations can be simulated, "
+            f"got {dist!r}"
+        )
+
+
+@dataclass
+class GarchParams:
+    """
+    Zero-mean GARCH(p,q) parameters and terminal state for N assets.
+
+    Attributes
+    ----------
+    omega : (N,)
+    alpha : (N, p) ARCH coefficients (alpha[1] first)
+    beta : (N, q) GARCH coefficients (beta[1] first)
+    nu : (N,) Student-t degrees of freedom (np.inf for normal innovations)
+    last_resid : (N, p) last p residuals, most recent last
+    last_variance : (N, q) last q conditional variances, most recent last
+    names : asset labels
+    """
+
+    omega: np.ndarray
+    alpha: np.ndarray
+    beta: np.ndarray
+    nu: np.ndarray
+    last_resid: np.ndarray
+    last_variance: np.ndarray
+    names: list[str]
+
+    @property
+    def n_assets(self) -> int:
+        return len(self.omega)
+
+    @classmethod
+    def from_fits(cls, fits: Mapping[str, Any]) -> GarchParams:
+        """
+        Stack `fit_garch` results ({name: result}) into one parameter set.
+
+        Orders may differ across assets; missing lags are zero-padded. Fits
+        with a mean, asymmetric or other volatility terms, or innovations
+        other than normal / Student-t raise ValueError.
+        """
+        names = list(fits)
+        specs = []
+        for name in names:
+            res = fits[name]
+            _check_simulable(name, res)
+            params = res.params
+            alpha = [params[k] for k in params.index if k.startswith("alpha[")]
+            beta = [params[k] for k in params.index if k.startswith("beta[")]
+            t_dist = _distribution(res) == _STUDENTS_T
+            nu = float(params["nu"]) if t_dist else np.inf
+
+            resid = np.asarray(res.resid, dtype=float)
+            resid = resid[~np.isnan(resid)]
+            vol = np.asarray(res.conditional_volatility, dtype=float)
+            vol = vol[~np.isnan(vol)]
+            specs.append((float(params["omega"]), alpha, beta, nu, resid, vol**2))
+
+        p = max(max(len(s[1]) for s in specs), 1)
+        q = max(max(len(s[2]) for s in specs), 1)
+
+        n = len(specs)
+        alpha = np.zeros((n, p))
+        beta = np.zeros((n, q))
+        last_resid = np.zeros((n, p))
+        last_var = np.zeros((n, q))
+        for i, (_, a, b, _, resid, var) in enumerate(specs):
+            alpha[i, : len(a)] = a
+            beta[i, : len(b)] = b
+            last_resid[i, p - min(p, len(resid)) :] = resid[-p:]
+            last_var[i, q - min(q, len(var)) :] = var[-q:]
+
+        return cls(
+            omega=np.array([s[0] for s in specs]),
+            alpha=alpha,
+            beta=beta,
+            nu=np.array([s[3] for s in specs]),
+            last_resid=last_resid,
+            last_variance=last_var,
+            names=[str(x) for x in names],
+        )
+
+
+def _standardized_t(
+    rng: np.random.Generator, nu: np.ndarray, size: tuple[int, int]
+) -> np.ndarray:
+    """
+    Unit-variance innovations: Student-t(nu) scaled by sqrt((nu - 2) / nu),
+    standard normal where nu is infinite.
+    """
+    finite = np.isfinite(nu)
+    if not finite.any():
+        return rng.standard_normal(size)
+
+    nu_f = np.where(finite, nu, 1e6)
+    z = rng.standard_t(nu_f, size=size) * np.sqrt((nu_f - 2.0) / nu_f)
+    if not finite.all():
+        z[:, ~finite] = rng.standard_normal((size[0], int((~finite).sum())))
+    return z
+
+
+def _simulate_chunk(
+    params: GarchParams,
+    horizon: int,
+    n_paths: int,
+    seed: np.random.SeedSequence,
+    cumulative: bool,
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = params.n_assets
+    p, q = params.alpha.shape[1], params.beta.shape[1]
+
+    # Lag buffers, most recent last: (paths, assets, lags)
+    eps2 = np.broadcast_to(params.last_resid**2, (n_paths, n, p)).copy()
+    sig2 = np.broadcast_to(params.last_variance, (n_paths, n, q)).copy()
+
+    alpha_rev = params.alpha[:, ::-1]
+    beta_rev = params.beta[:, ::-1]
+
+    out = np.empty((n_paths, n) if cumulative else (n_paths, horizon, n))
+    if cumulative:
+        out[:] = 0.0
+
+    for h in range(horizon):
+        var = (
+            params.omega
+            + (eps2 * alpha_rev).sum(axis=2)
+            + (sig2 * beta_rev).sum(axis=2)
+        )
+        eps = np.sqrt(var) * _standardized_t(rng, params.nu, (n_paths, n))
+
+        if cumulative:
+            out += eps
+        else:
+            out[:, h, :] = eps
+
+        eps2[:, :, :-1] = eps2[:, :, 1:]
+        eps2[:, :, -1] = eps * eps
+        sig2[:, :, :-1] = sig2[:, :, 1:]
+        sig2[:, :, -1] = var
+
+    return out
+
+
+def _chunk_sizes(n_paths: int, chunk_paths: int) -> list[int]:
+    full, rest = divmod(n_paths, chunk_paths)
+    return [chunk_paths] * full + ([rest] if rest else [])
+
+
+def _default_chunk(horizon: int, n_assets: int, cumulative: bool) -> int:
+    # Lag buffers + output per path, in float64
+    per_path = 8 * n_assets * (8 + (1 if cumulative else horizon))
+    return max(1, DEFAULT_CHUNK_BYTES // per_path)
+
+
+def _run(
+    params: GarchParams,
+    horizon: int,
+    n_paths: int,
+    seed: int | None,
+    chunk_paths: int | None,
+    workers: int,
+    cumulative: bool,
+) -> np.ndarray:
+    if horizon < 1 or n_paths < 1:
+        raise ValueError("horizon and n_paths must be >= 1")
+
+    chunk = chunk_paths or _default_chunk(horizon, params.n_assets, cumulative)
+    sizes = _chunk_sizes(n_paths, chunk)
+
+    # One child stream per chunk: results depend on (seed, chunk_paths) only,
+    # not on how chunks are spread over workers.
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(params, horizon, m, s, cumulative) for m, s in zip(sizes, seeds)]
+
+    if workers <= 1 or len(args) == 1:
+        parts = [_simulate_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk, *zip(*args)))
+
+    return np.concatenate(parts, axis=0)
+
+
+def simulate_garch_paths(
+    params: GarchParams,
+    horizon: int,
+    n_paths: int,
+    seed: int | None = None,
+    chunk_paths: int | None = None,
+    workers: int = 1,
+) -> np.ndarray:
+    """
+    Simulate return paths from the fitted terminal state.
+
+    Returns
+    -------
+    np.ndarray
+        Shape (n_paths, horizon, n_assets), in percent.
+    """
+    return _run(params, horizon, n_paths, seed, chunk_paths, workers, cumulative=False)
+
+
+def simulate_garch_cumulative(
+    params: GarchParams,
+    horizon: int,
+    n_paths: int,
+    seed: int | None = None,
+    chunk_paths: int | None = None,
+    workers: int = 1,
+) -> np.ndarray:
+    """
+    Simulate horizon-aggregated (summed log) returns without storing paths.
+
+    Memory is bounded by one chunk of lag buffers plus (n_paths, n_assets).
+
+    Returns
+    -------
+    np.ndarray
+        Shape (n_paths, n_assets), in percent.
+    """
+    return _run(params, horizon, n_paths, seed, chunk_paths, workers, cumulative=True)
+
+
+def var_es_summary(
+    samples: np.ndarray,
+    names: Sequence[str] | None = None,
+    alphas: Sequence[float] = (0.01, 0.05),
+) -> pd.DataFrame:
+    """
+    Value-at-Risk and Expected Shortfall per asset from simulated returns.
+
+    Losses are reported as positive numbers:
+      VaR_a = -q_a(r),  ES_a = -E[r | r <= q_a(r)]
+
+    Parameters
+    ----------
+    samples : np.ndarray
+        (n_paths, n_assets) simulated returns, e.g. simulate_garch_cumulative.
+    """
+    samples = np.asarray(samples, dtype=float)
+    n_paths = samples.shape[0]
+    sorted_ = np.sort(samples, axis=0)
+
+    cols = {}
+    for a in alphas:
+        k = max(int(np.ceil(a * n_paths)), 1)
+        cols[f"VaR_{a:g}"] = -np.quantile(samples, a, axis=0)
+        cols[f"ES_{a:g}"] = -sorted_[:k].mean(axis=0)
+
+    return pd.DataFrame(cols, index=list(names) if names is not None else None)
@@ -1,10 +1,291 @@
-import matplotlib.pyplot as plt
+"""
+Plotting helpers.
 
+Long series are decimated before they reach matplotlib: the renderer only
+ever sees a few points per horizontal pixel, chosen so that the drawn line is
+visually the same (per-bucket min/max envelope, or LTTB for smooth shapes).
+matplotlib itself is imported lazily.
+"""
 
-def plot_series(series, title: str, ylabel: str = ""):
-    plt.figure(figsize=(12, 5))
-    plt.plot(series)
-    plt.title(title)
-    plt.ylabel(ylabel)
-    plt.grid(True, linestyle="--", alpha=0.6)
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_POINTS = 4000
+
+
+# ---------------------------------------------------------------------------
+# Downsampling
+# ---------------------------------------------------------------------------
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Indices of the min and max of each of `n_buckets` equal-count buckets.
+
+    Keeps every local extreme that is visible at the target resolution, so
+    the decimated line covers the same vertical envelope as the original.
+    Returns at most 2 * n_buckets sorted indices. NaNs are never selected.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.flatnonzero(~np.isnan(y))
+
+    size = -(-n // n_buckets)
+    pad = size * n_buckets - n
+    lo = np.concatenate([np.where(np.isnan(y), np.inf, y), np.full(pad, np.inf)])
+    hi = np.concatenate([np.where(np.isnan(y), -np.inf, y), np.full(pad, -np.inf)])
+
+    offsets = np.arange(n_buckets) * size
+    i_min = lo.reshape(n_buckets, size).argmin(axis=1) + offsets
+    i_max = hi.reshape(n_buckets, size).argmax(axis=1) + offsets
+
+    idx = np.unique(np.concatenate([i_min, i_max]))
+    idx = idx[idx < n]
+    return idx[~np.isnan(y[idx])]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling (Steinarsson, 2013).
+
+    Picks one point per bucket maximizing the triangle area with the previous
+    pick and the next bucket's mean; preserves shape better than min/max for
+    smooth curves. The loop runs over buckets only (vectorized within each),
+    so cost is O(n) with n_out Python iterations. NaN points are skipped.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+    n = len(valid)
+    if n_out < 3 or n <= n_out:
+        return valid
+
+    xv, yv = x[valid], y[valid]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    picked = np.empty(n_out, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        cx = xv[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else xv[-1]
+        cy = yv[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else yv[-1]
+
+        area = np.abs(
+            (xv[a] - cx) * (yv[lo:hi] - yv[a]) - (xv[a] - xv[lo:hi]) * (cy - yv[a])
+        )
+        a = lo + int(area.argmax()) if hi > lo else lo
+        picked[b + 1] = a
+
+    return valid[np.unique(picked)]
+
+
+def downsample(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_points: int = DEFAULT_MAX_POINTS,
+    method: str = "minmax",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce (x, y) to about `max_points` points ("minmax" or "lttb").
+    """
+    if method == "minmax":
+        idx = minmax_indices(y, max(max_points // 2, 1))
+    elif method == "lttb":
+        idx = lttb_indices(x, y, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method '{method}'")
+    return x[idx], y[idx]
+
+
+def _xy(series: pd.Series) -> tuple[np.ndarray, np.ndarray, bool]:
+    """
+    NumPy (x, y) for a Series; datetime indexes become int64 nanoseconds.
+    """
+    idx = series.index
+    is_time = isinstance(idx, pd.DatetimeIndex)
+    if is_time:
+        x = idx.tz_localize(None).asi8 if idx.tz is not None else idx.asi8
+    else:
+        x = np.asarray(idx, dtype=float)
+    return x, series.to_numpy(dtype=float), is_time
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+
+def _as_panels(
+    data: pd.Series | pd.DataFrame | Mapping[str, pd.Series],
+) -> list[tuple[str, pd.Series]]:
+    if isinstance(data, pd.Series):
+        return [(str(data.name), data)]
+    if isinstance(data, pd.DataFrame):
+        return [(str(c), data[c]) for c in data.columns]
+    return [(str(k), v) for k, v in data.items()]
+
+
+def draw_panels(
+    fig,
+    data: pd.Series | pd.DataFrame | Mapping[str, pd.Series],
+    title: str = "",
+    ylabel: str = "",
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    method: str = "minmax",
+    overlay: bool = False,
+) -> None:
+    """
+    Draw one stacked panel per series on a matplotlib Figure (shared x axis),
+    or every series on a single labelled axes with `overlay`.
+    """
+    panels = _as_panels(data)
+    n_axes = 1 if overlay else len(panels)
+    axes = fig.subplots(n_axes, 1, sharex=True, squeeze=False)[:, 0]
+
+    for i, (name, s) in enumerate(panels):
+        ax = axes[0 if overlay else i]
+        x, y, is_time = _xy(s)
+        if max_points is not None and len(y) > max_points:
+            x, y = downsample(x, y, max_points=max_points, method=method)
+        if is_time:
+            x = x.astype("datetime64[ns]")
+        ax.plot(x, y, linewidth=0.8, label=name)
+        if not overlay:
+            ax.set_ylabel(ylabel or (name if len(panels) > 1 else ""))
+    for ax in axes:
+        ax.grid(True, linestyle="--", alpha=0.6)
+    if overlay:
+        axes[0].set_ylabel(ylabel)
+        if len(panels) > 1:
+            axes[0].legend()
+
+    if title:
+        axes[0].set_title(title)
+
+
+def plot_series(
+    series,
+    title: str,
+    ylabel: str = "",
+    max_points: int | None = DEFAULT_MAX_POINTS,
+):
+    """
+    Plot a series, or every column of a DataFrame on the same axes,
+    decimated to `max_points` per line (None: plot every point).
+    """
+    # Deferred: matplotlib is slow to import and only needed when plotting
+    import matplotlib.pyplot as plt
+
+    data = series if isinstance(series, pd.DataFrame) else pd.Series(series)
+    fig = plt.figure(figsize=(12, 5))
+    draw_panels(
+        fig, data, title=title, ylabel=ylabel, max_points=max_points, overlay=True
+    )
+    plt.show()
+
+
+def plot_panel(
+    data: pd.DataFrame | Mapping[str, pd.Series],
+    title: str = "",
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    method: str = "minmax",
+    height_per_panel: float = 2.5,
+):
+    """
+    Plot several series as stacked panels sharing the time axis.
+    """
+    import matplotlib.pyplot as plt
+
+    n = len(_as_panels(data))
+    fig = plt.figure(figsize=(12, height_per_panel * n))
+    draw_panels(fig, data, title=title, max_points=max_points, method=method)
+    fig.tight_layout()
     plt.show()
+    return fig
+
+
+# ---------------------------------------------------------------------------
+# Headless batch export
+# ---------------------------------------------------------------------------
+
+
+def _render_to_file(
+    path: str,
+    data: pd.Series | pd.DataFrame,
+    title: str,
+    max_points: int | None,
+    method: str,
+    dpi: int,
+    height_per_panel: float,
+) -> str:
+    # Figure + Agg canvas: no pyplot state, no display, safe in worker processes
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    n = len(_as_panels(data))
+    fig = Figure(figsize=(12, max(height_per_panel * n, 4.0)))
+    FigureCanvasAgg(fig)
+    draw_panels(fig, data, title=title, max_points=max_points, method=method)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    return path
+
+
+def export_figures(
+    jobs: Sequence[tuple[str, pd.Series | pd.DataFrame, str]],
+    out_dir: str | Path = "reports",
+    fmt: str = "png",
+    workers: int | None = None,
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    method: str = "minmax",
+    dpi: int = 100,
+    height_per_panel: float = 2.5,
+) -> list[Path]:
+    """
+    Render figures headlessly (Agg) to `out_dir`, on a process pool.
+
+    Parameters
+    ----------
+    jobs : sequence of (name, data, title)
+        `name` is the output file stem; `data` a Series (one panel) or a
+        DataFrame (one panel per column).
+    workers : int, optional
+        Process count. 1 renders in-process; None uses os.cpu_count().
+
+    Returns
+    -------
+    list[Path]
+        Written file paths, in job order.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    args = [
+        (
+            str(out / f"{name}.{fmt}"),
+            data,
+            title,
+            max_points,
+            method,
+            dpi,
+            height_per_panel,
+        )
+        for name, data, title in jobs
+    ]
+
+    if workers == 1 or len(args) <= 1:
+        paths = [_render_to_file(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            paths = list(pool.map(_render_to_file, *zip(*args)))
+
+    return [Path(p) for p in paths]